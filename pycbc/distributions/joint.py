@@ -108,17 +108,9 @@ class JointDistribution(object):
         if self._constraints:
             logging.info("Renormalizing distribution for constraints")
 
-            # draw samples
-            samples = {}
-            for dist in self.distributions:
-                draw = dist.rvs(n_test_samples)
-                for param in dist.params:
-                    samples[param] = draw[param][:]
-
-            # evaluate constraints
-            result = numpy.ones(len(tuple(samples.values())[0]), dtype=bool)
-            for constraint in self._constraints:
-                result = constraint(samples) & result
+            # draw samples and evaluate constraints
+            samples = self._draw(n_test_samples)
+            result = self._within_constraints(samples)
 
             # set new scaling factor for prior to be
             # the fraction of acceptances in random sampling of entire space
@@ -160,8 +152,54 @@ class JointDistribution(object):
         return sum([d(**params)
                     for d in self.distributions]) - self._logpdf_scale
 
-    def rvs(self, size=1):
+    def _draw(self, size):
+        """ Draw samples from each of the distributions, ignoring the
+        constraints.
+
+        Returns
+        -------
+        dict
+            Dictionary of sample arrays keyed by parameter name.
+        """
+        samples = {}
+        for dist in self.distributions:
+            draw = dist.rvs(size)
+            for param in dist.params:
+                samples[param] = draw[param][:]
+        return samples
+
+    def _within_constraints(self, samples):
+        """ Evaluate all of the constraints on arrays of samples.
+
+        Returns
+        -------
+        numpy.ndarray
+            Boolean array which is True for samples obeying every constraint.
+        """
+        result = numpy.ones(len(tuple(samples.values())[0]), dtype=bool)
+        for constraint in self._constraints:
+            result = constraint(samples) & result
+        return result
+
+    def rvs(self, size=1, max_block_size=2**22):
         """ Rejection samples the parameter space.
+
+        Samples are drawn in blocks and the constraints are evaluated on a
+        whole block at once. The size of each block is chosen from the
+        acceptance rate measured so far, starting from the rate found when
+        normalizing, so that usually a single block is needed.
+
+        Parameters
+        ----------
+        size : int
+            The number of samples to return.
+        max_block_size : int, optional
+            The largest number of samples to draw at once.
+
+        Returns
+        -------
+        out : FieldArray
+            The accepted samples.
         """
 
         # create output FieldArray
@@ -170,21 +208,24 @@ class JointDistribution(object):
 
         # loop until enough samples accepted
         n = 0
+        ndrawn = naccepted = 0
+        rate = self._pdf_scale
         while n < size:
-
-            # draw samples
-            samples = {}
-            for dist in self.distributions:
-                draw = dist.rvs(1)
-                for param in dist.params:
-                    samples[param] = draw[param][0]
-            vals = numpy.array([samples[arg] for arg in self.variable_args])
-
-            # determine if all parameter values are in prior space
-            # if they are then add to output
-            if self(**dict(zip(self.variable_args, vals))) > -numpy.inf:
-                out[n] = vals
-                n += 1
+            # oversize the block a little so it is unlikely to fall short
+            nblock = int(numpy.ceil(1.2 * (size - n) / max(rate, 1e-6))) + 16
+            nblock = min(nblock, max_block_size)
+
+            # draw samples and keep those obeying the constraints
+            samples = self._draw(nblock)
+            keep = numpy.flatnonzero(self._within_constraints(samples))
+            ndrawn += nblock
+            naccepted += len(keep)
+            rate = max(naccepted, 1) / float(ndrawn)
+
+            keep = keep[:size - n]
+            for arg in self.variable_args:
+                out[arg][n:n + len(keep)] = samples[arg][keep]
+            n += len(keep)
 
         return out
 
@@ -27,6 +27,7 @@ coincident triggers.
 
 import numpy, logging, pycbc.pnutils, copy, lal
 from pycbc.detector import Detector
+from .coinc_cython import coincidence_fill, searchsorted_in_blocks
 
 
 def background_bin_from_string(background_bins, data):
@@ -186,6 +187,36 @@ def timeslide_durations(start1, start2, end1, end2, timeslide_offsets):
     return numpy.array(durations)
 
 
+def _coincidence_from_sorted(t1, t2, fold1, fold2, sort1, sort2, window,
+                             slide_step, search):
+    """ Find the coincident pairs given the sorted folded times, using the
+    `search` function to find insertion points into fold2.
+    """
+    # The second set of triggers is searched as if it were repeated shifted
+    # back and forward by one slide, so that coincidences which wrap around
+    # the slide interval are found.
+    if slide_step:
+        shifts = [slide_step, 0, -slide_step]
+    else:
+        shifts = [0]
+
+    left = numpy.array([search(fold1 - window + s) for s in shifts],
+                       dtype=numpy.int64, ndmin=2)
+    right = numpy.array([search(fold1 + window + s) for s in shifts],
+                        dtype=numpy.int64, ndmin=2)
+    num = int((right - left).sum())
+
+    idx1 = numpy.zeros(num, dtype=numpy.uint32)
+    idx2 = numpy.zeros(num, dtype=numpy.uint32)
+    slide = numpy.zeros(num, dtype=numpy.int32)
+    coincidence_fill(sort1.astype(numpy.int64), sort2.astype(numpy.int64),
+                     left, right,
+                     numpy.array(t1, dtype=numpy.float64, copy=False),
+                     numpy.array(t2, dtype=numpy.float64, copy=False),
+                     float(slide_step), idx1, idx2, slide)
+    return idx1, idx2, slide
+
+
 def time_coincidence(t1, t2, window, slide_step=0):
     """ Find coincidences by time window
 
@@ -222,29 +253,72 @@ def time_coincidence(t1, t2, window, slide_step=0):
     fold1 = fold1[sort1]
     fold2 = fold2[sort2]
 
-    if slide_step:
-        # FIXME explain this
-        fold2 = numpy.concatenate([fold2 - slide_step, fold2, fold2 + slide_step])
-        sort2 = numpy.concatenate([sort2, sort2, sort2])
+    def search(x):
+        return numpy.searchsorted(fold2, x)
 
-    left = numpy.searchsorted(fold2, fold1 - window)
-    right = numpy.searchsorted(fold2, fold1 + window)
+    return _coincidence_from_sorted(t1, t2, fold1, fold2, sort1, sort2,
+                                    window, slide_step, search)
 
-    idx1 = numpy.repeat(sort1, right - left)
-    idx2 = [sort2[l:r] for l, r in zip(left, right)]
 
-    if len(idx2) > 0:
-        idx2 = numpy.concatenate(idx2)
-    else:
-        idx2 = numpy.array([], dtype=numpy.int64)
+def time_coincidence_by_template(t1, tid1, t2, tid2, window, slide_step=0):
+    """ Find coincidences by time window between triggers of the same template
+
+    This is equivalent to calling `time_coincidence` separately for the
+    triggers of each template, but processes the triggers of all templates
+    at once.
+
+    Parameters
+    ----------
+    t1 : numpy.ndarray
+        Array of trigger times from the first detector
+    tid1 : numpy.ndarray
+        Array of the template ids of the triggers from the first detector
+    t2 : numpy.ndarray
+        Array of trigger times from the second detector
+    tid2 : numpy.ndarray
+        Array of the template ids of the triggers from the second detector
+    window : float
+        Coincidence window maximum time difference, arbitrary units (usually s)
+    slide_step : float (default 0)
+        If calculating background coincidences, the interval between background
+        slides, arbitrary units (usually s)
 
+    Returns
+    -------
+    idx1 : numpy.ndarray
+        Array of indices into the t1 array for coincident triggers
+    idx2 : numpy.ndarray
+        Array of indices into the t2 array
+    slide : numpy.ndarray
+        Array of slide ids
+    """
     if slide_step:
-        diff = ((t1 / slide_step)[idx1] - (t2 / slide_step)[idx2])
-        slide = numpy.rint(diff)
+        fold1 = t1 % slide_step
+        fold2 = t2 % slide_step
     else:
-        slide = numpy.zeros(len(idx1))
+        fold1 = t1
+        fold2 = t2
+
+    # Sort by template and then by time, so that the triggers of each
+    # template in the second set form a sorted block
+    sort1 = numpy.lexsort((fold1, tid1))
+    sort2 = numpy.lexsort((fold2, tid2))
+    fold1 = numpy.array(fold1[sort1], dtype=numpy.float64)
+    fold2 = numpy.array(fold2[sort2], dtype=numpy.float64)
+    tid2_sorted = tid2[sort2]
+    starts = numpy.searchsorted(tid2_sorted, tid1[sort1],
+                                side='left').astype(numpy.int64)
+    ends = numpy.searchsorted(tid2_sorted, tid1[sort1],
+                              side='right').astype(numpy.int64)
 
-    return idx1.astype(numpy.uint32), idx2.astype(numpy.uint32), slide.astype(numpy.int32)
+    def search(x):
+        out = numpy.zeros(len(x), dtype=numpy.int64)
+        searchsorted_in_blocks(fold2, starts, ends,
+                               numpy.array(x, dtype=numpy.float64), out)
+        return out
+
+    return _coincidence_from_sorted(t1, t2, fold1, fold2, sort1, sort2,
+                                    window, slide_step, search)
 
 
 def time_multi_coincidence(times, slide_step=0, slop=.003,
@@ -550,9 +624,22 @@ def cluster_over_time(stat, time, window, argmax=numpy.argmax):
 
 
 class MultiRingBuffer(object):
-    """Dynamic size n-dimensional ring buffer that can expire elements."""
+    """Fixed-capacity n-dimensional ring buffer that can expire elements.
+
+    All rings share one 2-d allocation with a row of `capacity` elements per
+    ring, so the memory used does not change while running. Each ring is
+    circular: new elements are written after its newest element, wrapping
+    around to the start of the row. The data of a ring is returned as a view
+    of its row, unless the ring currently wraps around the end of the row,
+    in which case a copy is returned. If a ring is full when elements are
+    added to it, its expired elements are dropped first, then its oldest
+    elements are overwritten and counted in `num_overwritten`.
+    """
+    # Most templates only trigger in a small fraction of the analysis
+    # blocks, so the rings are small unless asked otherwise
+    default_capacity = 64
 
-    def __init__(self, num_rings, max_time, dtype):
+    def __init__(self, num_rings, max_time, dtype, capacity=None):
         """
         Parameters
         ----------
@@ -563,13 +650,25 @@ class MultiRingBuffer(object):
             The maximum "time" an element can exist in each ring.
         dtype: numpy.dtype
             The type of each element in the ring buffer.
+        capacity: int, optional
+            The number of elements each ring can hold. The default is
+            `default_capacity`, or max_time + 1 if that is smaller, which
+            holds every element which has not expired as long as at most one
+            element is added to each ring at each time.
         """
         self.max_time = max_time
-        self.buffer = []
-        self.buffer_expire = []
-        for _ in range(num_rings):
-            self.buffer.append(numpy.zeros(0, dtype=dtype))
-            self.buffer_expire.append(numpy.zeros(0, dtype=int))
+        self.num_rings = num_rings
+        if not capacity:
+            capacity = min(max_time + 1, self.default_capacity)
+        self.capacity = int(capacity)
+        self.buffer = numpy.zeros((num_rings, self.capacity), dtype=dtype)
+        self.buffer_expire = numpy.zeros((num_rings, self.capacity),
+                                         dtype=int)
+        # Each ring holds 'count' elements from position 'start' onwards,
+        # wrapping around the end of its row
+        self.start = numpy.zeros(num_rings, dtype=int)
+        self.count = numpy.zeros(num_rings, dtype=int)
+        self.num_overwritten = 0
         self.time = 0
 
     @property
@@ -577,17 +676,16 @@ class MultiRingBuffer(object):
         return min(self.time, self.max_time)
 
     def num_elements(self):
-        return sum([len(a) for a in self.buffer])
+        return self.count.sum()
 
     @property
     def nbytes(self):
-        return sum([a.nbytes for a in self.buffer])
+        return self.buffer.nbytes
 
     def discard_last(self, indices):
         """Discard the triggers added in the latest update"""
-        for i in indices:
-            self.buffer_expire[i] = self.buffer_expire[i][:-1]
-            self.buffer[i] = self.buffer[i][:-1]
+        if len(indices):
+            numpy.add.at(self.count, numpy.asarray(indices, dtype=int), -1)
 
     def advance_time(self):
         """Advance the internal time increment by 1, expiring any triggers that
@@ -595,33 +693,85 @@ class MultiRingBuffer(object):
         """
         self.time += 1
 
+    def _drop_oldest(self, rings, num):
+        """Drop the 'num' oldest elements of each of the unique 'rings'"""
+        self.start[rings] = (self.start[rings] + num) % self.capacity
+        self.count[rings] -= num
+
+    def expire(self, rings):
+        """Drop the expired elements of the given rings
+
+        Parameters
+        ----------
+        rings: numpy.ndarray
+            The unique indices of the ring buffers to update.
+        """
+        # The expiration times in a ring are in increasing order
+        expired = self.time - self.max_time
+        for ring in rings:
+            num = numpy.searchsorted(self.expire_vector(ring), expired)
+            if num:
+                self._drop_oldest(ring, num)
+
     def add(self, indices, values):
         """Add triggers in 'values' to the buffers indicated by the indices
         """
-        for i, v in zip(indices, values):
-            self.buffer[i] = numpy.append(self.buffer[i], v)
-            self.buffer_expire[i] = numpy.append(self.buffer_expire[i], self.time)
+        indices = numpy.asarray(indices, dtype=int)
+        values = numpy.asarray(values)
+        if len(indices):
+            rings, counts = numpy.unique(indices, return_counts=True)
+
+            # Rank repeated indices one after another, in the order given
+            order = numpy.argsort(indices, kind='mergesort')
+            sidx = indices[order]
+            rank = numpy.empty(len(indices), dtype=int)
+            rank[order] = numpy.arange(len(sidx)) - \
+                numpy.searchsorted(sidx, sidx, side='left')
+
+            full = self.count[rings] + counts > self.capacity
+            if full.any():
+                self.expire(rings[full])
+                over = self.count[rings] + counts - self.capacity
+                over = numpy.maximum(over, 0)
+                if over.any():
+                    logging.warning('Overwriting %s unexpired elements of '
+                                    'full ring buffers', over.sum())
+                    self.num_overwritten += over.sum()
+                    drop = numpy.minimum(over, self.count[rings])
+                    self._drop_oldest(rings, drop)
+                    # If more elements are added to a ring than it can
+                    # hold, only the newest of them are kept
+                    skip = (over - drop)[numpy.searchsorted(rings, indices)]
+                    keep = rank >= skip
+                    indices, values = indices[keep], values[keep]
+                    rank = rank[keep] - skip[keep]
+                    counts = numpy.minimum(counts, self.capacity)
+
+            pos = (self.start[indices] + self.count[indices] + rank) \
+                % self.capacity
+            self.buffer[indices, pos] = values
+            self.buffer_expire[indices, pos] = self.time
+            self.count[rings] += counts
         self.advance_time()
 
+    def _ordered(self, array, buffer_index):
+        """Return the elements of a ring of 'array', oldest first"""
+        start = self.start[buffer_index]
+        end = start + self.count[buffer_index]
+        if end <= self.capacity:
+            return array[buffer_index, start:end]
+        return numpy.concatenate([array[buffer_index, start:],
+                                  array[buffer_index, :end - self.capacity]])
+
     def expire_vector(self, buffer_index):
         """Return the expiration vector of a given ring buffer """
-        return self.buffer_expire[buffer_index]
+        return self._ordered(self.buffer_expire, buffer_index)
 
     def data(self, buffer_index):
         """Return the data vector for a given ring buffer"""
         # Check for expired elements and discard if they exist
-        expired = self.time - self.max_time
-        exp = self.buffer_expire[buffer_index]
-        j = 0
-        while j < len(exp):
-            # Everything before this j must be expired
-            if exp[j] >= expired:
-                self.buffer_expire[buffer_index] = exp[j:].copy()
-                self.buffer[buffer_index] = self.buffer[buffer_index][j:].copy()
-                break
-            j += 1
-
-        return self.buffer[buffer_index]
+        self.expire([buffer_index])
+        return self._ordered(self.buffer, buffer_index)
 
 
 class CoincExpireBuffer(object):
@@ -730,7 +880,8 @@ class LiveCoincTimeslideBackgroundEstimator(object):
                  ifar_limit=100,
                  timeslide_interval=.035,
                  coinc_threshold=.002,
-                 return_background=False):
+                 return_background=False,
+                 singles_capacity=None):
         """
         Parameters
         ----------
@@ -757,6 +908,11 @@ class LiveCoincTimeslideBackgroundEstimator(object):
         return_background: boolean
             If true, background triggers will also be included in the file
             output.
+        singles_capacity: int, optional
+            The number of single detector triggers of each template kept for
+            the background in each detector. Older triggers are overwritten
+            once this is exceeded. Default is
+            `MultiRingBuffer.default_capacity`.
         """
         from . import stat
         self.num_templates = num_templates
@@ -767,6 +923,7 @@ class LiveCoincTimeslideBackgroundEstimator(object):
 
         self.timeslide_interval = timeslide_interval
         self.return_background = return_background
+        self.singles_capacity = singles_capacity
 
         self.ifos = ifos
         if len(self.ifos) != 2:
@@ -844,6 +1001,7 @@ class LiveCoincTimeslideBackgroundEstimator(object):
                    return_background=args.store_background,
                    ifar_limit=args.background_ifar_limit,
                    timeslide_interval=args.timeslide_interval,
+                   singles_capacity=args.background_singles_capacity,
                    ifos=ifos)
 
     @staticmethod
@@ -864,6 +1022,13 @@ class LiveCoincTimeslideBackgroundEstimator(object):
                  "background in years", default=100.0)
         group.add_argument('--timeslide-interval', type=float,
             help="The interval between timeslides in seconds", default=0.1)
+        group.add_argument('--background-singles-capacity', type=int,
+            help="The number of single detector triggers of each template "
+                 "kept in each detector for background estimation. Older "
+                 "triggers are overwritten when a template has more. "
+                 "Default is %d, which suits templates that trigger in a "
+                 "few percent of the analysis blocks of the lookback time"
+                 % MultiRingBuffer.default_capacity)
         group.add_argument('--ifar-remove-threshold', type=float,
             help="NOT YET IMPLEMENTED", default=100.0)
 
@@ -925,7 +1090,8 @@ class LiveCoincTimeslideBackgroundEstimator(object):
         for ifo in self.ifos:
             self.singles[ifo] = MultiRingBuffer(self.num_templates,
                                             self.buffer_size,
-                                            self.singles_dtype)
+                                            self.singles_dtype,
+                                            capacity=self.singles_capacity)
 
     def _add_singles_to_buffer(self, results, ifos):
         """Add single detector triggers to the internal buffer
@@ -0,0 +1,73 @@
+import numpy
+cimport numpy
+from libc.math cimport rint
+from cython import wraparound, boundscheck, cdivision
+
+
+@boundscheck(False)
+@wraparound(False)
+def searchsorted_in_blocks(numpy.ndarray[numpy.float64_t, ndim=1] values,
+                           numpy.ndarray[numpy.int64_t, ndim=1] starts,
+                           numpy.ndarray[numpy.int64_t, ndim=1] ends,
+                           numpy.ndarray[numpy.float64_t, ndim=1] x,
+                           numpy.ndarray[numpy.int64_t, ndim=1] out):
+    """ Find the insertion point of x[i] (on the left) in the sorted block
+    values[starts[i]:ends[i]], for each i, and store it in out[i]
+    """
+    cdef long n = len(x)
+    cdef long i, lo, hi, mid
+    cdef double v
+
+    for i in range(n):
+        lo = starts[i]
+        hi = ends[i]
+        v = x[i]
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            if values[mid] < v:
+                lo = mid + 1
+            else:
+                hi = mid
+        out[i] = lo
+
+
+@boundscheck(False)
+@wraparound(False)
+@cdivision(True)
+def coincidence_fill(numpy.ndarray[numpy.int64_t, ndim=1] sort1,
+                     numpy.ndarray[numpy.int64_t, ndim=1] sort2,
+                     numpy.ndarray[numpy.int64_t, ndim=2] left,
+                     numpy.ndarray[numpy.int64_t, ndim=2] right,
+                     numpy.ndarray[numpy.float64_t, ndim=1] t1,
+                     numpy.ndarray[numpy.float64_t, ndim=1] t2,
+                     double slide_step,
+                     numpy.ndarray[numpy.uint32_t, ndim=1] idx1,
+                     numpy.ndarray[numpy.uint32_t, ndim=1] idx2,
+                     numpy.ndarray[numpy.int32_t, ndim=1] slide):
+    """ Write the coincident pairs given by the ranges [left, right) of the
+    sorted second set of triggers, for each trigger of the sorted first set,
+    into the preallocated idx1, idx2 and slide arrays.
+
+    The first axis of left and right runs over the copies of the second set
+    of triggers shifted by a slide (one copy if there are no slides).
+    Returns the number of pairs written.
+    """
+    cdef long n1 = sort1.shape[0]
+    cdef long ncopies = left.shape[0]
+    cdef long count = 0
+    cdef long i, c, j, a, b
+
+    for i in range(n1):
+        a = sort1[i]
+        for c in range(ncopies):
+            for j in range(left[c, i], right[c, i]):
+                b = sort2[j]
+                idx1[count] = a
+                idx2[count] = b
+                if slide_step > 0:
+                    slide[count] = <int> rint(t1[a] / slide_step -
+                                              t2[b] / slide_step)
+                else:
+                    slide[count] = 0
+                count += 1
+    return count
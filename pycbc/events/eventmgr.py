@@ -174,6 +174,204 @@ def cluster_reduce(idx, snr, window_size):
     return idx.take(ind), snr.take(ind)
 
 
+def chisq_threshold_mask(chisq, chisq_dof, snr, value, delta=0):
+    """ Find the events which pass a threshold on the reduced chisq
+
+    Parameters
+    -----------
+    chisq: numpy.ndarray
+        The chisq value of each event
+    chisq_dof: numpy.ndarray
+        The number of chisq degrees of freedom of each event
+    snr: numpy.ndarray
+        The (complex) snr of each event
+    value: float
+        Events whose chisq / (chisq_dof + delta * |snr|^2) is larger than
+        this value fail the threshold
+    delta: {0, float}, optional
+        Coefficient of the snr dependent part of the chisq normalization
+
+    Returns
+    -------
+    keep: numpy.ndarray
+        Boolean array which is True for the events passing the threshold
+    """
+    snr = numpy.array(snr, copy=False)
+    xi = chisq / (chisq_dof + delta * (snr.real ** 2.0 + snr.imag ** 2.0))
+    return ~(xi > value)
+
+
+def loudest_in_bins(stat, num_keep, *bins):
+    """ Find the loudest events in each bin
+
+    Parameters
+    -----------
+    stat: numpy.ndarray
+        The ranking statistic of each event
+    num_keep: int
+        The number of events to keep from each bin
+    bins: numpy.ndarrays
+        One or more arrays of integer bin numbers for each event. Events are
+        grouped by the combination of all bin numbers given.
+
+    Returns
+    -------
+    indices: numpy.ndarray
+        The indices of the kept events, ordered by bin (the first array of bin
+        numbers varying slowest) and then by increasing statistic
+    """
+    stat = numpy.array(stat, copy=False)
+    if len(stat) == 0:
+        return numpy.array([], dtype=int)
+
+    # Sort by bin and then statistic so that each bin is a contiguous
+    # segment whose loudest events are at its end
+    bins = [numpy.array(b, copy=False) for b in bins]
+    order = numpy.lexsort([stat] + bins[::-1])
+    last = numpy.zeros(len(order), dtype=bool)
+    last[-1] = True
+    for b in bins:
+        sb = b[order]
+        last[:-1] |= sb[1:] != sb[:-1]
+
+    # Keep the events within num_keep of the end of their segment
+    ends = numpy.flatnonzero(last)
+    pos = numpy.arange(len(order))
+    seg_end = ends[numpy.searchsorted(ends, pos)]
+    return order[seg_end - pos < num_keep]
+
+
+class EventBuffer(object):
+    """ Store of events with amortized constant time appends
+
+    The events are held column by column in typed buffers whose capacity is
+    doubled whenever it is exceeded. If a memory limit is given, the stored
+    events are written in chunks to a temporary HDF file whenever the limit
+    is passed, and read back when the full set of events is requested.
+    """
+    def __init__(self, dtype, size=1024, memory_limit=None, spill_dir=None):
+        """
+        Parameters
+        ----------
+        dtype : numpy.dtype
+            The structured dtype of the events to store.
+        size : {1024, int}
+            The initial capacity of the buffers.
+        memory_limit : {None, float}
+            Size in bytes of events to hold in memory before writing them to
+            a temporary HDF file. If None, events are always kept in memory.
+        spill_dir : {None, str}
+            Directory in which to create the temporary HDF file. If None, the
+            default temporary directory is used.
+        """
+        self.dtype = numpy.dtype(dtype)
+        self.names = self.dtype.names
+        self.capacity = max(int(size), 1)
+        self.columns = {}
+        for name in self.names:
+            self.columns[name] = numpy.zeros(self.capacity,
+                                             dtype=self.dtype[name])
+        self.size = 0
+
+        self.memory_limit = memory_limit
+        self.max_size = None
+        if memory_limit is not None:
+            self.max_size = max(int(memory_limit / self.dtype.itemsize), 1)
+        self.spill_dir = spill_dir
+        self.spill_file = None
+        self.spill_size = 0
+
+    def __len__(self):
+        return self.size + self.spill_size
+
+    def _grow(self, size):
+        capacity = self.capacity
+        while capacity < size:
+            capacity *= 2
+        for name in self.names:
+            col = numpy.zeros(capacity, dtype=self.dtype[name])
+            col[:self.size] = self.columns[name][:self.size]
+            self.columns[name] = col
+        self.capacity = capacity
+
+    def append(self, events):
+        """ Add an array of events with the same dtype as the buffer """
+        num = len(events)
+        if num == 0:
+            return
+        if self.size + num > self.capacity:
+            self._grow(self.size + num)
+        for name in self.names:
+            self.columns[name][self.size:self.size + num] = events[name]
+        self.size += num
+
+        if self.max_size is not None and self.size >= self.max_size:
+            self.spill()
+
+    def spill(self):
+        """ Write the events held in memory to the temporary HDF file """
+        import h5py, tempfile
+        if self.size == 0:
+            return
+        if self.spill_file is None:
+            fd, fname = tempfile.mkstemp(suffix='.hdf', dir=self.spill_dir)
+            os.close(fd)
+            self.spill_file = h5py.File(fname, 'w')
+            for name in self.names:
+                self.spill_file.create_dataset(name, (0,),
+                                               dtype=self.dtype[name],
+                                               maxshape=(None,),
+                                               chunks=(min(self.size,
+                                                           2 ** 16),))
+        logging.info("Writing %d triggers to %s", self.size,
+                     self.spill_file.filename)
+        start = self.spill_size
+        end = start + self.size
+        for name in self.names:
+            dset = self.spill_file[name]
+            dset.resize((end,))
+            dset[start:end] = self.columns[name][:self.size]
+        self.spill_size = end
+        self.size = 0
+
+    def data(self):
+        """ Return all the stored events as a single structured array """
+        events = numpy.zeros(len(self), dtype=self.dtype)
+        for name in self.names:
+            if self.spill_size:
+                events[name][:self.spill_size] = self.spill_file[name][:]
+            events[name][self.spill_size:] = self.columns[name][:self.size]
+        return events
+
+    def chunks(self, size=None):
+        """ Iterate over the stored events in structured arrays of at most
+        `size` events. Events written to the temporary HDF file are read back
+        one chunk at a time. If `size` is None, all events are returned in
+        a single array.
+        """
+        if size is None:
+            size = max(len(self), 1)
+        sources = [(self.spill_file, self.spill_size),
+                   (self.columns, self.size)]
+        for source, num in sources:
+            for start in range(0, num, size):
+                end = min(start + size, num)
+                events = numpy.zeros(end - start, dtype=self.dtype)
+                for name in self.names:
+                    events[name] = source[name][start:end]
+                yield events
+
+    def clear(self):
+        """ Remove all events, deleting the temporary HDF file if any """
+        self.size = 0
+        self.spill_size = 0
+        if self.spill_file is not None:
+            fname = self.spill_file.filename
+            self.spill_file.close()
+            os.remove(fname)
+            self.spill_file = None
+
+
 class EventManager(object):
     def __init__(self, opt, column, column_types, **kwds):
         self.opt = opt
@@ -184,11 +382,16 @@ class EventManager(object):
             self.event_dtype.append((col, coltype))
 
         self.events = numpy.array([], dtype=self.event_dtype)
-        self.accumulate = [self.events]
+        memory_limit = getattr(opt, 'trigger_memory_limit', None)
+        if memory_limit is not None:
+            memory_limit = memory_limit * 2 ** 20
+        self.accumulate = EventBuffer(self.event_dtype,
+                                      memory_limit=memory_limit)
         self.template_params = []
         self.template_index = -1
-        self.template_events = numpy.array([], dtype=self.event_dtype)
+        self.template_events = EventBuffer(self.event_dtype)
         self.write_performance = False
+        self.chisq_metadata = {}
 
     @classmethod
     def from_multi_ifo_interface(cls, opt, ifo, column, column_types, **kwds):
@@ -205,13 +408,10 @@ class EventManager(object):
         return cls(opt, column, column_types, **kwds)
 
     def chisq_threshold(self, value, num_bins, delta=0):
-        remove = []
-        for i, event in enumerate(self.events):
-            xi = event['chisq'] / (event['chisq_dof'] +
-                                   delta * event['snr'].conj() * event['snr'])
-            if xi > value:
-                remove.append(i)
-        self.events = numpy.delete(self.events, remove)
+        keep = chisq_threshold_mask(self.events['chisq'],
+                                    self.events['chisq_dof'],
+                                    self.events['snr'], value, delta=delta)
+        self.events = self.events[keep]
 
     def newsnr_threshold(self, threshold):
         """ Remove events with newsnr smaller than given threshold
@@ -256,7 +456,7 @@ class EventManager(object):
         # Convert trigger time to integer bin number
         # NB time_index and window are in units of samples
         wtime = (e_copy['time_index'] / window).astype(numpy.int32)
-        bins = numpy.unique(wtime)
+        bins = [wtime]
 
         if log_chirp_width:
             from pycbc.conversions import mchirp_from_mass1_mass2
@@ -266,21 +466,9 @@ class EventManager(object):
 
             # convert chirp mass to integer bin number
             imc = (numpy.log(mc) / log_chirp_width).astype(numpy.int32)
-            cbins = numpy.unique(imc)
-
-        keep = []
-        for b in bins:
-            if log_chirp_width:
-                for b2 in cbins:
-                    bloc = numpy.where((wtime == b) & (imc == b2))[0]
-                    bloudest = statv[bloc].argsort()[-num_keep:]
-                    keep.append(bloc[bloudest])
-            else:
-                bloc = numpy.where((wtime == b))[0]
-                bloudest = statv[bloc].argsort()[-num_keep:]
-                keep.append(bloc[bloudest])
+            bins.append(imc)
 
-        keep = numpy.concatenate(keep)
+        keep = loudest_in_bins(statv, num_keep, *bins)
         self.events = self.events[keep]
 
     def add_template_events(self, columns, vectors):
@@ -301,18 +489,20 @@ class EventManager(object):
                     new_events[c] = v.numpy()
                 else:
                     new_events[c] = v
-        self.template_events = numpy.append(self.template_events, new_events)
+        self.template_events.append(new_events)
 
     def cluster_template_events(self, tcolumn, column, window_size):
         """ Cluster the internal events over the named column
         """
-        cvec = self.template_events[column]
-        tvec = self.template_events[tcolumn]
+        events = self.template_events.data()
+        cvec = events[column]
+        tvec = events[tcolumn]
         if window_size == 0:
             indices = numpy.arange(len(tvec))
         else:
             indices = findchirp_cluster_over_window(tvec, cvec, window_size)
-        self.template_events = numpy.take(self.template_events, indices)
+        self.template_events.clear()
+        self.template_events.append(numpy.take(events, indices))
 
     def new_template(self, **kwds):
         self.template_params.append(kwds)
@@ -322,24 +512,39 @@ class EventManager(object):
         self.template_params[-1].update(kwds)
 
     def finalize_template_events(self):
-        self.accumulate.append(self.template_events)
-        self.template_events = numpy.array([], dtype=self.event_dtype)
-
-    def consolidate_events(self, opt, gwstrain=None):
-        self.events = numpy.concatenate(self.accumulate)
-        logging.info("We currently have %d triggers", len(self.events))
-        if opt.chisq_threshold and opt.chisq_bins:
+        self.accumulate.append(self.template_events.data())
+        self.template_events.clear()
+
+    def add_events(self, events, template_params):
+        """ Add the events and template parameters of another event manager,
+        e.g. one which analyzed a different part of the template bank. The
+        template ids of the new events are offset to follow the templates
+        already stored here.
+        """
+        events = events.copy()
+        events['template_id'] += len(self.template_params)
+        self.template_params += list(template_params)
+        self.template_index = len(self.template_params) - 1
+        self.accumulate.append(events)
+
+    def apply_cuts(self, opt, gwstrain=None, thresholds=True, loudest=True,
+                   injections=True):
+        """ Remove the triggers in `events` which fail the cuts given by the
+        command line options. The threshold, loudest in interval and
+        injection window cuts can each be skipped.
+        """
+        if thresholds and opt.chisq_threshold and opt.chisq_bins:
             logging.info("Removing triggers with poor chisq")
             self.chisq_threshold(opt.chisq_threshold, opt.chisq_bins,
                                  opt.chisq_delta)
             logging.info("%d remaining triggers", len(self.events))
 
-        if opt.newsnr_threshold and opt.chisq_bins:
+        if thresholds and opt.newsnr_threshold and opt.chisq_bins:
             logging.info("Removing triggers with NewSNR below threshold")
             self.newsnr_threshold(opt.newsnr_threshold)
             logging.info("%d remaining triggers", len(self.events))
 
-        if opt.keep_loudest_interval:
+        if loudest and opt.keep_loudest_interval:
             logging.info("Removing triggers not within the top %s "
                          "loudest of a %s second interval by %s",
                          opt.keep_loudest_num, opt.keep_loudest_interval,
@@ -350,17 +555,51 @@ class EventManager(object):
                  log_chirp_width=opt.keep_loudest_log_chirp_window)
             logging.info("%d remaining triggers", len(self.events))
 
-        if opt.injection_window and hasattr(gwstrain, 'injections'):
+        if injections and opt.injection_window and \
+                hasattr(gwstrain, 'injections'):
             logging.info("Keeping triggers within %s seconds of injection",
                          opt.injection_window)
             self.keep_near_injection(opt.injection_window,
                                      gwstrain.injections)
             logging.info("%d remaining triggers", len(self.events))
 
-        self.accumulate = [self.events]
+    def consolidate_events(self, opt, gwstrain=None):
+        """ Apply the trigger cuts to all the triggers found so far.
+
+        If a trigger memory limit is set, the triggers are processed in
+        chunks of at most that size, so the triggers written to disk are
+        never all read back into memory at once. The loudest triggers in an
+        interval are the loudest of the loudest triggers of each chunk, so
+        in that case the loudest in interval cut, and the injection window
+        cut which follows it, are applied once more to the surviving
+        triggers of all chunks.
+        """
+        stored = self.accumulate
+        self.accumulate = EventBuffer(self.event_dtype,
+                                      memory_limit=stored.memory_limit,
+                                      spill_dir=stored.spill_dir)
+        logging.info("We currently have %d triggers", len(stored))
+        chunked = stored.max_size is not None and \
+            len(stored) > stored.max_size and opt.keep_loudest_interval
+        for events in stored.chunks(stored.max_size):
+            self.events = events
+            self.apply_cuts(opt, gwstrain=gwstrain, injections=not chunked)
+            self.accumulate.append(self.events)
+        stored.clear()
+
+        if chunked:
+            self.events = self.accumulate.data()
+            self.accumulate.clear()
+            self.apply_cuts(opt, gwstrain=gwstrain, thresholds=False)
+            self.accumulate.append(self.events)
+        logging.info("%d triggers after consolidation", len(self.accumulate))
 
     def finalize_events(self):
-        self.events = numpy.concatenate(self.accumulate)
+        """ Gather all the triggers found into `events`. The trigger store is
+        emptied, which deletes its temporary file if there is one.
+        """
+        self.events = self.accumulate.data()
+        self.accumulate.clear()
 
     def make_output_dir(self, outname):
         path = os.path.dirname(outname)
@@ -380,6 +619,14 @@ class EventManager(object):
         self.ntemplates = ntemplates
         self.write_performance = True
 
+    def save_chisq_metadata(self, metadata):
+        """
+        Stores how the power chisq was calculated, such as the method used and
+        the costs measured for the automatic choice of method, to be written
+        as attributes of the search group
+        """
+        self.chisq_metadata = dict(metadata)
+
     def write_events(self, outname):
         """ Write the found events to a sngl inspiral table
         """
@@ -391,24 +638,32 @@ class EventManager(object):
             raise ValueError('Cannot write to this format')
 
     def write_to_hdf(self, outname):
+        from pycbc.io.hdf import compression_kwargs, trigger_chunk_length
+
         class fw(object):
-            def __init__(self, name, prefix):
+            def __init__(self, name, prefix, compression, chunk_length):
                 import h5py
                 self.f = h5py.File(name, 'w')
                 self.prefix = prefix
+                self.compression = compression
+                self.chunk_length = chunk_length
 
             def __setitem__(self, name, data):
                 col = self.prefix + '/' + name
-                self.f.create_dataset(col, data=data,
-                                      compression='gzip',
-                                      compression_opts=9,
-                                      shuffle=True)
+                kwargs = dict(self.compression)
+                if kwargs and self.chunk_length and \
+                        len(data) >= self.chunk_length:
+                    kwargs['chunks'] = (self.chunk_length,)
+                self.f.create_dataset(col, data=data, **kwargs)
 
         self.events.sort(order='template_id')
         th = numpy.array([p['tmplt'].template_hash for p in
                           self.template_params])
         tid = self.events['template_id']
-        f = fw(outname, self.opt.channel_name[0:2])
+        codec = getattr(self.opt, 'trigger_compression', 'gzip-9')
+        f = fw(outname, self.opt.channel_name[0:2], compression_kwargs(codec),
+               trigger_chunk_length(len(self.events),
+                                    len(self.template_params)))
 
         if len(self.events):
             f['snr'] = abs(self.events['snr'])
@@ -508,6 +763,9 @@ class EventManager(object):
                 numpy.array([float(self.setup_time) / float(self.run_time)])
             f['search/run_time'] = numpy.array([float(self.run_time)])
 
+        for key, value in self.chisq_metadata.items():
+            f.f[f.prefix + '/search'].attrs[key] = value
+
         if 'q_trans' in self.global_params:
             qtrans = self.global_params['q_trans']
             for key in qtrans:
@@ -553,6 +811,7 @@ class EventManagerMultiDetBase(EventManager):
             self.event_dtype.append((col, coltype))
 
         self.events = numpy.array([], dtype=self.event_dtype)
+        self.accumulate = EventBuffer(self.event_dtype)
         self.event_id_map = {}
         self.template_params = []
         self.template_index = -1
@@ -560,8 +819,17 @@ class EventManagerMultiDetBase(EventManager):
         self.coinc_list = []
         self.write_performance = False
         for ifo in ifos:
-            self.template_event_dict[ifo] = \
-                numpy.array([], dtype=self.event_dtype)
+            self.template_event_dict[ifo] = EventBuffer(self.event_dtype)
+
+    def template_event_arrays(self):
+        """ Return the events of the current template as structured arrays
+        keyed as `template_event_dict`, and empty the per-template buffers.
+        """
+        template_events = {}
+        for key, events in self.template_event_dict.items():
+            template_events[key] = events.data()
+            events.clear()
+        return template_events
 
     def add_template_events_to_ifo(self, ifo, columns, vectors):
         """ Add a vector indexed """
@@ -583,26 +851,27 @@ class EventManagerCoherent(EventManagerMultiDetBase):
         self.network_event_dtype.append(('event_id', int))
         for col, coltype in zip(network_column, network_column_types):
             self.network_event_dtype.append((col, coltype))
-        self.network_events = numpy.array([], dtype=self.network_event_dtype)
+        self.network_events = EventBuffer(self.network_event_dtype)
         self.event_index = {}
         for ifo in self.ifos:
             self.event_index[ifo] = 0
         self.event_index['network'] = 0
         self.template_event_dict['network'] = \
-                                numpy.array([], dtype=self.network_event_dtype)
+                                EventBuffer(self.network_event_dtype)
 
     def cluster_template_network_events(self, tcolumn, column, window_size):
         """ Cluster the internal events over the named column
         """
-        cvec = self.template_event_dict['network'][column]
-        tvec = self.template_event_dict['network'][tcolumn]
+        template_events = self.template_event_arrays()
+        cvec = template_events['network'][column]
+        tvec = template_events['network'][tcolumn]
         if window_size == 0:
             indices = numpy.arange(len(tvec))
         else:
             indices = findchirp_cluster_over_window(tvec, cvec, window_size)
         for key in self.template_event_dict:
-            self.template_event_dict[key] = numpy.take(
-                self.template_event_dict[key], indices)
+            self.template_event_dict[key].append(
+                numpy.take(template_events[key], indices))
 
     def add_template_network_events(self, columns, vectors):
         """ Add a vector indexed """
@@ -622,7 +891,7 @@ class EventManagerCoherent(EventManagerMultiDetBase):
                     new_events[c] = v.numpy()
                 else:
                     new_events[c] = v
-        self.template_events = numpy.append(self.template_events, new_events)
+        self.template_events.append(new_events)
 
     def add_template_events_to_network(self, columns, vectors):
         """ Add a vector indexed """
@@ -651,8 +920,7 @@ class EventManagerCoherent(EventManagerMultiDetBase):
         f = fw(outname)
         # Output network stuff
         f.prefix = 'network'
-        network_events = numpy.array([e for e in self.network_events],
-                                     dtype=self.network_event_dtype)
+        network_events = self.network_events.data()
         f['event_id'] = network_events['event_id']
         f['coherent_snr'] = network_events['coherent_snr']
         f['reweighted_snr'] = network_events['reweighted_snr']
@@ -794,12 +1062,13 @@ class EventManagerCoherent(EventManagerMultiDetBase):
         existing_events_mask = {}
         new_template_event_mask = {}
         existing_template_event_mask = {}
+        template_events = self.template_event_arrays()
         for i, ifo in enumerate(self.ifos):
             ifo_events = numpy.where(self.events['ifo'] == i)
             existing_times[ifo] = self.events['time_index'][ifo_events]
-            new_times[ifo] = self.template_event_dict[ifo]['time_index']
+            new_times[ifo] = template_events[ifo]['time_index']
             existing_template_id[ifo] = self.events['template_id'][ifo_events]
-            new_template_id[ifo] = self.template_event_dict[ifo]['template_id']
+            new_template_id[ifo] = template_events[ifo]['template_id']
             # This is true for each existing event that has the same time index
             # and template id as a template trigger.
             existing_events_mask[ifo] = numpy.argwhere(
@@ -828,37 +1097,32 @@ class EventManagerCoherent(EventManagerMultiDetBase):
                                          self.event_index[ifo] + num_events)
             # Every template event that corresponds to a new trigger gets a new
             # id. Triggers that have been found before are not saved.
-            self.template_event_dict[ifo]['event_id'][
+            template_events[ifo]['event_id'][
                 new_template_event_mask[ifo]] = new_event_ids
-            self.template_event_dict['network'][ifo + '_event_id'][
+            template_events['network'][ifo + '_event_id'][
                 new_template_event_mask[ifo]] = new_event_ids
             # Template events that have been found before get the event id of
             # the first time they were found.
-            self.template_event_dict['network'][ifo + '_event_id'][
+            template_events['network'][ifo + '_event_id'][
                   existing_template_event_mask[ifo]] = \
                 self.events[self.events['ifo'] == i][
                   existing_events_mask[ifo]]['event_id']
             self.event_index[ifo] = self.event_index[ifo] + num_events
 
         # Add the network event ids for the events with this template.
-        num_events = len(self.template_event_dict['network'])
+        num_events = len(template_events['network'])
         new_event_ids = numpy.arange(self.event_index['network'],
                                      self.event_index['network'] + num_events)
         self.event_index['network'] = self.event_index['network'] + num_events
-        self.template_event_dict['network']['event_id'] = new_event_ids
+        template_events['network']['event_id'] = new_event_ids
         # Move template events for each ifo to the events list
         for ifo in self.ifos:
             self.events = numpy.append(
                 self.events,
-                self.template_event_dict[ifo][new_template_event_mask[ifo]]
+                template_events[ifo][new_template_event_mask[ifo]]
             )
-            self.template_event_dict[ifo] = \
-                                        numpy.array([], dtype=self.event_dtype)
         # Move the template events for the network to the network events list
-        self.network_events = numpy.append(self.network_events,
-                                   self.template_event_dict['network'])
-        self.template_event_dict['network'] = \
-                                numpy.array([], dtype=self.network_event_dtype)
+        self.network_events.append(template_events['network'])
 
 
 class EventManagerMultiDet(EventManagerMultiDetBase):
@@ -879,12 +1143,13 @@ class EventManagerMultiDet(EventManagerMultiDetBase):
 
     def finalize_template_events(self, perform_coincidence=True,
                                  coinc_window=0.0):
+        template_events = self.template_event_arrays()
         # Set ids
         for ifo in self.ifos:
-            num_events = len(self.template_event_dict[ifo])
+            num_events = len(template_events[ifo])
             new_event_ids = numpy.arange(self.event_index,
                                          self.event_index+num_events)
-            self.template_event_dict[ifo]['event_id'] = new_event_ids
+            template_events[ifo]['event_id'] = new_event_ids
             self.event_index = self.event_index+num_events
 
         if perform_coincidence:
@@ -893,9 +1158,9 @@ class EventManagerMultiDet(EventManagerMultiDetBase):
                 raise ValueError(err_msg)
             ifo1 = self.ifos[0]
             ifo2 = self.ifos[1]
-            end_times1 = self.template_event_dict[ifo1]['time_index'] /\
+            end_times1 = template_events[ifo1]['time_index'] /\
               float(self.opt.sample_rate[ifo1]) + self.opt.gps_start_time[ifo1]
-            end_times2 = self.template_event_dict[ifo2]['time_index'] /\
+            end_times2 = template_events[ifo2]['time_index'] /\
               float(self.opt.sample_rate[ifo2]) + self.opt.gps_start_time[ifo2]
             light_travel_time = Detector(ifo1).light_travel_time_to_detector(
                                                                 Detector(ifo2))
@@ -908,19 +1173,21 @@ class EventManagerMultiDet(EventManagerMultiDetBase):
                                                         coinc_window)
                 if len(idx_list1):
                     for idx1, idx2 in zip(idx_list1, idx_list2):
-                        event1 = self.template_event_dict[ifo1][idx1]
-                        event2 = self.template_event_dict[ifo2][idx2]
+                        event1 = template_events[ifo1][idx1]
+                        event2 = template_events[ifo2][idx2]
                         self.coinc_list.append((event1, event2))
         for ifo in self.ifos:
-            self.events = numpy.append(self.events,
-                                       self.template_event_dict[ifo])
-            self.template_event_dict[ifo] = numpy.array([],
-                                                        dtype=self.event_dtype)
+            self.accumulate.append(template_events[ifo])
 
     def write_events(self, outname):
         """ Write the found events to a sngl inspiral table
         """
         self.make_output_dir(outname)
+        # Gather the events of the templates finalized since the last write
+        if len(self.accumulate):
+            self.events = numpy.concatenate([self.events,
+                                             self.accumulate.data()])
+            self.accumulate.clear()
 
         if '.hdf' in outname:
             self.write_to_hdf(outname)
@@ -1061,4 +1328,6 @@ class EventManagerMultiDet(EventManagerMultiDetBase):
 __all__ = ['threshold_and_cluster', 'findchirp_cluster_over_window',
            'threshold', 'cluster_reduce', 'ThresholdCluster',
            'threshold_real_numpy', 'threshold_only',
-           'EventManager', 'EventManagerMultiDet', 'EventManagerCoherent']
+           'chisq_threshold_mask', 'loudest_in_bins',
+           'EventBuffer', 'EventManager', 'EventManagerMultiDet',
+           'EventManagerCoherent']
@@ -469,6 +469,171 @@ class MatchedFilterControl(object):
             raise ValueError("Invalid upsample method")
 
 
+class BatchMatchedFilterControl(object):
+    """Matched filter a batch of equal-length templates with a single
+    batched correlation and inverse FFT per data segment.
+    """
+    def __init__(self, low_frequency_cutoff, high_frequency_cutoff,
+                 snr_threshold, tlen, delta_f, dtype, segment_list, nbatch,
+                 use_cluster, cluster_function='symmetric'):
+        """ Create a batched matched filter engine.
+
+        Parameters
+        ----------
+        low_frequency_cutoff : {None, float}, optional
+            The frequency to begin the filter calculation. If None, begin at the
+            first frequency after DC.
+        high_frequency_cutoff : {None, float}, optional
+            The frequency to stop the filter calculation. If None, continue to the
+            the nyquist frequency.
+        snr_threshold : float
+            The minimum snr to return when filtering
+        tlen : int
+            The length of each template and data segment in the time domain.
+        delta_f : float
+            The frequency resolution of the templates and data segments.
+        dtype : complex64
+            The dtype of the templates. Only complex64 is supported by the
+            batched correlation.
+        segment_list : list
+            List of FrequencySeries that are the Fourier-transformed data segments
+        nbatch : int
+            The number of templates to filter at once. The templates must be
+            written into the memory given by the `template_mem` attribute,
+            (e.g. by setting it as the 'out' parameter of waveform.FilterBank).
+        use_cluster : boolean
+            If true, cluster triggers above threshold using a window; otherwise,
+            only apply a threshold.
+        cluster_function : {symmetric, str}, optional
+            Which method is used to cluster triggers over time. If 'findchirp', a
+            sliding forward window; if 'symmetric', each window's peak is compared
+            to the windows before and after it, and only kept as a trigger if larger
+            than both.
+        """
+        self.tlen = tlen
+        self.delta_f = delta_f
+        self.delta_t = 1.0/(self.delta_f * self.tlen)
+        self.dtype = dtype
+        self.nbatch = int(nbatch)
+        self.snr_threshold = snr_threshold
+        self.flow = low_frequency_cutoff
+        self.fhigh = high_frequency_cutoff
+        if cluster_function not in ['symmetric', 'findchirp']:
+            raise ValueError("BatchMatchedFilter: 'cluster_function' must be either 'symmetric' or 'findchirp'")
+        self.use_cluster = use_cluster
+        self.cluster_function = cluster_function
+        self.segments = segment_list
+
+        # One contiguous block of memory for each of the templates, the
+        # correlation vectors and the snr time series; each row is one template
+        size = self.tlen * self.nbatch
+        self.template_mem = zeros(size, dtype=self.dtype)
+        self.corr_mem = zeros(size, dtype=self.dtype)
+        self.snr_mem = zeros(size, dtype=self.dtype)
+
+        self.htildes, self.corrs, self.snrs = [], [], []
+        for i in range(self.nbatch):
+            row = slice(i * self.tlen, (i + 1) * self.tlen)
+            self.htildes.append(self.template_mem[row])
+            self.corrs.append(self.corr_mem[row])
+            self.snrs.append(self.snr_mem[row])
+
+        self.kmin, self.kmax = get_cutoff_indices(self.flow, self.fhigh,
+                                                  self.delta_f, self.tlen)
+        corr_slice = slice(self.kmin, self.kmax)
+        self.correlator = BatchCorrelator([h[corr_slice] for h in self.htildes],
+                                          [c[corr_slice] for c in self.corrs],
+                                          self.kmax - self.kmin)
+        self.ifft = IFFT(self.corr_mem, self.snr_mem,
+                         nbatch=self.nbatch, size=self.tlen)
+
+        # The thresholding/clustering operations are created as needed for
+        # each row and distinct analysis slice (usually shared by all segments)
+        self.threshold_and_clusterers = {}
+
+    def _threshold_and_cluster(self, row, analyze, threshold, window):
+        key = (row, analyze.start, analyze.stop)
+        if key not in self.threshold_and_clusterers:
+            self.threshold_and_clusterers[key] = \
+                events.ThresholdCluster(self.snrs[row][analyze])
+        return self.threshold_and_clusterers[key].threshold_and_cluster(
+            threshold, window)
+
+    def matched_filter_and_cluster(self, segnum, template_norms, windows,
+                                   rows=None, epoch=None):
+        """ Filter the current batch of templates against a single segment.
+
+        This is a generator. For each template row which has points above
+        threshold it yields the row index, followed by the same values
+        that `MatchedFilterControl.matched_filter_and_cluster` returns for
+        a single template. The yielded values are views into memory that is
+        reused, so they should be consumed before the generator is advanced.
+
+        Parameters
+        ----------
+        segnum : int
+            Index into the list of segments at construction against which
+            to filter.
+        template_norms : list of floats
+            The htilde, template normalization factor of each template row.
+        windows : list of ints
+            Size of the window over which to cluster triggers, in samples,
+            for each template row.
+        rows : {None, list of ints}, optional
+            Only threshold and cluster these template rows. If None, use the
+            first len(template_norms) rows.
+        epoch : {None, LIGOTimeGPS}, optional
+            The epoch of the returned snr time series.
+
+        Yields
+        ------
+        row : int
+            The template row index.
+        snr : TimeSeries
+            A time series containing the complex snr.
+        norm : float
+            The normalization of the complex snr.
+        corrrelation: FrequencySeries
+            A frequency series containing the correlation vector.
+        idx : Array
+            List of indices of the triggers.
+        snrv : Array
+            The snr values at the trigger locations.
+        """
+        if rows is None:
+            rows = range(len(template_norms))
+
+        stilde = self.segments[segnum]
+        self.correlator.execute(stilde[self.kmin:self.kmax])
+        self.ifft.execute()
+
+        for row in rows:
+            norm = (4.0 * self.delta_f) / sqrt(template_norms[row])
+            threshold = self.snr_threshold / norm
+            if self.use_cluster and self.cluster_function == 'symmetric':
+                snrv, idx = self._threshold_and_cluster(
+                    row, stilde.analyze, threshold, windows[row])
+            elif self.use_cluster:
+                idx, snrv = events.threshold(self.snrs[row][stilde.analyze],
+                                             threshold)
+                idx, snrv = events.cluster_reduce(idx, snrv, windows[row])
+            else:
+                idx, snrv = events.threshold_only(
+                    self.snrs[row][stilde.analyze], threshold)
+
+            if len(idx) == 0:
+                continue
+
+            logging.info("%s points above threshold in batch row %s",
+                         len(idx), row)
+
+            snr = TimeSeries(self.snrs[row], epoch=epoch,
+                             delta_t=self.delta_t, copy=False)
+            corr = FrequencySeries(self.corrs[row], delta_f=self.delta_f,
+                                   copy=False)
+            yield row, snr, norm, corr, idx, snrv
+
+
 def compute_max_snr_over_sky_loc_stat(hplus, hcross, hphccorr,
                                                       hpnorm=None, hcnorm=None,
                                                       out=None, thresh=0,
@@ -1567,6 +1732,10 @@ class LiveBatchMatchedFilter(object):
                 e += psize
             self.corr.append(BatchCorrelator(tgroup, [t.cout for t in tgroup], len(tgroup[0])))
 
+        # Per group values which are filled in as they are first needed
+        self.group_sigmasq = [(None, None)] * len(self.tgroups)
+        self.group_params = [None] * len(self.tgroups)
+
     def set_data(self, data):
         """Set the data reader object to use"""
         self.data = data
@@ -1604,53 +1773,103 @@ class LiveBatchMatchedFilter(object):
 
             tmp = veto_info
             veto_info = [tmp[i] for i in sort]
+            result = self._process_vetoes(result, veto_info)
 
-        result = self._process_vetoes(result, veto_info)
         return result
 
-    def _process_vetoes(self, results, veto_info):
-        """Calculate signal based vetoes"""
-        chisq = numpy.array(numpy.zeros(len(veto_info)), numpy.float32, ndmin=1)
-        dof = numpy.array(numpy.zeros(len(veto_info)), numpy.uint32, ndmin=1)
-        sg_chisq = numpy.array(numpy.zeros(len(veto_info)), numpy.float32,
-                               ndmin=1)
+    def _process_vetoes(self, results, veto_info, correlated=False):
+        """Calculate signal based vetoes
+
+        Parameters
+        ----------
+        results: dict of arrays
+            The triggers to calculate the vetoes for.
+        veto_info: list of tuples
+            For each trigger, the unnormalized peak SNR, the SNR
+            normalization, the peak index, the template, the data and the
+            index of the template group.
+        correlated: {False, bool}
+            If True, the correlation of each template with the data is still
+            held in its `cout` memory and is not calculated again.
+        """
+        num = len(veto_info)
+        chisq = numpy.zeros(num, dtype=numpy.float32)
+        dof = numpy.zeros(num, dtype=numpy.uint32)
+        sg_chisq = numpy.zeros(num, dtype=numpy.float32)
         results['chisq'] = chisq
         results['chisq_dof'] = dof
         results['sg_chisq'] = sg_chisq
 
-        keep = []
-        for i, (snrv, norm, l, htilde, stilde) in enumerate(veto_info):
-            correlate(htilde, stilde, htilde.cout)
-            c, d = self.power_chisq.values(htilde.cout, snrv,
-                                           norm, stilde.psd, [l], htilde)
-            chisq[i] = c[0] / d[0]
-            dof[i] = d[0]
-
-            sgv = self.sg_chisq.values(stilde, htilde, stilde.psd,
-                                       snrv, norm, c, d, [l])
-            if sgv is not None:
-                sg_chisq[i] = sgv[0]
-
-            if self.newsnr_threshold:
-                newsnr = ranking.newsnr(results['snr'][i], chisq[i])
-                if newsnr >= self.newsnr_threshold:
-                    keep.append(i)
+        # Work through the triggers one template group at a time. Groups of
+        # the same size share their correlation memory, so the correlations
+        # of a group are only valid until the next one is correlated.
+        gids = numpy.array([v[5] for v in veto_info], dtype=int)
+        for gid in numpy.unique(gids):
+            idx = numpy.flatnonzero(gids == gid)
+            if not correlated:
+                htildes = [veto_info[i][3] for i in idx]
+                corr = BatchCorrelator(htildes, [h.cout for h in htildes],
+                                       len(htildes[0]))
+                corr.execute(veto_info[idx[0]][4])
+
+            # The power chisq of all triggers of the group are calculated
+            # together
+            group = [veto_info[i] for i in idx]
+            cs, ds = self.power_chisq.values_batch(
+                [v[3].cout for v in group], [v[0] for v in group],
+                [v[1] for v in group], group[0][4].psd,
+                [[v[2]] for v in group], [v[3] for v in group])
+
+            for i, c, d in zip(idx, cs, ds):
+                snrv, norm, l, htilde, stilde, _ = veto_info[i]
+                chisq[i] = c[0] / d[0]
+                dof[i] = d[0]
+
+                sgv = self.sg_chisq.values(stilde, htilde, stilde.psd,
+                                           snrv, norm, c, d, [l])
+                if sgv is not None:
+                    sg_chisq[i] = sgv[0]
 
         if self.newsnr_threshold:
-            keep = numpy.array(keep, dtype=numpy.uint32)
+            newsnr = ranking.newsnr(results['snr'], chisq)
+            keep = newsnr >= self.newsnr_threshold
             for key in results:
                 results[key] = results[key][keep]
 
         return results
 
+    def _group_sigmasq(self, gid, psd):
+        """Return the sigmasq of every template in a group
+
+        The values only change with the PSD, so they are cached for each
+        group and calculated again only when the PSD is replaced.
+        """
+        cached_psd, sigmasq = self.group_sigmasq[gid]
+        if cached_psd is not psd:
+            sigmasq = numpy.array([h.sigmasq(psd) for h in self.tgroups[gid]])
+            self.group_sigmasq[gid] = (psd, sigmasq)
+        return sigmasq
+
+    def _group_params(self, gid):
+        """Return the template parameters of a group as arrays"""
+        if self.group_params[gid] is None:
+            tgroup = self.tgroups[gid]
+            params = {key: numpy.array([h.params[key] for h in tgroup])
+                      for key in tgroup[0].params.dtype.names}
+            params['template_id'] = numpy.array([h.id for h in tgroup],
+                                                dtype=numpy.uint64)
+            self.group_params[gid] = params
+        return self.group_params[gid]
+
     def _process_batch(self):
         """Process only a single batch group of data"""
         if self.block_id == len(self.tgroups):
             return None, None
 
-        tgroup = self.tgroups[self.block_id]
-        psize = self.chunk_tsamples[self.block_id]
-        mid = self.mids[self.block_id]
+        gid = self.block_id
+        tgroup = self.tgroups[gid]
+        psize = self.chunk_tsamples[gid]
+        mid = self.mids[gid]
         stilde = self.data.overwhitened_data(tgroup[0].delta_f)
         psd = stilde.psd
 
@@ -1659,73 +1878,52 @@ class LiveBatchMatchedFilter(object):
 
         seg = slice(valid_start, valid_end)
 
-        self.corr[self.block_id].execute(stilde)
+        self.corr[gid].execute(stilde)
         self.ifts[mid].execute()
 
         self.block_id += 1
 
-        snr = numpy.zeros(len(tgroup), dtype=numpy.complex64)
-        time = numpy.zeros(len(tgroup), dtype=numpy.float64)
-        templates = numpy.zeros(len(tgroup), dtype=numpy.uint64)
-        sigmasq = numpy.zeros(len(tgroup), dtype=numpy.float32)
-
-        time[:] = self.data.start_time
-
-        result = {}
-        tkeys = tgroup[0].params.dtype.names
-        for key in tkeys:
-            result[key] = []
-
-        veto_info = []
-
-        # Find the peaks in our SNR times series from the various templates
-        i = 0
-        for htilde in tgroup:
-            l = htilde.out[seg].abs_arg_max()
-
-            sgm = htilde.sigmasq(psd)
-            norm = 4.0 * htilde.delta_f / (sgm ** 0.5)
-
-            l += valid_start
-            snrv = numpy.array([htilde.out[l]])
-
-            # If nothing is above threshold we can exit this template
-            s = abs(snrv[0]) * norm
-            if s < self.snr_threshold:
-                continue
-
-            time[i] += float(l - valid_start) / self.data.sample_rate
-
-            # We have an SNR so high that we will drop the entire analysis
-            # of this chunk of time!
-            if self.snr_abort_threshold is not None and s > self.snr_abort_threshold:
-                logging.info("We are seeing some *really* high SNRs, lets"
-                             " assume they aren't signals and just give up")
-                return False, []
-
-            veto_info.append((snrv, norm, l, htilde, stilde))
-
-            snr[i] = snrv[0] * norm
-            sigmasq[i] = sgm
-            templates[i] = htilde.id
-            if not hasattr(htilde, 'dict_params'):
-                htilde.dict_params = {}
-                for key in tkeys:
-                    htilde.dict_params[key] = htilde.params[key]
-
-            for key in tkeys:
-                result[key].append(htilde.dict_params[key])
-            i += 1
-
-
-        result['snr'] = abs(snr[0:i])
-        result['coa_phase'] = numpy.angle(snr[0:i])
-        result['end_time'] = time[0:i]
-        result['template_id'] = templates[0:i]
-        result['sigmasq'] = sigmasq[0:i]
-
-        for key in tkeys:
-            result[key] = numpy.array(result[key])
+        # Find the peaks in the SNR time series of all the templates at once.
+        # Each row of the group's SNR memory holds one template.
+        snrs = self.out_mem[mid].numpy().reshape(len(tgroup), psize)
+        power = snrs.real[:, seg] ** 2.
+        power += snrs.imag[:, seg] ** 2.
+        peaks = power.argmax(axis=1) + valid_start
+        del power
+
+        snrv = snrs[numpy.arange(len(tgroup)), peaks]
+        sigmasq = self._group_sigmasq(gid, psd)
+        norm = 4.0 * tgroup[0].delta_f / (sigmasq ** 0.5)
+        snr = abs(snrv) * norm
+
+        # Only templates with a peak above threshold produce a trigger
+        idx = numpy.flatnonzero(snr >= self.snr_threshold)
+
+        # We have an SNR so high that we will drop the entire analysis
+        # of this chunk of time!
+        if self.snr_abort_threshold is not None and len(idx) and \
+                snr[idx].max() > self.snr_abort_threshold:
+            logging.info("We are seeing some *really* high SNRs, lets"
+                         " assume they aren't signals and just give up")
+            return False, []
+
+        params = self._group_params(gid)
+        result = {key: params[key][idx] for key in params}
+        snrc = (snrv[idx] * norm[idx]).astype(numpy.complex64)
+        result['snr'] = abs(snrc)
+        result['coa_phase'] = numpy.angle(snrc)
+        result['end_time'] = float(self.data.start_time) + \
+            (peaks[idx] - valid_start) / float(self.data.sample_rate)
+        result['sigmasq'] = sigmasq[idx].astype(numpy.float32)
+
+        veto_info = [(snrv[i:i+1], norm[i], peaks[i], tgroup[i], stilde, gid)
+                     for i in idx]
+
+        # Without a limit on the number of triggers, every trigger gets its
+        # vetoes, so calculate them while the correlations are still valid
+        if not self.max_triggers_in_batch:
+            result = self._process_vetoes(result, veto_info, correlated=True)
+            veto_info = []
 
         return result, veto_info
 
@@ -1894,7 +2092,8 @@ def compute_followup_snr_series(data_reader, htilde, trig_time,
 __all__ = ['match', 'matched_filter', 'sigmasq', 'sigma', 'get_cutoff_indices',
            'sigmasq_series', 'make_frequency_series', 'overlap',
            'overlap_cplx', 'matched_filter_core', 'correlate',
-           'MatchedFilterControl', 'LiveBatchMatchedFilter',
+           'MatchedFilterControl', 'BatchMatchedFilterControl',
+           'LiveBatchMatchedFilter',
            'MatchedFilterSkyMaxControl', 'MatchedFilterSkyMaxControlNoPhase',
            'compute_max_snr_over_sky_loc_stat_no_phase',
            'compute_max_snr_over_sky_loc_stat',
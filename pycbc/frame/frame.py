@@ -349,7 +349,7 @@ def query_and_read_frame(frame_type, channels, start_time, end_time,
 
 __all__ = ['read_frame', 'frame_paths',
            'datafind_connection',
-           'query_and_read_frame']
+           'query_and_read_frame', 'SlidingBuffer']
 
 def write_frame(location, channels, timeseries):
     """Write a list of time series to a single frame file.
@@ -411,6 +411,70 @@ def write_frame(location, channels, timeseries):
     # write frame
     lalframe.FrameWrite(frame, location)
 
+class SlidingBuffer(object):
+
+    """A fixed length window of a time series that slides forward in time
+
+    The samples are kept in a backing array which is longer than the window.
+    Sliding the window forward only moves its start and zeros the samples
+    entering it, so the window is always a contiguous view and nothing is
+    copied. When the window reaches the end of the backing array its
+    contents are moved back to the front, which happens once every
+    `slack / num` advances of `num` samples.
+    """
+
+    def __init__(self, size, delta_t, epoch, dtype=numpy.float64, slack=None):
+        """
+        Parameters
+        ----------
+        size: int
+            Number of samples in the window
+        delta_t: float
+            Sample spacing of the window in seconds
+        epoch: LIGOTimeGPS or float
+            Start time of the window
+        dtype: {numpy.float64, dtype}, Optional
+            Data type of the samples
+        slack: {None, int}, Optional
+            Number of additional samples allocated beyond the window. By
+            default this is the size of the window.
+        """
+        self.size = int(size)
+        slack = self.size if slack is None else int(slack)
+        self._store = numpy.zeros(self.size + slack, dtype=dtype)
+        self._pos = 0
+        self.window = TimeSeries(self._store[:self.size], delta_t=delta_t,
+                                 epoch=epoch, copy=False)
+
+    def advance(self, num):
+        """Slide the window forward
+
+        Parameters
+        ----------
+        num: int
+            Number of samples to move the window by. The samples entering
+            the window are set to zero.
+
+        Returns
+        -------
+        window: TimeSeries
+            View of the new window, starting `num` samples later.
+        """
+        num = int(num)
+        epoch = self.window.start_time + num * self.window.delta_t
+        keep = max(self.size - num, 0)
+        if self._pos + self.size + num > len(self._store):
+            start = self._pos + self.size - keep
+            self._store[:keep] = self._store[start:start + keep].copy()
+            self._pos = 0
+        else:
+            self._pos += num
+        self._store[self._pos + keep:self._pos + self.size] = 0
+        self.window = TimeSeries(self._store[self._pos:self._pos + self.size],
+                                 delta_t=self.window.delta_t, epoch=epoch,
+                                 copy=False)
+        return self.window
+
 class DataBuffer(object):
 
     """A linear buffer that acts as a FILO for reading in frame data
@@ -450,10 +514,9 @@ class DataBuffer(object):
         self.channel_type, self.raw_sample_rate = self._retrieve_metadata(self.stream, self.channel_name)
 
         raw_size = self.raw_sample_rate * max_buffer
-        self.raw_buffer = TimeSeries(zeros(raw_size, dtype=dtype),
-                                     copy=False,
-                                     epoch=start_time - max_buffer,
-                                     delta_t=1.0/self.raw_sample_rate)
+        self._raw = SlidingBuffer(raw_size, 1.0/self.raw_sample_rate,
+                                  start_time - max_buffer, dtype=dtype)
+        self.raw_buffer = self._raw.window
 
     def update_cache(self):
         """Reset the lal cache. This can be used to update the cache if the
@@ -528,9 +591,8 @@ class DataBuffer(object):
         blocksize: int
             The number of seconds to attempt to read from the channel
         """
-        self.raw_buffer.roll(-int(blocksize * self.raw_sample_rate))
+        self.raw_buffer = self._raw.advance(blocksize * self.raw_sample_rate)
         self.read_pos += blocksize
-        self.raw_buffer.start_time += blocksize
 
     def advance(self, blocksize):
         """Add blocksize seconds more to the buffer, push blocksize seconds
@@ -543,10 +605,9 @@ class DataBuffer(object):
         """
         ts = self._read_frame(blocksize)
 
-        self.raw_buffer.roll(-len(ts))
+        self.raw_buffer = self._raw.advance(len(ts))
         self.raw_buffer[-len(ts):] = ts[:]
         self.read_pos += blocksize
-        self.raw_buffer.start_time += blocksize
         return ts
 
     def update_cache_by_increment(self, blocksize):
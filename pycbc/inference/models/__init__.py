@@ -20,6 +20,9 @@ assuming various noise models.
 """
 
 
+import functools
+import numpy
+
 from .analytic import (TestEggbox, TestNormal, TestRosenbrock, TestVolcano,
                        TestPrior)
 from .gaussian_noise import GaussianNoise
@@ -47,6 +50,11 @@ def _call_global_model_logprior(*args, **kwds):
     return _global_instance(*args, callstat='logprior', **kwds)
 
 
+def _call_global_model_batch(*args, **kwds):
+    """Private function for calling the global model on a batch of points."""
+    return _global_instance.call_batch(*args, **kwds)
+
+
 class CallModel(object):
     """Wrapper class for calling models from a sampler.
 
@@ -149,6 +157,151 @@ class CallModel(object):
         else:
             return val
 
+    # stats that can be computed from the loglr, and whether they need the
+    # prior
+    _batch_callstats = {'loglr': False, 'loglikelihood': False,
+                        'logplr': True, 'logposterior': True}
+
+    def call_batch(self, param_values, callstat=None, return_all_stats=None,
+                   return_logprior=False):
+        """Evaluates the call function at several points.
+
+        If the ``callstat`` depends on the log likelihood ratio and the model
+        has a ``loglr_batch`` method, the likelihood ratio of all of the
+        points is computed in one call to it. As when calling a single point,
+        the likelihood is not evaluated at points where the prior is
+        ``-inf``. Otherwise, this is the same as calling each point in turn.
+
+        Parameters
+        ----------
+        param_values : list of lists of float
+            The parameter values of each point. Each entry is assumed to be
+            in the same order as ``model.sampling_params``.
+        callstat : str, optional
+            Specify which statistic to call. Default is to call whatever self's
+            ``callstat`` is set to.
+        return_all_stats : bool, optional
+            Whether or not to return all stats in addition to the ``callstat``
+            value. Default is to use self's ``return_all_stats``.
+        return_logprior : bool, optional
+            Also return the log prior of each point, as a tuple of what would
+            otherwise be returned and the log prior. The ``callstat`` is then
+            not evaluated at points where the prior is ``-inf``, and is set
+            to ``-inf`` there. This is what samplers that take the prior and
+            the likelihood separately, like ``emcee_pt``, expect. Default is
+            False.
+
+        Returns
+        -------
+        list :
+            What calling this class with each set of parameter values would
+            return.
+        """
+        if callstat is None:
+            callstat = self.callstat
+        if return_all_stats is None:
+            return_all_stats = self.return_all_stats
+        if callstat not in self._batch_callstats or \
+                not hasattr(self.model, 'loglr_batch'):
+            results = []
+            for pvals in param_values:
+                if return_logprior:
+                    logp = self(pvals, callstat='logprior',
+                                return_all_stats=False)
+                    if logp == -numpy.inf:
+                        results.append((-numpy.inf, logp))
+                        continue
+                val = self(pvals, callstat=callstat,
+                           return_all_stats=return_all_stats)
+                results.append((val, logp) if return_logprior else val)
+            return results
+
+        model = self.model
+        params = [dict(zip(model.sampling_params, pvals))
+                  for pvals in param_values]
+        # evaluate the prior first, keeping the state of each point
+        states = []
+        for pvals in params:
+            model.update(**pvals)
+            if self._batch_callstats[callstat] or return_logprior:
+                logp = model.logprior
+            else:
+                logp = 0.
+            states.append((model._current_params, model._current_stats,
+                           logp))
+        todo = [ii for ii, (_, _, logp) in enumerate(states)
+                if logp != -numpy.inf]
+        if todo:
+            _, batch_stats = model.loglr_batch([params[ii] for ii in todo])
+            for ii, bstats in zip(todo, batch_stats):
+                current_stats = states[ii][1]
+                for name in bstats.statnames:
+                    setattr(current_stats, name, getattr(bstats, name))
+
+        results = []
+        for current_params, current_stats, logp in states:
+            if return_logprior and logp == -numpy.inf:
+                results.append((-numpy.inf, logp))
+                continue
+            model._current_params = current_params
+            model._current_stats = current_stats
+            val = getattr(model, callstat)
+            if return_all_stats:
+                val = (val, model.get_current_stats())
+            results.append((val, logp) if return_logprior else val)
+        return results
+
+
+class BatchedModelPool(object):
+    """Provides a pool ``map`` that evaluates a model in batches.
+
+    Samplers map a function that evaluates the model at one point over the
+    points to evaluate. Passing an instance of this class as the sampler's
+    pool instead evaluates the points with ``CallModel.call_batch``,
+    splitting them into one batch per process of the given pool. The
+    function passed to ``map`` is assumed to be the sampler's wrapper around
+    the model call, and is not used.
+
+    If ``pool`` has more than one process, ``model_call`` must be set as the
+    module's ``_global_instance`` before the pool is created.
+
+    Parameters
+    ----------
+    model_call : CallModel
+        The model call to evaluate.
+    pool : pool, optional
+        The pool to distribute the batches over. If None, all points are
+        evaluated in this process.
+    nprocesses : int, optional
+        The number of processes in ``pool``. Default is 1.
+    return_logprior : bool, optional
+        Return the value and the log prior of each point, as
+        ``emcee_pt`` expects. See ``CallModel.call_batch``. Default is False.
+    """
+    def __init__(self, model_call, pool=None, nprocesses=1,
+                 return_logprior=False):
+        self.model_call = model_call
+        self.pool = pool
+        self.nprocesses = nprocesses
+        self.count = nprocesses
+        self.return_logprior = return_logprior
+
+    def map(self, func, items):
+        # pylint:disable=unused-argument
+        items = list(items)
+        if self.pool is None or self.nprocesses <= 1 or len(items) < 2:
+            return self.model_call.call_batch(
+                items, return_logprior=self.return_logprior)
+        nbatch = min(self.nprocesses, len(items))
+        bounds = numpy.linspace(0, len(items), nbatch + 1).astype(int)
+        batches = [items[start:end]
+                   for start, end in zip(bounds[:-1], bounds[1:])]
+        results = self.pool.map(
+            functools.partial(_call_global_model_batch,
+                              return_logprior=self.return_logprior),
+            batches)
+        return [r for batch in results for r in batch]
+
 
 def read_from_config(cp, **kwargs):
     """Initializes a model from the given config file.
@@ -134,6 +134,34 @@ class BaseDataModel(BaseModel):
         """Low-level function that calculates the loglr."""
         pass
 
+    def loglr_batch(self, params):
+        """Computes the log likelihood ratio at several parameter values.
+
+        This updates the model to each set of parameters in turn and calls
+        ``loglr``. Models that can evaluate many points at once more
+        efficiently should override this.
+
+        Parameters
+        ----------
+        params : list of dict
+            The parameter values of each point, as would be passed to
+            ``update``.
+
+        Returns
+        -------
+        loglrs : numpy.ndarray
+            The log likelihood ratio at each point.
+        stats : list of ModelStats
+            The stats that were calculated at each point.
+        """
+        loglrs = numpy.zeros(len(params))
+        stats = []
+        for ii, pvals in enumerate(params):
+            self.update(**pvals)
+            loglrs[ii] = self.loglr
+            stats.append(self._current_stats)
+        return loglrs, stats
+
     @property
     def logplr(self):
         """Returns the log of the prior-weighted likelihood ratio at the
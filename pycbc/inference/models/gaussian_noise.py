@@ -22,6 +22,7 @@ from six import add_metaclass
 import numpy
 
 from pycbc import filter as pyfilter
+from pycbc import transforms
 from pycbc.waveform import NoWaveformError
 from pycbc.waveform import generator
 from pycbc.types import Array, FrequencySeries
@@ -867,6 +868,82 @@ class GaussianNoise(BaseGaussianNoise):
         self._current_stats.loglikelihood = lr + self.lognl
         return float(lr)
 
+    def loglr_batch(self, params):
+        r"""Computes the log likelihood ratio at several parameter values.
+
+        The waveforms of all of the points are generated first. The inner
+        products against the whitened data of each detector are then
+        computed at once, as a matrix product with the stacked, whitened
+        waveforms. This gives the same values and stats as calling
+        ``loglr`` at each point.
+
+        Parameters
+        ----------
+        params : list of dict
+            The parameter values of each point, as would be passed to
+            ``update``.
+
+        Returns
+        -------
+        loglrs : numpy.ndarray
+            The log likelihood ratio at each point.
+        stats : list of ModelStats
+            The stats that were calculated at each point.
+        """
+        stats = []
+        waveforms = []
+        for pvals in params:
+            self.update(**pvals)
+            cparams = self.current_params
+            if self.waveform_transforms is not None:
+                cparams = transforms.apply_transforms(
+                    cparams, self.waveform_transforms, inverse=False)
+            try:
+                wfs = self.waveform_generator.generate(**cparams)
+            except NoWaveformError:
+                wfs = None
+                self._current_stats.loglr = self._nowaveform_loglr()
+            stats.append(self._current_stats)
+            waveforms.append(wfs)
+
+        loglrs = numpy.zeros(len(params))
+        generated = [ii for ii, wfs in enumerate(waveforms) if wfs is not None]
+        loglrs[[ii for ii, wfs in enumerate(waveforms) if wfs is None]] = \
+            -numpy.inf
+        if not generated:
+            return loglrs, stats
+
+        for det in self._data:
+            kmin = self._kmin[det]
+            kmax = self._kmax[det]
+            # stack the waveforms in the analyzed band, zero padding any that
+            # terminate before kmax
+            hs = numpy.zeros((len(generated), max(kmax - kmin, 0)),
+                             dtype=numpy.complex128)
+            for row, ii in enumerate(generated):
+                h = waveforms[ii][det]
+                hmax = min(len(h), kmax)
+                if kmin < hmax:
+                    hs[row, :hmax-kmin] = h.numpy()[kmin:hmax]
+            # whiten the waveforms
+            hs *= self._weight[det].numpy()[kmin:kmax]
+            # the inner products
+            d = self._whitened_data[det].numpy()[kmin:kmax]
+            cplx_hd = hs.dot(d.conj())  # <h, d>
+            hh = (hs.real**2 + hs.imag**2).sum(axis=1)  # <h, h>
+            cplx_loglr = cplx_hd - 0.5*hh
+            for row, ii in enumerate(generated):
+                setattr(stats[ii], '{}_optimal_snrsq'.format(det), hh[row])
+                setattr(stats[ii], '{}_cplx_loglr'.format(det),
+                        cplx_loglr[row])
+            loglrs[generated] += cplx_loglr.real
+
+        lognl = self._lognl()
+        for ii in generated:
+            stats[ii].loglr = loglrs[ii]
+            stats[ii].loglikelihood = loglrs[ii] + lognl
+        return loglrs, stats
+
     def det_cplx_loglr(self, det):
         """Returns the complex log likelihood ratio in the given detector.
 
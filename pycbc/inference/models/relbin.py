@@ -31,6 +31,7 @@ import numpy
 from scipy.interpolate import interp1d
 from scipy import special
 
+from pycbc import transforms
 from pycbc.waveform.spa_tmplt import spa_tmplt
 from pycbc.detector import Detector
 
@@ -255,72 +256,187 @@ class RelativeSPA(BaseGaussianNoise):
                          'b0': b0, 'b1': b1}
         return sdat
 
-    def waveform_ratio(self, p, htf, dtc=0.0):
-        """Calculate waveform ratio between template and fiducial
-        waveforms.
+    def sparse_waveforms(self, p):
+        """Generates the template at the bin edges for one or more points.
+
+        Parameters
+        ----------
+        p : dict
+            Dictionary giving the ``mass1``, ``mass2``, ``spin1z`` and
+            ``spin2z`` of each point as arrays.
+
+        Returns
+        -------
+        numpy.ndarray
+            Complex array of shape (number of points, number of bin edges)
+            containing the template at unit distance.
+        """
+        mass1, mass2, spin1z, spin2z = numpy.broadcast_arrays(
+            p['mass1'], p['mass2'], p['spin1z'], p['spin2z'])
+        hp = numpy.zeros((len(mass1), len(self.fedges)),
+                         dtype=numpy.complex128)
+        # the PN phasing coefficients come from lalsimulation one point at a
+        # time, so the rows are filled in turn
+        for ii in range(len(hp)):
+            hp[ii] = spa_tmplt(sample_points=self.fedges,
+                               mass1=mass1[ii], mass2=mass2[ii],
+                               spin1z=spin1z[ii], spin2z=spin2z[ii],
+                               distance=1., spin_order=-1, phase_order=-1)
+        return hp
+
+    def waveform_ratios(self, hp, htf, dtc=0.0):
+        """Calculate waveform ratios between template and fiducial
+        waveforms for one or more points.
+
+        Parameters
+        ----------
+        hp : numpy.ndarray
+            Templates at the bin edges, as returned by ``sparse_waveforms``.
+        htf : numpy.ndarray
+            Complex factor accounting for the antenna pattern, inclination
+            and distance of each point.
+        dtc : {0., numpy.ndarray}
+            Time shift of each point relative to the fiducial waveform.
+
+        Returns
+        -------
+        r0 : numpy.ndarray
+            The ratio at the center of each bin, for each point.
+        r1 : numpy.ndarray
+            The slope of the ratio in each bin, for each point.
         """
-        # generate template
-        hp = spa_tmplt(sample_points=self.fedges,
-                       mass1=p['mass1'], mass2=p['mass2'],
-                       spin1z=p['spin1z'], spin2z=p['spin2z'],
-                       distance=1., spin_order=-1, phase_order=-1)
-        htarget = numpy.array(hp)
+        htf = numpy.atleast_1d(htf)[:, None]
+        dtc = numpy.atleast_1d(dtc)[:, None]
         # apply antenna pattern, inclination, and distance factor
-        htarget *= htf
+        htarget = hp * htf
         # compute waveform ratio and timeshift
         shift = numpy.exp(-2.0j * numpy.pi * self.fedges * dtc)
         r = htarget / self.h00_sparse * shift
-        r0 = 0.5 * (r[:-1] + r[1:])
-        r1 = (r[1:] - r[:-1]) / (self.fedges[1:] - self.fedges[:-1])
-        return numpy.array([r0, r1], dtype=numpy.complex128)
+        r0 = 0.5 * (r[:, :-1] + r[:, 1:])
+        r1 = (r[:, 1:] - r[:, :-1]) / (self.fedges[1:] - self.fedges[:-1])
+        return r0, r1
 
-    def _loglr(self):
-        r"""Computes the log likelihood ratio,
+    def waveform_ratio(self, p, htf, dtc=0.0):
+        """Calculate waveform ratio between template and fiducial
+        waveforms.
+        """
+        hp = self.sparse_waveforms({k: numpy.atleast_1d(p[k]) for k in
+                                    ['mass1', 'mass2', 'spin1z', 'spin2z']})
+        r0, r1 = self.waveform_ratios(hp, htf, dtc=dtc)
+        return numpy.array([r0[0], r1[0]], dtype=numpy.complex128)
 
-        .. math::
+    def loglrs(self, p):
+        r"""Computes the log likelihood ratio at several points at once.
 
-            \log \mathcal{L}(\Theta) = \sum_i
-                \left<h_i(\Theta)|d_i\right> -
-                \frac{1}{2}\left<h_i(\Theta)|h_i(\Theta)\right>,
+        The templates of all points are generated once on the bin edges, and
+        their ratios to the fiducial waveform are contracted against the
+        summary data of each detector as (points x bins) arrays.
 
-        at the current parameter values :math:`\Theta`.
+        Parameters
+        ----------
+        p : dict
+            Dictionary giving the value of each model parameter at every
+            point, as arrays of the same length. Scalars are broadcast to all
+            points.
 
         Returns
         -------
-        float
-            The value of the log likelihood ratio.
+        numpy.ndarray
+            The log likelihood ratio of each point.
         """
-        # get model params
-        p = self.current_params.copy()
-        p.update(self.static_params)
-
-        llr = 0.
+        names = ['mass1', 'mass2', 'spin1z', 'spin2z', 'ra', 'dec',
+                 'polarization', 'tc', 'inclination', 'distance']
+        p = dict(zip(names, numpy.broadcast_arrays(
+            *[numpy.atleast_1d(numpy.asarray(p[k], dtype=float))
+              for k in names])))
+        hp = self.sparse_waveforms(p)
+        ip = numpy.cos(p['inclination'])
+        ic = 0.5 * (1.0 + ip * ip)
+        llr = numpy.zeros(len(hp))
         for ifo in self.data:
             # get detector antenna pattern
             fp, fc = self.det[ifo].antenna_pattern(p['ra'], p['dec'],
                                                    p['polarization'],
                                                    p['tc'])
-            ip = numpy.cos(p['inclination'])
-            ic = 0.5 * (1.0 + ip * ip)
             htf = (fp * ip + 1.0j * fc * ic) / p['distance']
             # get timeshift relative to fiducial waveform
             dt = self.det[ifo].time_delay_from_earth_center(p['ra'], p['dec'],
                                                             p['tc'])
             dtc = p['tc'] + dt - self.end_time - self.ta[ifo]
-            # generate template and calculate waveform ratio
-            r0, r1 = self.waveform_ratio(p, htf, dtc=dtc)
+            # calculate waveform ratios
+            r0, r1 = self.waveform_ratios(hp, htf, dtc=dtc)
+            sdat = self.sdat[ifo]
             # <h, d> is real part of sum over bins of A0r0 + A1r1
-            hd = numpy.sum(self.sdat[ifo]['a0'] * r0
-                           + self.sdat[ifo]['a1'] * r1).real
+            hd = (r0.dot(sdat['a0']) + r1.dot(sdat['a1'])).real
             # marginalize over phase
             hd = numpy.log(special.i0e(hd)) + abs(hd)
             # <h, h> is real part of sum over bins of B0|r0|^2 + 2B1Re(r1r0*)
-            hh = numpy.sum(self.sdat[ifo]['b0'] * numpy.absolute(r0) ** 2.
-                           + 2. * self.sdat[ifo]['b1']
-                           * (r1 * numpy.conjugate(r0)).real).real
+            hh = ((numpy.absolute(r0) ** 2.).dot(sdat['b0'])
+                  + 2. * (r1 * numpy.conjugate(r0)).real.dot(sdat['b1'])).real
             # increment loglr
             llr += (hd - 0.5 * hh)
-        return float(llr)
+        return llr
+
+    def loglr_batch(self, params):
+        """Computes the log likelihood ratio at several parameter values.
+
+        The waveform transforms are applied to each point, and all of the
+        points are then evaluated at once using ``loglrs``.
+
+        Parameters
+        ----------
+        params : list of dict
+            The parameter values of each point, as would be passed to
+            ``update``.
+
+        Returns
+        -------
+        loglrs : numpy.ndarray
+            The log likelihood ratio at each point.
+        stats : list of ModelStats
+            The stats that were calculated at each point.
+        """
+        stats = []
+        points = []
+        for pvals in params:
+            self.update(**pvals)
+            p = self.current_params.copy()
+            if self.waveform_transforms is not None:
+                p = transforms.apply_transforms(p, self.waveform_transforms,
+                                                inverse=False)
+            p.update(self.static_params)
+            points.append(p)
+            stats.append(self._current_stats)
+        if not points:
+            return numpy.zeros(0), stats
+        loglrs = self.loglrs({k: numpy.array([pt[k] for pt in points])
+                              for k in points[0]})
+        lognl = self._lognl()
+        for st, llr in zip(stats, loglrs):
+            st.loglr = llr
+            st.loglikelihood = llr + lognl
+        return loglrs, stats
+
+    def _loglr(self):
+        r"""Computes the log likelihood ratio,
+
+        .. math::
+
+            \log \mathcal{L}(\Theta) = \sum_i
+                \left<h_i(\Theta)|d_i\right> -
+                \frac{1}{2}\left<h_i(\Theta)|h_i(\Theta)\right>,
+
+        at the current parameter values :math:`\Theta`.
+
+        Returns
+        -------
+        float
+            The value of the log likelihood ratio.
+        """
+        # get model params
+        p = self.current_params.copy()
+        p.update(self.static_params)
+        return float(self.loglrs(p)[0])
 
     def write_metadata(self, fp):
         """Adds writing the fiducial parameters and epsilon to file's attrs.
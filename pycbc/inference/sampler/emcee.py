@@ -62,6 +62,10 @@ class EmceeEnsembleSampler(MCMCAutocorrSupport, BaseMCMC, BaseSampler):
         A provider of a map function that allows a function call to be run
         over multiple sets of arguments and possibly maps them to
         cores/nodes/etc.
+    batch_likelihood : bool, Optional
+        Evaluate the likelihood of all of the walkers' proposals at once,
+        using the model's ``loglr_batch``, split over the processes. Default
+        is False.
     """
     name = "emcee"
     _io = EmceeFile
@@ -69,13 +73,15 @@ class EmceeEnsembleSampler(MCMCAutocorrSupport, BaseMCMC, BaseSampler):
 
     def __init__(self, model, nwalkers,
                  checkpoint_interval=None, checkpoint_signal=None,
-                 logpost_function=None, nprocesses=1, use_mpi=False):
+                 logpost_function=None, nprocesses=1, use_mpi=False,
+                 batch_likelihood=False):
 
         self.model = model
         # create a wrapper for calling the model
         if logpost_function is None:
             logpost_function = 'logposterior'
         model_call = models.CallModel(model, logpost_function)
+        batch_call = model_call
 
         # Set up the pool
         if nprocesses > 1:
@@ -85,6 +91,11 @@ class EmceeEnsembleSampler(MCMCAutocorrSupport, BaseMCMC, BaseSampler):
         pool = choose_pool(mpi=use_mpi, processes=nprocesses)
         if pool is not None:
             pool.count = nprocesses
+        if batch_likelihood:
+            # emcee maps the model call over the walkers with the pool's map;
+            # evaluate each process's share of walkers as one batch instead
+            pool = models.BatchedModelPool(batch_call, pool=pool,
+                                           nprocesses=nprocesses)
 
         # set up emcee
         self._nwalkers = nwalkers
@@ -205,11 +216,12 @@ class EmceeEnsembleSampler(MCMCAutocorrSupport, BaseMCMC, BaseSampler):
         checkpoint_signal = cls.ckpt_signal_from_config(cp, section)
         # get the logpost function
         lnpost = get_optional_arg_from_config(cp, section, 'logpost-function')
+        batch_likelihood = cp.has_option(section, 'batch-likelihood')
         obj = cls(model, nwalkers,
                   checkpoint_interval=checkpoint_interval,
                   checkpoint_signal=checkpoint_signal,
                   logpost_function=lnpost, nprocesses=nprocesses,
-                  use_mpi=use_mpi)
+                  use_mpi=use_mpi, batch_likelihood=batch_likelihood)
         # set target
         obj.set_target_from_config(cp, section)
         # add burn-in if it's specified
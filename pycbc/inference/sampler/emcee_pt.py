@@ -63,6 +63,10 @@ class EmceePTSampler(MultiTemperedAutocorrSupport, MultiTemperedSupport,
     use_mpi : bool, optional
         Use MPI for parallelization. Default (False) will use python's
         multiprocessing.
+    batch_likelihood : bool, optional
+        Evaluate the likelihood of all of the walkers' proposals at once,
+        using the model's ``loglr_batch``, split over the processes. Default
+        is False.
     """
     name = "emcee_pt"
     _io = EmceePTFile
@@ -71,7 +75,7 @@ class EmceePTSampler(MultiTemperedAutocorrSupport, MultiTemperedSupport,
     def __init__(self, model, ntemps, nwalkers, betas=None,
                  checkpoint_interval=None, checkpoint_signal=None,
                  loglikelihood_function=None,
-                 nprocesses=1, use_mpi=False):
+                 nprocesses=1, use_mpi=False, batch_likelihood=False):
 
         self.model = model
 
@@ -82,6 +86,7 @@ class EmceePTSampler(MultiTemperedAutocorrSupport, MultiTemperedSupport,
         # turn it off
         model_call = models.CallModel(model, loglikelihood_function,
                                       return_all_stats=False)
+        batch_call = model_call
 
         # Set up the pool
         if nprocesses > 1:
@@ -95,6 +100,13 @@ class EmceePTSampler(MultiTemperedAutocorrSupport, MultiTemperedSupport,
         pool = choose_pool(mpi=use_mpi, processes=nprocesses)
         if pool is not None:
             pool.count = nprocesses
+        if batch_likelihood:
+            # PTSampler maps a function returning the loglikelihood and
+            # logprior of a point over the walkers with the pool's map;
+            # evaluate each process's share of walkers as one batch instead
+            pool = models.BatchedModelPool(batch_call, pool=pool,
+                                           nprocesses=nprocesses,
+                                           return_logprior=True)
         self.pool = pool
         # construct the sampler: PTSampler needs the likelihood and prior
         # functions separately
@@ -163,6 +175,9 @@ class EmceePTSampler(MultiTemperedAutocorrSupport, MultiTemperedSupport,
         * ``logl-function`` :
             The attribute of the model to use for the loglikelihood. If
             not provided, will default to ``loglikelihood``.
+        * ``batch-likelihood`` :
+            If provided, the likelihood of all of the walkers' proposals is
+            evaluated at once, using the model's ``loglr_batch``.
 
         Settings for burn-in tests are read from ``[sampler-burn_in]``. In
         particular, the ``burn-in-test`` option is used to set the burn in
@@ -201,11 +216,12 @@ class EmceePTSampler(MultiTemperedAutocorrSupport, MultiTemperedSupport,
         checkpoint_signal = cls.ckpt_signal_from_config(cp, section)
         # get the loglikelihood function
         logl = get_optional_arg_from_config(cp, section, 'logl-function')
+        batch_likelihood = cp.has_option(section, 'batch-likelihood')
         obj = cls(model, ntemps, nwalkers, betas=betas,
                   checkpoint_interval=checkpoint_interval,
                   checkpoint_signal=checkpoint_signal,
                   loglikelihood_function=logl, nprocesses=nprocesses,
-                  use_mpi=use_mpi)
+                  use_mpi=use_mpi, batch_likelihood=batch_likelihood)
         # set target
         obj.set_target_from_config(cp, section)
         # add burn-in if it's specified
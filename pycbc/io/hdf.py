@@ -895,10 +895,18 @@ class ForegroundTriggers(object):
 class ReadByTemplate(object):
     def __init__(self, filename, bank=None, segment_name=None, veto_files=None):
         self.filename = filename
+        self.bank_filename = bank
         self.file = h5py.File(filename, 'r')
         self.ifo = tuple(self.file.keys())[0]
         self.valid = None
         self.bank = h5py.File(bank, 'r') if bank else {}
+        self.template_num = None
+        self.template_data = {}
+        self._bank_columns = None
+
+        # Columns read by load_template; this grows to include every column
+        # requested through __getitem__ so later templates can be read ahead
+        self.columns = set(['end_time'])
 
         # Determine the segments which define the boundaries of valid times
         # to use triggers
@@ -915,6 +923,41 @@ class ReadByTemplate(object):
             self.segs = (self.segs - veto_segs).coalesce()
         self.valid = veto.segments_to_start_end(self.segs)
 
+    def reopen(self):
+        """ Reopen the trigger and bank files
+
+        Forked worker processes should call this before reading so they do
+        not share HDF5 file handles with their parent.
+        """
+        self.file = h5py.File(self.filename, 'r')
+        if self.bank_filename:
+            self.bank = h5py.File(self.bank_filename, 'r')
+
+    def template_slice(self, num):
+        """ Get the range of the trigger columns holding template 'num'
+
+        The region references written by pycbc_coinc_mergetrigs select a
+        contiguous range of triggers, so the reference is resolved once and
+        each column is then read as a plain slice.
+
+        Parameters
+        ----------
+        num: int
+            The template id to read triggers for
+
+        Returns
+        -------
+        tslice: slice
+            The triggers of this template
+        """
+        dset = self.file['%s/end_time' % self.ifo]
+        ref = self.file['%s/end_time_template' % self.ifo][num]
+        space = h5py.h5r.get_region(ref, dset.id)
+        if space.get_select_npoints() == 0:
+            return slice(0, 0)
+        start, end = space.get_select_bounds()
+        return slice(start[0], end[0] + 1)
+
     def get_data(self, col, num):
         """ Get a column of data for template with id 'num'
 
@@ -930,48 +973,95 @@ class ReadByTemplate(object):
         data: numpy.ndarray
             The requested column of data
         """
-        ref = self.file['%s/%s_template' % (self.ifo, col)][num]
-        return self.file['%s/%s' % (self.ifo, col)][ref]
+        return self.file['%s/%s' % (self.ifo, col)][self.template_slice(num)]
 
-    def set_template(self, num):
-        """ Set the active template to read from
+    def template_params(self, num):
+        """ Get the bank parameters of template 'num'
+
+        The bank columns are read in full on first use, rather than reading
+        single values from the file for every template.
+        """
+        if self._bank_columns is None:
+            if 'parameters' in self.bank.attrs:
+                names = self.bank.attrs['parameters']
+            else:
+                names = list(self.bank.keys())
+            self._bank_columns = {col: self.bank[col][:] for col in names}
+        return {col: self._bank_columns[col][num]
+                for col in self._bank_columns}
+
+    def load_template(self, num):
+        """ Read the triggers of template 'num' after applying vetoes
+
+        This does not change the active template, so it may be called from
+        a reader thread while the triggers of another template are in use.
 
-        Parameters        ----------
+        Parameters
+        ----------
         num: int
             The template id to read triggers for
 
         Returns
         -------
-        trigger_id: numpy.ndarray
-            The indices of this templates triggers
+        block: dict
+            The template id, trigger ids, kept indices, bank parameters and
+            the columns in self.columns, to be passed to set_template
         """
-        self.template_num = num
-        times = self.get_data('end_time', num)
+        tslice = self.template_slice(num)
+        key = '%s/%s' % (self.ifo, '%s')
+        data = {'end_time': self.file[key % 'end_time'][tslice]}
 
         # Determine which of these template's triggers are kept after
         # applying vetoes
         if self.valid:
-            self.keep = veto.indices_within_times(times, self.valid[0],
-                                                  self.valid[1])
-#            logging.info('applying vetoes')
+            keep = veto.indices_within_times(data['end_time'],
+                                             self.valid[0], self.valid[1])
         else:
-            self.keep = np.arange(0, len(times))
+            keep = np.arange(0, len(data['end_time']))
 
-        if self.bank != {}:
-            self.param = {}
-            if 'parameters' in self.bank.attrs:
-                for col in self.bank.attrs['parameters']:
-                    self.param[col] = self.bank[col][self.template_num]
-            else:
-                for col in self.bank:
-                    self.param[col] = self.bank[col][self.template_num]
+        for col in list(self.columns):
+            if col not in data:
+                data[col] = self.file[key % col][tslice]
+        if self.valid:
+            data = {col: data[col][keep] for col in data}
 
-        # Calculate the trigger id by adding the relative offset in self.keep
+        # Calculate the trigger id by adding the relative offset in keep
         # to the absolute beginning index of this templates triggers stored
         # in 'template_boundaries'
-        trigger_id = self.keep + \
-                         self.file['%s/template_boundaries' % self.ifo][num]
-        return trigger_id
+        trigger_id = keep + self.file['%s/template_boundaries' % self.ifo][num]
+
+        return {'template_num': num,
+                'trigger_id': trigger_id,
+                'keep': keep,
+                'param': self.template_params(num) if self.bank != {} else None,
+                'data': data,
+                'slice': tslice}
+
+    def set_template(self, num, block=None):
+        """ Set the active template to read from
+
+        Parameters
+        ----------
+        num: int
+            The template id to read triggers for
+        block: dict, optional
+            The triggers of this template as returned by load_template, if
+            they have already been read
+
+        Returns
+        -------
+        trigger_id: numpy.ndarray
+            The indices of this templates triggers
+        """
+        if block is None or block['template_num'] != num:
+            block = self.load_template(num)
+        self.template_num = num
+        self.keep = block['keep']
+        self.template_data = block['data']
+        self._slice = block['slice']
+        if block['param'] is not None:
+            self.param = block['param']
+        return block['trigger_id']
 
     def __getitem__(self, col):
         """ Return the column of data for current active template after
@@ -990,9 +1080,81 @@ class ReadByTemplate(object):
         if self.template_num is None:
             raise ValueError('You must call set_template to first pick the '
                              'template to read data from')
-        data = self.get_data(col, self.template_num)
-        data = data[self.keep] if self.valid else data
-        return data
+        if col not in self.template_data:
+            self.columns.add(col)
+            data = self.file['%s/%s' % (self.ifo, col)][self._slice]
+            data = data[self.keep] if self.valid else data
+            self.template_data[col] = data
+        return self.template_data[col]
+
+
+def prefetch_templates(readers, template_ids, depth=2):
+    """ Iterate over templates, reading their triggers ahead in a thread
+
+    The triggers of the next templates are read while the caller works on
+    the current one. HDF5 access is serialized by h5py, so the gain comes
+    from overlapping the reads with computation in the caller.
+
+    Parameters
+    ----------
+    readers: list of ReadByTemplate
+        The trigger files to read from
+    template_ids: iterable of ints
+        The templates to read, in order
+    depth: int, optional
+        The maximum number of templates to hold in memory ahead of the
+        caller. If 0, the templates are read without a thread.
+
+    Yields
+    ------
+    num: int
+        The template id
+    blocks: list of dicts
+        The template triggers from each reader, to be passed to
+        ReadByTemplate.set_template
+    """
+    if depth < 1:
+        for num in template_ids:
+            yield num, [r.load_template(num) for r in readers]
+        return
+
+    import threading
+    from six.moves import queue
+
+    blocks = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+
+    def read():
+        try:
+            for num in template_ids:
+                if stop.is_set():
+                    return
+                blocks.put((num, [r.load_template(num) for r in readers]))
+        except Exception as err: # pylint:disable=broad-except
+            blocks.put(err)
+            return
+        blocks.put(None)
+
+    reader = threading.Thread(target=read)
+    reader.daemon = True
+    reader.start()
+    try:
+        while True:
+            item = blocks.get()
+            if item is None:
+                break
+            if isinstance(item, Exception):
+                raise item
+            yield item
+    finally:
+        stop.set()
+        # Unblock the reader if it is waiting on a full queue
+        while reader.is_alive():
+            try:
+                blocks.get(timeout=0.1)
+            except queue.Empty:
+                pass
+        reader.join()
 
 
 chisq_choices = ['traditional', 'cont', 'bank', 'max_cont_trad', 'sg',
@@ -1123,3 +1285,76 @@ def get_all_subkeys(grp, key):
             subkey_list += get_all_subkeys(grp, path)
     # returns an empty list if there is no dataset or subgroup within the group
     return subkey_list
+
+def compression_kwargs(codec):
+    """ Get the h5py dataset options for a compression codec
+
+    Parameters
+    ----------
+    codec: str
+        One of 'none', 'lzf', 'gzip' or 'gzip-N' with N the compression level
+        (0-9, default 4), or 'blosc' or 'zstd' if the hdf5plugin package is
+        installed.
+
+    Returns
+    -------
+    kwargs: dict
+        Keyword arguments to pass to h5py's create_dataset.
+
+    Raises
+    ------
+    ValueError
+        If the codec is not known, or cannot be used.
+    """
+    if codec is None or codec == 'none':
+        return {}
+    elif codec == 'lzf':
+        return {'compression': 'lzf', 'shuffle': True}
+    elif codec == 'gzip' or codec.startswith('gzip-'):
+        level = 4
+        if codec != 'gzip':
+            level = codec[len('gzip-'):]
+            if len(level) != 1 or level not in '0123456789':
+                raise ValueError("Invalid gzip compression level in %s, the "
+                                 "level must be 0-9" % codec)
+            level = int(level)
+        return {'compression': 'gzip', 'compression_opts': level,
+                'shuffle': True}
+    elif codec in ['blosc', 'zstd']:
+        try:
+            import hdf5plugin
+        except ImportError:
+            raise ValueError("The %s compression codec requires the "
+                             "hdf5plugin package" % codec)
+        if codec == 'blosc':
+            return dict(hdf5plugin.Blosc())
+        kwargs = dict(hdf5plugin.Zstd())
+        kwargs['shuffle'] = True
+        return kwargs
+    raise ValueError("Unknown compression codec %s" % codec)
+
+def trigger_chunk_length(num_triggers, num_templates):
+    """ Choose the chunk length of trigger datasets which are read
+    template by template
+
+    The chunk length is the mean number of triggers per template rounded up
+    to a power of two, so that reading a template's triggers touches few
+    chunks, bounded so that the chunk index does not become too large.
+
+    Parameters
+    ----------
+    num_triggers: int
+        The number of triggers in the dataset.
+    num_templates: int
+        The number of templates the triggers are split between.
+
+    Returns
+    -------
+    length: int or None
+        The chunk length, or None if the dataset is empty.
+    """
+    if num_triggers == 0:
+        return None
+    mean = float(num_triggers) / max(num_templates, 1)
+    length = 2 ** int(np.ceil(np.log2(max(mean, 1))))
+    return int(min(max(length, 2 ** 10), 2 ** 16, num_triggers))
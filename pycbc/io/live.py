@@ -4,6 +4,9 @@ import pycbc
 import numpy
 import lal
 import json
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
 from six import u as unicode
 from glue.ligolw import ligolw
 from glue.ligolw import lsctables
@@ -436,4 +439,137 @@ class SingleCoincForGraceDB(object):
 
         return gid
 
-__all__ = ['SingleCoincForGraceDB', 'make_psd_xmldoc', 'snr_series_to_xml']
+
+class LatencyTracker(object):
+    """Record the wall time spent in each stage of the live analysis blocks.
+
+    Each process times its own stages with `stage`. The durations of a block
+    are collected with `pop_block` and, on the root process, `record` keeps
+    the last `history` values for every rank and stage. Summaries and
+    histograms are computed from these rolling windows.
+    """
+
+    def __init__(self, history=256, bins=None):
+        """
+        Parameters
+        ----------
+        history: int, optional
+            The number of analysis blocks to keep for each rank and stage.
+        bins: numpy.ndarray, optional
+            The bin edges of the duration histograms in seconds. By default
+            logarithmic bins from 1 ms to 1000 s are used.
+        """
+        self.history = history
+        if bins is None:
+            bins = numpy.logspace(-3, 3, 61)
+        self.bins = numpy.asarray(bins)
+        self.current = OrderedDict()
+        self.durations = OrderedDict()
+
+    @contextmanager
+    def stage(self, name):
+        """Time the enclosed code, adding it to the named stage of the
+        current block
+        """
+        start = time.time()
+        try:
+            yield
+        finally:
+            self.current[name] = self.current.get(name, 0.) + \
+                                 time.time() - start
+
+    def pop_block(self):
+        """Return the stage durations of the current block and start a new
+        one
+        """
+        block, self.current = self.current, OrderedDict()
+        return block
+
+    def record(self, rank, block):
+        """Add the stage durations of one block from the given rank
+
+        Parameters
+        ----------
+        rank: int
+            The MPI rank the durations were measured on.
+        block: dict
+            Stage durations in seconds, as returned by `pop_block`.
+        """
+        for name, duration in block.items():
+            if (rank, name) not in self.durations:
+                self.durations[(rank, name)] = deque(maxlen=self.history)
+            self.durations[(rank, name)].append(duration)
+
+    def stage_durations(self, name):
+        """Return the durations of a stage in the window over all ranks"""
+        values = [list(d) for (_, n), d in self.durations.items() if n == name]
+        return numpy.concatenate(values) if values else numpy.array([])
+
+    @property
+    def stages(self):
+        return list(OrderedDict.fromkeys(n for _, n in self.durations))
+
+    def summary(self):
+        """Return statistics of each stage over the rolling window
+
+        Returns
+        -------
+        summary: dict
+            Dictionary by stage name containing the number of samples,
+            the mean, median, 90th and 99th percentile and maximum duration,
+            the histogram counts and the slowest rank.
+        """
+        summary = OrderedDict()
+        for name in self.stages:
+            values = self.stage_durations(name)
+            ranks = [(numpy.mean(d), r) for (r, n), d in
+                     self.durations.items() if n == name]
+            p50, p90, p99 = numpy.percentile(values, [50, 90, 99])
+            summary[name] = {'count': len(values),
+                             'mean': float(values.mean()),
+                             'p50': float(p50),
+                             'p90': float(p90),
+                             'p99': float(p99),
+                             'max': float(values.max()),
+                             'histogram': numpy.histogram(
+                                 values, bins=self.bins)[0].tolist(),
+                             'slowest_rank': int(max(ranks)[1])}
+        return summary
+
+    def write_json(self, path):
+        """Write the summary to a JSON file for external monitoring
+
+        The file is replaced atomically so readers never see a partial file.
+        """
+        out = {'created_gps': float(lal.GPSTimeNow()),
+               'history': self.history,
+               'histogram_bins': self.bins.tolist(),
+               'stages': self.summary()}
+        tmp = path + '.tmp'
+        with open(tmp, 'w') as fp:
+            json.dump(out, fp)
+        os.rename(tmp, path)
+
+    @staticmethod
+    def save_block(group, blocks):
+        """Store the stage durations of a single block in an HDF group
+
+        Parameters
+        ----------
+        group: h5py.Group
+            Group to write to. A dataset is created for each stage, holding
+            the duration on each rank listed in the 'rank' dataset. Stages
+            which did not run on a rank are stored as NaN.
+        blocks: dict
+            Dictionary by rank of stage durations, as returned by `pop_block`.
+        """
+        ranks = sorted(blocks)
+        names = OrderedDict.fromkeys(n for r in ranks for n in blocks[r])
+        group['rank'] = numpy.array(ranks, dtype=numpy.int32)
+        for name in names:
+            group[name] = numpy.array([blocks[r].get(name, numpy.nan)
+                                       for r in ranks])
+
+
+__all__ = ['SingleCoincForGraceDB', 'make_psd_xmldoc', 'snr_series_to_xml',
+           'LatencyTracker']
@@ -40,6 +40,13 @@ from pycbc.waveform import parameters
 _numpy_function_lib = {_x: _y for _x,_y in numpy.__dict__.items()
                        if isinstance(_y, (numpy.ufunc, float))}
 
+# the compiled code of expressions given to FieldArray's __getitem__, along
+# with the attributes and fields they use; keyed by the expression and
+# everything that determines which names are available in the array
+_expression_cache = {}
+# the cache is emptied when it grows beyond this many expressions
+_EXPRESSION_CACHE_SIZE = 1024
+
 #
 # =============================================================================
 #
@@ -514,6 +521,21 @@ class FieldArray(numpy.recarray):
       be used. Note that while fields may be accessed as attributes (e.g,
       field ``a`` can be accessed via ``x['a']`` or ``x.a``), functions on
       multiple fields may not (``x.a+b`` does not work, for obvious reasons).
+      Expressions are compiled once and reused by all arrays with the same
+      fields and attributes.
+
+    * **Memoized evaluation**:
+
+      Calling ``x.cache_evaluations()`` makes ``x`` remember the values of
+      the expressions and virtual fields retrieved from it, so that asking
+      for them again does not recompute them. The remembered values are
+      read-only, and are forgotten whenever fields or attributes of ``x``
+      are set using ``x[...] = ...`` or ``x.a = ...``. Values written
+      through other views of the data, such as ``x['a'][:] = ...``, are not
+      detected; use ``clear_cache`` after doing so. Large arrays can also be
+      evaluated in chunks of rows using ``x.evaluate(expression,
+      chunksize)``, which keeps the temporary arrays of each step small
+      enough to stay in the CPU cache.
 
     * **Subfields and '.' indexing**:
       Structured arrays, which are the base class for recarrays and, by
@@ -752,6 +774,7 @@ class FieldArray(numpy.recarray):
     """
     _virtualfields = []
     _functionlib = _fieldarray_functionlib
+    _evaluation_cache = None
     __persistent_attributes__ = ['name', '_virtualfields', '_functionlib']
 
     def __new__(cls, shape, name=None, zero=True, **kwargs):
@@ -813,10 +836,19 @@ class FieldArray(numpy.recarray):
             # otherwise, unrecognized
             raise AttributeError(e)
 
+    def __setattr__(self, attr, value):
+        """Wraps recarray's setattr to forget any memoized evaluations, as
+        they may depend on the attribute or field being set.
+        """
+        if attr != '_evaluation_cache':
+            self.clear_cache()
+        super(FieldArray, self).__setattr__(attr, value)
+
     def __setitem__(self, item, values):
         """Wrap's recarray's setitem to allow attribute-like indexing when
         setting values.
         """
+        self.clear_cache()
         if type(item) is int and type(values) is numpy.ndarray:
             # numpy >=1.14 only accepts tuples
             values = tuple(values)
@@ -874,25 +906,166 @@ class FieldArray(numpy.recarray):
             #
             #   arg isn't a simple argument of row, so we'll have to eval it
             #
-            # get the function library
-            item_dict = dict(_numpy_function_lib.items())
-            item_dict.update(self._functionlib)
-            # get the set of fields & attributes we will need
-            itemvars = get_vars_from_arg(item)
-            # pull out any other needed attributes
-            itemvars = get_fields_from_arg(item)
-            d = {attr: getattr(self, attr)
-                for attr in set(dir(self)).intersection(itemvars)}
-            item_dict.update(d)
-            # pull out the fields: note, by getting the parent fields, we
-            # also get the sub fields name
-            item_dict.update({fn: self.__getbaseitem__(fn) \
-                for fn in set(self.fieldnames).intersection(itemvars)})
-            # add any aliases
-            item_dict.update({alias: item_dict[name]
-                              for alias,name in self.aliases.items()
-                              if name in item_dict})
-            return eval(item, {"__builtins__": None}, item_dict)
+            return self.__getexpression__(item)
+
+    def __getexpression__(self, item, chunksize=None):
+        """Evaluates an expression of fields and attributes, using the
+        memoized value if there is one.
+        """
+        memoize = self._evaluation_cache is not None and \
+            isinstance(item, string_types)
+        if memoize and item in self._evaluation_cache:
+            return self._evaluation_cache[item]
+        if chunksize is None or self.ndim != 1 or len(self) <= chunksize:
+            out = self.__evalrows__(item)
+        else:
+            out = None
+            whole = {}
+            for start in range(0, len(self), chunksize):
+                rows = slice(start, start + chunksize)
+                value = numpy.asarray(self.__evalrows__(item, rows, whole))
+                nrows = min(chunksize, len(self) - start)
+                if value.shape[:1] != (nrows,):
+                    raise ValueError("expression {} does not give one value "
+                                     "per row, so it cannot be evaluated in "
+                                     "chunks".format(item))
+                if out is None:
+                    out = numpy.empty((len(self),) + value.shape[1:],
+                                      dtype=value.dtype)
+                out[rows] = value
+        if memoize:
+            out = self.__memoize__(item, out)
+        return out
+
+    def __evalrows__(self, item, rows=None, whole=None):
+        """Evaluates an expression of fields and attributes. If ``rows`` is
+        a slice, the expression is evaluated on those rows only. Virtual
+        fields that have to be computed on the whole array are stored in the
+        ``whole`` dictionary, if given, so that they are only computed once
+        when evaluating several chunks of rows.
+        """
+        code, attrs, fieldnames = self.__parseexpression__(item)
+        arr = self if rows is None else self.__getbaseitem__(rows)
+        cache = self._evaluation_cache
+        # get the function library
+        item_dict = dict(_numpy_function_lib.items())
+        item_dict.update(self._functionlib)
+        # pull out any other needed attributes; virtual fields are computed
+        # on just the rows, anything else is taken from the whole array
+        for attr in attrs:
+            if cache is not None and attr in cache and \
+                    attr in self.virtualfields:
+                value = cache[attr] if rows is None else cache[attr][rows]
+            elif whole is not None and attr in whole:
+                value = whole[attr][rows]
+            elif attr in self.virtualfields:
+                try:
+                    value = getattr(arr, attr)
+                except AttributeError:
+                    # the virtual field needs attributes that are not
+                    # copied to views of the array, so it is computed on
+                    # the whole array
+                    value = getattr(self, attr)
+                    if cache is not None:
+                        value = self.__memoize__(attr, value)
+                    if whole is not None:
+                        whole[attr] = value
+                    value = value[rows]
+                if rows is None and cache is not None:
+                    value = self.__memoize__(attr, value)
+            else:
+                value = getattr(self, attr)
+                if rows is not None and isinstance(value, numpy.ndarray) \
+                        and value.shape[:1] == self.shape[:1]:
+                    value = value[rows]
+            item_dict[attr] = value
+        # pull out the fields: note, by getting the parent fields, we
+        # also get the sub fields name
+        item_dict.update({fn: arr.__getbaseitem__(fn) for fn in fieldnames})
+        # add any aliases
+        item_dict.update({alias: item_dict[name]
+                          for alias,name in self.aliases.items()
+                          if name in item_dict})
+        return eval(code, {"__builtins__": None}, item_dict)
+
+    def __parseexpression__(self, item):
+        """Returns the compiled code of an expression, and the names of the
+        attributes and fields of self that it uses.
+        """
+        key = (item, type(self), self.dtype, frozenset(self.__dict__))
+        try:
+            return _expression_cache[key]
+        except KeyError:
+            pass
+        code = compile(item, '<FieldArray expression>', 'eval')
+        # get the set of fields & attributes we will need
+        itemvars = get_fields_from_arg(item)
+        attrs = set(dir(self)).intersection(itemvars)
+        fieldnames = set(self.fieldnames).intersection(itemvars)
+        if len(_expression_cache) >= _EXPRESSION_CACHE_SIZE:
+            _expression_cache.clear()
+        _expression_cache[key] = (code, attrs, fieldnames)
+        return code, attrs, fieldnames
+
+    def __memoize__(self, item, value):
+        """Stores the value of an expression so that it is not evaluated
+        again. Array values are made read-only so that they are not changed
+        by whoever retrieves them.
+        """
+        if isinstance(value, numpy.ndarray):
+            value.flags.writeable = False
+        self._evaluation_cache[item] = value
+        return value
+
+    def evaluate(self, expression, chunksize=None):
+        """Evaluates a field, virtual field or expression of them.
+
+        This is the same as ``self[expression]``, except that the expression
+        may be evaluated on chunks of rows at a time.
+
+        Parameters
+        ----------
+        expression : str
+            The field or expression to evaluate.
+        chunksize : int, optional
+            Evaluate the expression on this many rows at a time. Every step of
+            the expression then only creates temporary arrays of this size,
+            which is faster for large arrays if the temporaries fit in the
+            CPU cache. This can only be used for expressions that give one
+            value for each row; a ``ValueError`` is raised otherwise. Default
+            (None) is to evaluate the expression on all rows at once.
+
+        Returns
+        -------
+        numpy.ndarray
+            The values of the expression.
+        """
+        try:
+            return self.__getsubitem__(expression)
+        except ValueError:
+            return self.__getexpression__(expression, chunksize=chunksize)
+
+    def cache_evaluations(self, cache=True):
+        """Turns memoization of the expressions and virtual fields
+        retrieved from this array on or off.
+
+        While on, the values of expressions and virtual fields are remembered
+        and returned read-only when asked for again. They are forgotten when
+        any field or attribute of this array is set. Views and copies of this
+        array do not share the memoized values.
+
+        Parameters
+        ----------
+        cache : bool, optional
+            Whether to memoize evaluations. Default is True.
+        """
+        self._evaluation_cache = {} if cache else None
+
+    def clear_cache(self):
+        """Forgets any memoized values of expressions and virtual fields.
+        """
+        if self._evaluation_cache:
+            self._evaluation_cache.clear()
 
     def __contains__(self, field):
         """Returns True if the given field name is in self's fields."""
@@ -917,6 +1090,7 @@ class FieldArray(numpy.recarray):
             which fields to compare first, second, etc.  Not all fields need be
             specified.
         """
+        self.clear_cache()
         try:
             numpy.recarray.sort(self, axis=axis, kind=kind, order=order)
         except ValueError:
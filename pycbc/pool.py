@@ -7,6 +7,12 @@ from multiprocessing import TimeoutError
 import types
 import signal
 import atexit
+import numpy
+
+try:
+    from multiprocessing import shared_memory
+except ImportError:
+    shared_memory = None
 
 def is_main_process():
     """ Check if this is the main control process and may handle one time tasks
@@ -26,19 +32,112 @@ def _noint(init, *args):
     if init is not None:
         return init(*args)
 
+class _SharedArray(object):
+    """ Handle to a numpy array stored in a shared memory segment """
+    def __init__(self, array):
+        self.array = numpy.ascontiguousarray(array)
+        self.shape = self.array.shape
+        self.dtype = self.array.dtype
+        self.name = None
+        self.offset = None
+
+    def attach(self, segments):
+        """ Return a read-only view of the array in this process, mapping
+        its segment if it is not in `segments` yet.
+        """
+        if self.name not in segments:
+            segments[self.name] = shared_memory.SharedMemory(name=self.name)
+        array = numpy.ndarray(self.shape, dtype=self.dtype,
+                              buffer=segments[self.name].buf,
+                              offset=self.offset)
+        array.flags.writeable = False
+        return array
+
+# Segments mapped by a worker that were still referenced after the call
+# that used them, which are closed once they are no longer used
+_attached = []
+
+def _share_arrays(args, handles):
+    """ Replace the numpy arrays found in args, or in the tuples, lists and
+    dicts it contains, by handles, which are appended to `handles`.
+    """
+    if isinstance(args, numpy.ndarray) and args.dtype != object:
+        handle = _SharedArray(args)
+        handles.append(handle)
+        return handle
+    elif type(args) in (tuple, list):
+        return type(args)(_share_arrays(a, handles) for a in args)
+    elif isinstance(args, dict):
+        return {k: _share_arrays(v, handles) for k, v in args.items()}
+    return args
+
+def _pack_arrays(handles, align=64):
+    """ Copy the arrays of the handles into a single new shared memory
+    segment, which is returned.
+    """
+    offsets = []
+    size = 0
+    for handle in handles:
+        offsets.append(size)
+        size += -(-handle.array.nbytes // align) * align
+    shm = shared_memory.SharedMemory(create=True, size=max(size, 1))
+    for handle, offset in zip(handles, offsets):
+        numpy.ndarray(handle.shape, dtype=handle.dtype, buffer=shm.buf,
+                      offset=offset)[...] = handle.array
+        handle.name = shm.name
+        handle.offset = offset
+        # Only the handle is sent to the workers
+        del handle.array
+    return shm
+
+def _attach_arrays(args, segments):
+    """ Inverse of _share_arrays, run in the worker """
+    if isinstance(args, _SharedArray):
+        return args.attach(segments)
+    elif type(args) in (tuple, list):
+        return type(args)(_attach_arrays(a, segments) for a in args)
+    elif isinstance(args, dict):
+        return {k: _attach_arrays(v, segments) for k, v in args.items()}
+    return args
+
+def _close_segments(segments):
+    """ Close the segments mapped by a worker, keeping those the function
+    called still holds references to until a later call.
+    """
+    _attached.extend(segments.values())
+    in_use = []
+    for shm in _attached:
+        try:
+            shm.close()
+        except BufferError:
+            in_use.append(shm)
+    _attached[:] = in_use
+
+def _call_attached(fcn, args):
+    segments = {}
+    try:
+        return fcn(_attach_arrays(args, segments))
+    finally:
+        _close_segments(segments)
+
 _process_lock = None
 _numdone = None
+_barrier = None
 def _lockstep_fcn(values):
     """ Wrapper to ensure that all processes execute together """
     numrequired, fcn, args = values
+    if _barrier is not None:
+        # Each worker blocks here until all of them hold one of the calls
+        _barrier.wait()
+        return _call_attached(fcn, args)
+
     with _process_lock:
         _numdone.value += 1
-    # yep this is an ugly busy loop, do something better please
-    # when we care about the performance of this call and not just the
-    # guarantee it provides (ok... maybe never)
+    # yep this is an ugly busy loop, only used where multiprocessing
+    # does not provide barriers
     while 1:
         if _numdone.value == numrequired:
-            return fcn(args)
+            return _call_attached(fcn, args)
 
 def _shutdown_pool(p):
     p.terminate()
@@ -50,8 +149,13 @@ class BroadcastPool(multiprocessing.pool.Pool):
     def __init__(self, processes=None, initializer=None, initargs=(), **kwds):
         global _process_lock
         global _numdone
+        global _barrier
+        if processes is None:
+            processes = multiprocessing.cpu_count()
         _process_lock = multiprocessing.Lock()
         _numdone = multiprocessing.Value('i', 0)
+        if hasattr(multiprocessing, 'Barrier'):
+            _barrier = multiprocessing.Barrier(processes)
         noint = functools.partial(_noint, initializer)
         super(BroadcastPool, self).__init__(processes, noint, initargs, **kwds)
         atexit.register(_shutdown_pool, self)
@@ -59,7 +163,7 @@ class BroadcastPool(multiprocessing.pool.Pool):
     def __len__(self):
         return len(self._pool)
 
-    def broadcast(self, fcn, args):
+    def broadcast(self, fcn, args, share_arrays=False):
         """ Do a function call on every worker.
 
         Parameters
@@ -68,8 +172,27 @@ class BroadcastPool(multiprocessing.pool.Pool):
             Function to call.
         args: tuple
             The arguments for Pool.map
+        share_arrays: bool, Optional
+            If True, numpy arrays in args (including inside tuples, lists and
+            dicts) are copied once into shared memory and the workers receive
+            read-only views of them, instead of each worker being sent its
+            own pickled copy. The arrays share a single segment, which is
+            released once every worker has returned. This has no effect if
+            multiprocessing.shared_memory is not available.
         """
-        results = self.map(_lockstep_fcn, [(len(self), fcn, args)] * len(self))
+        shm = None
+        if share_arrays and shared_memory is not None:
+            handles = []
+            args = _share_arrays(args, handles)
+            if handles:
+                shm = _pack_arrays(handles)
+        try:
+            results = self.map(_lockstep_fcn,
+                               [(len(self), fcn, args)] * len(self))
+        finally:
+            if shm is not None:
+                shm.close()
+                shm.unlink()
         _numdone.value = 0
         return results
 
@@ -111,11 +234,11 @@ class BroadcastPool(multiprocessing.pool.Pool):
                 self.join()
                 raise KeyboardInterrupt
 
-def _dummy_broadcast(self, f, args):
+def _dummy_broadcast(self, f, args, share_arrays=False):
     self.map(f, [args] * self.size)
 
 class SinglePool(object):
-    def broadcast(self, fcn, args):
+    def broadcast(self, fcn, args, share_arrays=False):
         return self.map(fcn, [args])
 
     def map(self, f, items):
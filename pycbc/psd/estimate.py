@@ -54,48 +54,17 @@ def median_bias(n):
         ans += 1.0 / (2*i + 1) - 1.0 / (2*i)
     return ans
 
-def welch(timeseries, seg_len=4096, seg_stride=2048, window='hann',
-          avg_method='median', num_segments=None, require_exact_data_fit=False):
-    """PSD estimator based on Welch's method.
-
-    Parameters
-    ----------
-    timeseries : TimeSeries
-        Time series for which the PSD is to be estimated.
-    seg_len : int
-        Segment length in samples.
-    seg_stride : int
-        Separation between consecutive segments, in samples.
-    window : {'hann', numpy.ndarray}
-        Function used to window segments before Fourier transforming, or
-        a `numpy.ndarray` that specifies the window.
-    avg_method : {'median', 'mean', 'median-mean'}
-        Method used for averaging individual segment PSDs.
-
-    Returns
-    -------
-    psd : FrequencySeries
-        Frequency series containing the estimated PSD.
-
-    Raises
-    ------
-    ValueError
-        For invalid choices of `seg_len`, `seg_stride` `window` and
-        `avg_method` and for inconsistent combinations of len(`timeseries`),
-        `seg_len` and `seg_stride`.
+_window_map = {
+    'hann': numpy.hanning
+}
 
-    Notes
-    -----
-    See arXiv:gr-qc/0509116 for details.
+def _check_welch_options(seg_len, seg_stride, window, avg_method):
+    """Validate the options common to the Welch estimators and return the
+    window as a `numpy.ndarray`.
     """
-    window_map = {
-        'hann': numpy.hanning
-    }
-
-    # sanity checks
     if isinstance(window, numpy.ndarray) and window.size != seg_len:
         raise ValueError('Invalid window: incorrect window length')
-    if not isinstance(window, numpy.ndarray) and window not in window_map:
+    if not isinstance(window, numpy.ndarray) and window not in _window_map:
         raise ValueError('Invalid window: unknown window {!r}'.format(window))
     if avg_method not in ('mean', 'median', 'median-mean'):
         raise ValueError('Invalid averaging method')
@@ -103,11 +72,15 @@ def welch(timeseries, seg_len=4096, seg_stride=2048, window='hann',
         or seg_len <= 0 or seg_stride <= 0:
         raise ValueError('Segment length and stride must be positive integers')
 
-    if timeseries.precision == 'single':
-        fs_dtype = numpy.complex64
-    elif timeseries.precision == 'double':
-        fs_dtype = numpy.complex128
+    if not isinstance(window, numpy.ndarray):
+        window = _window_map[window](seg_len)
+    return window
 
+def _welch_segmentation(timeseries, seg_len, seg_stride, num_segments,
+                        require_exact_data_fit):
+    """Return the part of `timeseries` which is covered by the Welch
+    segments, along with the number of segments.
+    """
     num_samples = len(timeseries)
     if num_segments is None:
         num_segments = int(num_samples // seg_stride)
@@ -136,9 +109,82 @@ def welch(timeseries, seg_len=4096, seg_stride=2048, window='hann',
 
     if num_samples != (num_segments - 1) * seg_stride + seg_len:
         raise ValueError('Incorrect choice of segmentation parameters')
+    return timeseries, num_segments
+
+def _segment_psd(segment, w, segment_tilde):
+    """Return the (unnormalized) periodogram of a single windowed segment.
+    """
+    fft(segment * w, segment_tilde)
+    seg_psd = abs(segment_tilde * segment_tilde.conj()).numpy()
+
+    #halve the DC and Nyquist components to be consistent with TO10095
+    seg_psd[0] /= 2
+    seg_psd[-1] /= 2
+    return seg_psd
+
+def _average_segment_psds(segment_psds, avg_method):
+    """Average a 2-d array of segment periodograms along the segment axis.
+    """
+    if avg_method == 'mean':
+        psd = numpy.mean(segment_psds, axis=0)
+    elif avg_method == 'median':
+        psd = numpy.median(segment_psds, axis=0) / \
+            median_bias(len(segment_psds))
+    elif avg_method == 'median-mean':
+        odd_psds = segment_psds[::2]
+        even_psds = segment_psds[1::2]
+        odd_median = numpy.median(odd_psds, axis=0) / \
+            median_bias(len(odd_psds))
+        even_median = numpy.median(even_psds, axis=0) / \
+            median_bias(len(even_psds))
+        psd = (odd_median + even_median) / 2
+    return psd
+
+def welch(timeseries, seg_len=4096, seg_stride=2048, window='hann',
+          avg_method='median', num_segments=None, require_exact_data_fit=False):
+    """PSD estimator based on Welch's method.
+
+    Parameters
+    ----------
+    timeseries : TimeSeries
+        Time series for which the PSD is to be estimated.
+    seg_len : int
+        Segment length in samples.
+    seg_stride : int
+        Separation between consecutive segments, in samples.
+    window : {'hann', numpy.ndarray}
+        Function used to window segments before Fourier transforming, or
+        a `numpy.ndarray` that specifies the window.
+    avg_method : {'median', 'mean', 'median-mean'}
+        Method used for averaging individual segment PSDs.
+
+    Returns
+    -------
+    psd : FrequencySeries
+        Frequency series containing the estimated PSD.
+
+    Raises
+    ------
+    ValueError
+        For invalid choices of `seg_len`, `seg_stride` `window` and
+        `avg_method` and for inconsistent combinations of len(`timeseries`),
+        `seg_len` and `seg_stride`.
+
+    Notes
+    -----
+    See arXiv:gr-qc/0509116 for details.
+    """
+    window = _check_welch_options(seg_len, seg_stride, window, avg_method)
+
+    if timeseries.precision == 'single':
+        fs_dtype = numpy.complex64
+    elif timeseries.precision == 'double':
+        fs_dtype = numpy.complex128
+
+    timeseries, num_segments = _welch_segmentation(
+            timeseries, seg_len, seg_stride, num_segments,
+            require_exact_data_fit)
 
-    if not isinstance(window, numpy.ndarray):
-        window = window_map[window](seg_len)
     w = Array(window.astype(timeseries.dtype))
 
     # calculate psd of each segment
@@ -155,34 +201,129 @@ def welch(timeseries, seg_len=4096, seg_stride=2048, window='hann',
         segment_end = segment_start + seg_len
         segment = timeseries[segment_start:segment_end]
         assert len(segment) == seg_len
-        fft(segment * w, segment_tilde)
-        seg_psd = abs(segment_tilde * segment_tilde.conj()).numpy()
+        segment_psds.append(_segment_psd(segment, w, segment_tilde))
 
-        #halve the DC and Nyquist components to be consistent with TO10095
-        seg_psd[0] /= 2
-        seg_psd[-1] /= 2
+    psd = _average_segment_psds(numpy.array(segment_psds), avg_method)
+    psd *= 2 * delta_f * seg_len / (w*w).sum()
 
-        segment_psds.append(seg_psd)
+    return FrequencySeries(psd, delta_f=delta_f, dtype=timeseries.dtype,
+                           epoch=timeseries.start_time)
 
-    segment_psds = numpy.array(segment_psds)
+class IncrementalWelch(object):
+    """Welch PSD estimator for a sliding stretch of data.
 
-    if avg_method == 'mean':
-        psd = numpy.mean(segment_psds, axis=0)
-    elif avg_method == 'median':
-        psd = numpy.median(segment_psds, axis=0) / median_bias(num_segments)
-    elif avg_method == 'median-mean':
-        odd_psds = segment_psds[::2]
-        even_psds = segment_psds[1::2]
-        odd_median = numpy.median(odd_psds, axis=0) / \
-            median_bias(len(odd_psds))
-        even_median = numpy.median(even_psds, axis=0) / \
-            median_bias(len(even_psds))
-        psd = (odd_median + even_median) / 2
+    The periodogram of each segment is kept between calls, keyed by the
+    GPS time at which the segment starts, so that when the estimator is
+    applied to a window of data which has moved forward in time only the
+    segments which were not seen before are Fourier transformed. Segments
+    which fall out of the window are discarded. Calling the estimator gives
+    the same result as `welch` with the same options.
 
-    psd *= 2 * delta_f * seg_len / (w*w).sum()
+    If samples which were already seen are later modified, e.g. by gating,
+    the affected segments must be dropped with `invalidate`.
 
-    return FrequencySeries(psd, delta_f=delta_f, dtype=timeseries.dtype,
-                           epoch=timeseries.start_time)
+    Parameters
+    ----------
+    seg_len : int
+        Segment length in samples.
+    seg_stride : int
+        Separation between consecutive segments, in samples.
+    window : {'hann', numpy.ndarray}
+        Function used to window segments before Fourier transforming, or
+        a `numpy.ndarray` that specifies the window.
+    avg_method : {'median', 'mean', 'median-mean'}
+        Method used for averaging individual segment PSDs.
+    num_segments : {None, int}
+        Number of segments to average. By default as many as fit in the
+        data.
+    """
+    def __init__(self, seg_len=4096, seg_stride=2048, window='hann',
+                 avg_method='median', num_segments=None):
+        self.window = _check_welch_options(seg_len, seg_stride, window,
+                                           avg_method)
+        self.seg_len = seg_len
+        self.seg_stride = seg_stride
+        self.avg_method = avg_method
+        self.num_segments = num_segments
+        self.segment_psds = {}
+        self.delta_t = None
+        self.dtype = None
+
+    def _sample_index(self, time):
+        return int(round(float(time) / self.delta_t))
+
+    def invalidate(self, start_time=None, end_time=None):
+        """Forget the segments overlapping the given time interval.
+
+        Parameters
+        ----------
+        start_time : {None, float}
+            Start of the interval. If None, the interval is unbounded below.
+        end_time : {None, float}
+            End of the interval. If None, the interval is unbounded above.
+        """
+        if self.delta_t is None:
+            return
+        start = -numpy.inf if start_time is None \
+                else self._sample_index(start_time)
+        end = numpy.inf if end_time is None else self._sample_index(end_time)
+        for key in list(self.segment_psds):
+            if key < end and key + self.seg_len > start:
+                del self.segment_psds[key]
+
+    def __call__(self, timeseries, require_exact_data_fit=False):
+        """Estimate the PSD of `timeseries`.
+
+        Parameters
+        ----------
+        timeseries : TimeSeries
+            Time series for which the PSD is to be estimated.
+        require_exact_data_fit : {False, bool}
+            If True, the length of `timeseries` must exactly match the
+            segmentation, otherwise the data is centered on the segments.
+
+        Returns
+        -------
+        psd : FrequencySeries
+            Frequency series containing the estimated PSD.
+        """
+        if timeseries.delta_t != self.delta_t \
+                or timeseries.dtype != self.dtype:
+            self.segment_psds = {}
+            self.delta_t = timeseries.delta_t
+            self.dtype = timeseries.dtype
+            self.w = Array(self.window.astype(timeseries.dtype))
+            self.segment_tilde = FrequencySeries(
+                numpy.zeros(int(self.seg_len / 2 + 1)),
+                delta_f=1. / timeseries.delta_t / self.seg_len,
+                dtype=complex_same_precision_as(timeseries),
+            )
+
+        timeseries, num_segments = _welch_segmentation(
+                timeseries, self.seg_len, self.seg_stride, self.num_segments,
+                require_exact_data_fit)
+
+        first = self._sample_index(timeseries.start_time)
+        segment_psds = {}
+        for i in range(num_segments):
+            segment_start = i * self.seg_stride
+            key = first + segment_start
+            if key in self.segment_psds:
+                segment_psds[key] = self.segment_psds[key]
+            else:
+                segment = timeseries[segment_start:segment_start+self.seg_len]
+                segment_psds[key] = _segment_psd(segment, self.w,
+                                                 self.segment_tilde)
+        self.segment_psds = segment_psds
+
+        delta_f = self.segment_tilde.delta_f
+        psd = _average_segment_psds(
+                numpy.array([segment_psds[k] for k in sorted(segment_psds)]),
+                self.avg_method)
+        psd *= 2 * delta_f * self.seg_len / (self.w * self.w).sum()
+
+        return FrequencySeries(psd, delta_f=delta_f, dtype=timeseries.dtype,
+                               epoch=timeseries.start_time)
 
 def inverse_spectrum_truncation(psd, max_filter_len, low_frequency_cutoff=None, trunc_method=None):
     """Modify a PSD such that the impulse response associated with its inverse
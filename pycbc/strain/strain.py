@@ -1374,10 +1374,18 @@ class StrainBuffer(pycbc.frame.DataBuffer):
         self.psd = None
         self.psds = {}
 
+        # Segment periodograms are kept between PSD estimates, so only the
+        # segments which entered the buffer since then need to be computed
+        psd_seg_len = int(self.sample_rate * self.psd_segment_length)
+        self.psd_estimator = pycbc.psd.IncrementalWelch(
+                seg_len=psd_seg_len, seg_stride=psd_seg_len // 2)
+
         strain_len = int(sample_rate * self.raw_buffer.delta_t * len(self.raw_buffer))
-        self.strain = TimeSeries(zeros(strain_len, dtype=numpy.float32),
-                                 delta_t=1.0/self.sample_rate,
-                                 epoch=start_time-max_buffer)
+        self._strain = pycbc.frame.SlidingBuffer(strain_len,
+                                                 1.0/self.sample_rate,
+                                                 start_time-max_buffer,
+                                                 dtype=numpy.float32)
+        self.strain = self._strain.window
 
         # Determine the total number of corrupted samples for highpass
         # and PSD over whitening
@@ -1429,6 +1437,13 @@ class StrainBuffer(pycbc.frame.DataBuffer):
         self.psd = None
         self.psds = {}
 
+    def invalidate_psd_segments(self, num):
+        """ Forget the PSD segments which overlap the last `num` samples of
+        the strain, as these have been overwritten """
+        start = self.strain.start_time + \
+                (len(self.strain) - num) / float(self.sample_rate)
+        self.psd_estimator.invalidate(start)
+
     def recalculate_psd(self):
         """ Recalculate the psd
         """
@@ -1436,7 +1451,7 @@ class StrainBuffer(pycbc.frame.DataBuffer):
         seg_len = int(self.sample_rate * self.psd_segment_length)
         e = len(self.strain)
         s = e - (self.psd_samples + 1) * seg_len // 2
-        psd = pycbc.psd.welch(self.strain[s:e], seg_len=seg_len, seg_stride=seg_len//2)
+        psd = self.psd_estimator(self.strain[s:e])
 
         psd.dist = spa_distance(psd, 1.4, 1.4, self.low_frequency_cutoff) * pycbc.DYN_RANGE_FAC
 
@@ -1545,11 +1560,11 @@ class StrainBuffer(pycbc.frame.DataBuffer):
         """
         sample_step = int(blocksize * self.sample_rate)
         csize = sample_step + self.corruption * 2
-        self.strain.roll(-sample_step)
+        self.strain = self._strain.advance(sample_step)
 
         # We should roll this off at some point too...
         self.strain[len(self.strain) - csize + self.corruption:] = 0
-        self.strain.start_time += blocksize
+        self.invalidate_psd_segments(sample_step + self.corruption)
 
         # The next time we need strain will need to be tapered
         self.taper_immediate_strain = True
@@ -1633,9 +1648,9 @@ class StrainBuffer(pycbc.frame.DataBuffer):
             self.taper_immediate_strain = False
 
         # Stitch into continuous stream
-        self.strain.roll(-sample_step)
+        self.strain = self._strain.advance(sample_step)
         self.strain[len(self.strain) - csize + self.corruption:] = strain[:]
-        self.strain.start_time += blocksize
+        self.invalidate_psd_segments(sample_step + self.corruption)
 
         # apply gating if needed
         if self.autogating_threshold is not None:
@@ -1652,7 +1667,10 @@ class StrainBuffer(pycbc.frame.DataBuffer):
                 self.gate_params = \
                         [(gt, self.autogating_width, self.autogating_taper)
                          for gt in glitch_times]
-                self.strain = gate_data(self.strain, self.gate_params)
+                gate_data(self.strain, self.gate_params)
+                for gt, width, taper in self.gate_params:
+                    self.psd_estimator.invalidate(gt - width - taper,
+                                                  gt + width + taper)
 
         if self.psd is None and self.wait_duration <=0:
             self.recalculate_psd()
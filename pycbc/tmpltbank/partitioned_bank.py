@@ -117,6 +117,10 @@ class PartitionedTmpltbank(object):
         self.bin_range_check = 1
         self.bin_loop_order = coord_utils.outspiral_loop(self.bin_range_check)
 
+        # Flat, bin-sorted copy of the bank used for batched queries. This is
+        # rebuilt when needed after points are added.
+        self._point_index = None
+
     def get_point_from_bins_and_idx(self, chi1_bin, chi2_bin, idx):
         """Find masses and spins given bin numbers and index.
 
@@ -256,12 +260,15 @@ class PartitionedTmpltbank(object):
         for chi1_bin_offset, chi2_bin_offset in self.bin_loop_order:
             curr_chi1_bin = chi1_bin + chi1_bin_offset
             curr_chi2_bin = chi2_bin + chi2_bin_offset
-            for idx, bank_chis in \
-                            enumerate(self.bank[curr_chi1_bin][curr_chi2_bin]):
-                dist = coord_utils.calc_point_dist(chi_coords, bank_chis)
-                if dist < min_dist:
-                    min_dist = dist
-                    indexes = (curr_chi1_bin, curr_chi2_bin, idx)
+            curr_bank = self.massbank[curr_chi1_bin][curr_chi2_bin]
+            if not curr_bank['mass1s'].size:
+                continue
+            chi_diffs = curr_bank['chis'] - chi_coords
+            dists = (chi_diffs*chi_diffs).sum(axis=1)
+            curr_min_dist = dists.min()
+            if curr_min_dist < min_dist:
+                min_dist = curr_min_dist
+                indexes = curr_chi1_bin, curr_chi2_bin, dists.argmin()
         return min_dist, indexes
 
     def test_point_distance(self, chi_coords, distance_threshold):
@@ -288,10 +295,13 @@ class PartitionedTmpltbank(object):
         for chi1_bin_offset, chi2_bin_offset in self.bin_loop_order:
             curr_chi1_bin = chi1_bin + chi1_bin_offset
             curr_chi2_bin = chi2_bin + chi2_bin_offset
-            for bank_chis in self.bank[curr_chi1_bin][curr_chi2_bin]:
-                dist = coord_utils.calc_point_dist(chi_coords, bank_chis)
-                if dist < distance_threshold:
-                    return True
+            curr_bank = self.massbank[curr_chi1_bin][curr_chi2_bin]
+            if not curr_bank['mass1s'].size:
+                continue
+            chi_diffs = curr_bank['chis'] - chi_coords
+            dists = (chi_diffs*chi_diffs).sum(axis=1)
+            if (dists < distance_threshold).any():
+                return True
         else:
             return False
 
@@ -430,6 +440,332 @@ class PartitionedTmpltbank(object):
         else:
             return False
 
+    def _get_point_index(self):
+        """
+        Return the bank as flat arrays sorted by bin, which is the index used
+        by the batched distance methods. The index is cached until the next
+        point is added to the bank.
+
+        Returns
+        --------
+        point_index : dict
+            Dictionary holding the integer bin key of every point ('keys',
+            sorted), its chi coordinates ('chis'), its chi1 and chi2 bins and
+            position within the bin ('indexes') and, if available, the upper
+            frequency cutoffs ('freqcuts') and mu coordinates ('mus').
+        """
+        if self._point_index is not None:
+            return self._point_index
+
+        keys = []
+        chis = []
+        indexes = []
+        freqcuts = []
+        mus = []
+        for chi1_bin in sorted(self.massbank):
+            for chi2_bin in sorted(self.massbank[chi1_bin]):
+                curr_bank = self.massbank[chi1_bin][chi2_bin]
+                num = curr_bank['mass1s'].size
+                if not num:
+                    continue
+                keys.append(numpy.repeat(self._bin_key(chi1_bin, chi2_bin),
+                                         num))
+                chis.append(curr_bank['chis'])
+                curr_indexes = numpy.zeros((num, 3), dtype=numpy.int64)
+                curr_indexes[:, 0] = chi1_bin
+                curr_indexes[:, 1] = chi2_bin
+                curr_indexes[:, 2] = numpy.arange(num)
+                indexes.append(curr_indexes)
+                if 'freqcuts' in curr_bank:
+                    freqcuts.append(curr_bank['freqcuts'])
+                if 'mus' in curr_bank:
+                    mus.append(curr_bank['mus'])
+
+        point_index = {}
+        if keys:
+            point_index['keys'] = numpy.concatenate(keys)
+            point_index['chis'] = numpy.concatenate(chis)
+            point_index['indexes'] = numpy.concatenate(indexes)
+        else:
+            point_index['keys'] = numpy.array([], dtype=numpy.int64)
+            point_index['chis'] = numpy.array([])
+            point_index['indexes'] = numpy.zeros((0, 3), dtype=numpy.int64)
+        if freqcuts and len(freqcuts) == len(keys):
+            point_index['freqcuts'] = numpy.concatenate(freqcuts)
+        if mus and len(mus) == len(keys):
+            point_index['mus'] = numpy.concatenate(mus)
+        self._point_index = point_index
+        return point_index
+
+    @staticmethod
+    def _bin_key(chi1_bin, chi2_bin):
+        """
+        Combine chi1 and chi2 bin numbers (scalars or arrays) into a single
+        integer which sorts in the same order as (chi1_bin, chi2_bin).
+        """
+        return numpy.int64(chi1_bin) * 2**32 + chi2_bin
+
+    def _neighbour_pairs(self, chi_coords):
+        """
+        Find all pairs of test points and bank points which lie in the same
+        or in neighbouring bins, as considered by calc_point_distance.
+
+        Parameters
+        -----------
+        chi_coords : numpy.array
+            A 2D array holding the positions of the test points in the chi
+            coordinates. Axis 0 is the coordinate index and axis 1 the point
+            index, as returned by coord_utils.get_cov_params.
+
+        Returns
+        --------
+        point_idxes : numpy.array
+            Index of the test point for each pair.
+        bank_idxes : numpy.array
+            Index into the arrays returned by _get_point_index for each pair.
+        """
+        point_index = self._get_point_index()
+        chi1_bins = ((chi_coords[0] - self.chi1_min) // self.bin_spacing)
+        chi2_bins = ((chi_coords[1] - self.chi2_min) // self.bin_spacing)
+        chi1_bins = chi1_bins.astype(numpy.int64)
+        chi2_bins = chi2_bins.astype(numpy.int64)
+
+        point_idxes = []
+        bank_idxes = []
+        for chi1_bin_offset, chi2_bin_offset in self.bin_loop_order:
+            keys = self._bin_key(chi1_bins + chi1_bin_offset,
+                                 chi2_bins + chi2_bin_offset)
+            left = numpy.searchsorted(point_index['keys'], keys, side='left')
+            right = numpy.searchsorted(point_index['keys'], keys,
+                                       side='right')
+            counts = right - left
+            total = counts.sum()
+            if not total:
+                continue
+            # Expand each (left, right) range into the bank indices it holds
+            starts = numpy.repeat(left - (numpy.cumsum(counts) - counts),
+                                  counts)
+            point_idxes.append(numpy.repeat(numpy.arange(len(counts)),
+                                            counts))
+            bank_idxes.append(starts + numpy.arange(total))
+
+        if not point_idxes:
+            return (numpy.array([], dtype=numpy.int64),
+                    numpy.array([], dtype=numpy.int64))
+        return numpy.concatenate(point_idxes), numpy.concatenate(bank_idxes)
+
+    def _closest_points(self, num_points, point_idxes, bank_idxes, dists):
+        """
+        Reduce the distances of all pairs of points to the smallest distance
+        for each test point.
+        """
+        point_index = self._get_point_index()
+        min_dists = numpy.zeros(num_points) + 1000000000
+        indexes = numpy.zeros((num_points, 3), dtype=numpy.int64) - 1
+        if not len(dists):
+            return min_dists, indexes
+
+        # Sort pairs by test point then distance and keep the first of each
+        order = numpy.lexsort((dists, point_idxes))
+        sorted_points = point_idxes[order]
+        first = numpy.ones(len(order), dtype=bool)
+        first[1:] = sorted_points[1:] != sorted_points[:-1]
+        order = order[first]
+        closer = dists[order] < min_dists[point_idxes[order]]
+        order = order[closer]
+        min_dists[point_idxes[order]] = dists[order]
+        indexes[point_idxes[order]] = point_index['indexes'][bank_idxes[order]]
+        return min_dists, indexes
+
+    def calc_point_distances(self, chi_coords, batch_size=10000):
+        """
+        Calculate the distance between each of a set of points and the bank.
+        This gives the same result as calling calc_point_distance for every
+        point, but the computation is vectorized over the points.
+
+        Parameters
+        -----------
+        chi_coords : numpy.array
+            A 2D array holding the positions of the test points in the chi
+            coordinates. Axis 0 is the coordinate index and axis 1 the point
+            index, as returned by coord_utils.get_cov_params.
+        batch_size : int
+            The number of points to consider at once. This bounds the memory
+            used. DEFAULT = 10000.
+
+        Returns
+        --------
+        min_dists : numpy.array
+            The smallest **SQUARED** metric distance between each test point
+            and the bank.
+        indexes : numpy.array
+            A 2D array holding the chi1_bin, chi2_bin and position within
+            that bin at which the closest matching point lies for each test
+            point. This is -1 if no point was found in the neighbouring bins.
+        """
+        chi_coords = numpy.asarray(chi_coords)
+        num_points = chi_coords.shape[1]
+        min_dists = numpy.zeros(num_points)
+        indexes = numpy.zeros((num_points, 3), dtype=numpy.int64)
+        point_index = self._get_point_index()
+        for start in range(0, num_points, batch_size):
+            end = min(start + batch_size, num_points)
+            curr_chis = chi_coords[:, start:end]
+            point_idxes, bank_idxes = self._neighbour_pairs(curr_chis)
+            if len(bank_idxes):
+                chi_diffs = point_index['chis'][bank_idxes] - \
+                    curr_chis[:, point_idxes].T
+                dists = (chi_diffs*chi_diffs).sum(axis=1)
+            else:
+                dists = numpy.array([])
+            min_dists[start:end], indexes[start:end] = \
+                self._closest_points(end - start, point_idxes, bank_idxes,
+                                     dists)
+        return min_dists, indexes
+
+    def test_point_distances(self, chi_coords, distance_threshold,
+                             batch_size=10000):
+        """
+        Test if the distance between each of a set of points and the bank is
+        less than the supplied distance threshold. This is the vectorized
+        version of test_point_distance.
+
+        Parameters
+        -----------
+        chi_coords : numpy.array
+            A 2D array holding the positions of the test points in the chi
+            coordinates. Axis 0 is the coordinate index and axis 1 the point
+            index, as returned by coord_utils.get_cov_params.
+        distance_threshold : float
+            The **SQUARE ROOT** of the metric distance to test as threshold.
+            E.g. if you want to test to a minimal match of 0.97 you would
+            use 1 - 0.97 = 0.03 for this value.
+        batch_size : int
+            The number of points to consider at once. DEFAULT = 10000.
+
+        Returns
+        --------
+        numpy.array of bools
+            True for points within the distance threshold. False if not.
+        """
+        min_dists, _ = self.calc_point_distances(chi_coords,
+                                                 batch_size=batch_size)
+        return min_dists < distance_threshold
+
+    def calc_point_distances_vary(self, chi_coords, point_fuppers, mus,
+                                  batch_size=10000):
+        """
+        Calculate the distance between each of a set of points and the bank
+        allowing the metric to vary based on varying upper frequency cutoff.
+        This gives the same result as calling calc_point_distance_vary for
+        every point, but the computation is vectorized over the points.
+
+        Parameters
+        -----------
+        chi_coords : numpy.array
+            A 2D array holding the positions of the test points in the chi
+            coordinates. Axis 0 is the coordinate index and axis 1 the point
+            index, as returned by coord_utils.get_cov_params.
+        point_fuppers : numpy.array
+            The upper frequency cutoff to use for each point. These values
+            must be ones already calculated in the metric.
+        mus : numpy.array
+            A 3D array where idx 0 holds the upper frequency cutoff, idx 1
+            holds the coordinates in the [not covaried] mu parameter space and
+            idx 2 the point index.
+        batch_size : int
+            The number of points to consider at once. DEFAULT = 10000.
+
+        Returns
+        --------
+        min_dists : numpy.array
+            The smallest **SQUARED** metric distance between each test point
+            and the bank.
+        indexes : numpy.array
+            A 2D array holding the chi1_bin, chi2_bin and position within
+            that bin at which the closest matching point lies for each test
+            point. This is -1 if no point was found in the neighbouring bins.
+        """
+        chi_coords = numpy.asarray(chi_coords)
+        point_fuppers = numpy.asarray(point_fuppers)
+        num_points = chi_coords.shape[1]
+        min_dists = numpy.zeros(num_points)
+        indexes = numpy.zeros((num_points, 3), dtype=numpy.int64)
+        point_index = self._get_point_index()
+
+        # frequency_map maps the sorted frequency list onto its indices
+        freq_list = numpy.array(sorted(self.frequency_map))
+        norm_list = numpy.array([self.normalization_map[f] \
+                                 for f in freq_list])
+
+        for start in range(0, num_points, batch_size):
+            end = min(start + batch_size, num_points)
+            point_idxes, bank_idxes = \
+                self._neighbour_pairs(chi_coords[:, start:end])
+            if not len(bank_idxes):
+                min_dists[start:end] = 1000000000
+                indexes[start:end] = -1
+                continue
+            point_idxes_all = point_idxes + start
+
+            # *NOT* the same of .min and .max
+            bank_fuppers = point_index['freqcuts'][bank_idxes]
+            f_upper = numpy.minimum(point_fuppers[point_idxes_all],
+                                    bank_fuppers)
+            f_other = numpy.maximum(point_fuppers[point_idxes_all],
+                                    bank_fuppers)
+            upper_idxes = numpy.searchsorted(freq_list, f_upper)
+            other_idxes = numpy.searchsorted(freq_list, f_other)
+
+            vecs1 = mus[upper_idxes, :, point_idxes_all]
+            vecs2 = point_index['mus'][bank_idxes, upper_idxes, :]
+            dists = ((vecs1 - vecs2)*(vecs1 - vecs2)).sum(axis=1)
+            norm_fac = norm_list[upper_idxes] / norm_list[other_idxes]
+            renormed_dists = 1 - (1 - dists)*norm_fac
+
+            min_dists[start:end], indexes[start:end] = \
+                self._closest_points(end - start, point_idxes, bank_idxes,
+                                     renormed_dists)
+        return min_dists, indexes
+
+    def test_point_distances_vary(self, chi_coords, point_fuppers, mus,
+                                  distance_threshold, batch_size=10000):
+        """
+        Test if the distance between each of a set of points and the bank is
+        less than the supplied distance threshold while allowing the metric
+        to vary based on varying upper frequency cutoff. This is the
+        vectorized version of test_point_distance_vary.
+
+        Parameters
+        -----------
+        chi_coords : numpy.array
+            A 2D array holding the positions of the test points in the chi
+            coordinates. Axis 0 is the coordinate index and axis 1 the point
+            index, as returned by coord_utils.get_cov_params.
+        point_fuppers : numpy.array
+            The upper frequency cutoff to use for each point. These values
+            must be ones already calculated in the metric.
+        mus : numpy.array
+            A 3D array where idx 0 holds the upper frequency cutoff, idx 1
+            holds the coordinates in the [not covaried] mu parameter space and
+            idx 2 the point index.
+        distance_threshold : float
+            The **SQUARE ROOT** of the metric distance to test as threshold.
+            E.g. if you want to test to a minimal match of 0.97 you would
+            use 1 - 0.97 = 0.03 for this value.
+        batch_size : int
+            The number of points to consider at once. DEFAULT = 10000.
+
+        Returns
+        --------
+        numpy.array of bools
+            True for points within the distance threshold. False if not.
+        """
+        min_dists, _ = self.calc_point_distances_vary(chi_coords,
+                                                      point_fuppers, mus,
+                                                      batch_size=batch_size)
+        return min_dists < distance_threshold
+
     def add_point_by_chi_coords(self, chi_coords, mass1, mass2, spin1z, spin2z,
                           point_fupper=None, mus=None):
         """
@@ -462,8 +798,11 @@ class PartitionedTmpltbank(object):
         chi1_bin, chi2_bin = self.find_point_bin(chi_coords)
         self.bank[chi1_bin][chi2_bin].append(copy.deepcopy(chi_coords))
         curr_bank = self.massbank[chi1_bin][chi2_bin]
+        self._point_index = None
 
         if curr_bank['mass1s'].size:
+            curr_bank['chis'] = numpy.append(curr_bank['chis'],
+                                             numpy.array([chi_coords]), axis=0)
             curr_bank['mass1s'] = numpy.append(curr_bank['mass1s'],
                                                numpy.array([mass1]))
             curr_bank['mass2s'] = numpy.append(curr_bank['mass2s'],
@@ -481,6 +820,7 @@ class PartitionedTmpltbank(object):
                 curr_bank['mus'] = numpy.append(curr_bank['mus'],
                                             numpy.array([mus[:,:]]), axis=0)
         else:
+            curr_bank['chis'] = numpy.array([chi_coords])
             curr_bank['mass1s'] = numpy.array([mass1])
             curr_bank['mass2s'] = numpy.array([mass2])
             curr_bank['spin1s'] = numpy.array([spin1z])
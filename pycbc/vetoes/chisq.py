@@ -21,9 +21,9 @@
 #
 # =============================================================================
 #
-import numpy, logging, math, pycbc.fft
+import numpy, logging, math, time, pycbc.fft
 
-from pycbc.types import zeros, real_same_precision_as, TimeSeries, complex_same_precision_as
+from pycbc.types import Array, zeros, real_same_precision_as, TimeSeries, complex_same_precision_as
 from pycbc.filter import sigmasq_series, make_frequency_series, matched_filter_core, get_cutoff_indices
 from pycbc.scheme import schemed
 import pycbc.pnutils
@@ -106,6 +106,15 @@ def shift_sum(v1, shifts, bins):
     err_msg += "scheme. You shouldn't be seeing this error!"
     raise ValueError(err_msg)
 
+@schemed(BACKEND_PREFIX)
+def shift_sum_batch(corrs, indices, bins):
+    """ Calculate the time shifted sums of several FrequencySeries, each
+    at its own points and with its own bins
+    """
+    err_msg = "This function is a stub that should be overridden using the "
+    err_msg += "scheme. You shouldn't be seeing this error!"
+    raise ValueError(err_msg)
+
 def power_chisq_at_points_from_precomputed(corr, snr, snr_norm, bins, indices):
     """Calculate the chisq timeseries from precomputed values for only select points.
 
@@ -135,6 +144,37 @@ def power_chisq_at_points_from_precomputed(corr, snr, snr_norm, bins, indices):
     chisq = shift_sum(corr, indices, bins) # pylint:disable=assignment-from-no-return
     return (chisq * num_bins - (snr.conj() * snr).real) * (snr_norm ** 2.0)
 
+def power_chisq_at_points_from_precomputed_batch(corrs, snrs, snr_norms,
+                                                 bins, indices):
+    """Calculate the chisq at select points of several correlations at once.
+
+    This is the same as calling `power_chisq_at_points_from_precomputed` for
+    each correlation, but the time shifted sums of all of them are
+    calculated in a single call, which is run in parallel on the CPU.
+
+    Parameters
+    ----------
+    corrs: list of FrequencySeries
+        The product of each template and the data in the frequency domain.
+    snrs: list of numpy.ndarray
+        The unnormalized snr at the selected points of each correlation.
+    snr_norms: list of floats
+        The snr normalization of each correlation.
+    bins: list of lists of integers
+        The edges of the equal power bins of each correlation.
+    indices: list of Arrays
+        The indices where we will calculate the chisq of each correlation.
+
+    Returns
+    -------
+    chisqs: list of Arrays
+        For each correlation, an array containing only the chisq at its
+        selected points.
+    """
+    sums = shift_sum_batch(corrs, indices, bins) # pylint:disable=assignment-from-no-return
+    return [(chisq * (len(b) - 1) - (snr.conj() * snr).real) * (norm ** 2.0)
+            for chisq, snr, norm, b in zip(sums, snrs, snr_norms, bins)]
+
 _q_l = None
 _qtilde_l = None
 _chisq_l = None
@@ -219,6 +259,56 @@ def power_chisq_from_precomputed(corr, snr, snr_norm, bins, indices=None, return
     else:
         return chisq
 
+def power_chisq_at_points_from_fft(corr, snr, snr_norm, bins, indices):
+    """Calculate the chisq at select points using an inverse FFT of each bin.
+
+    This gives the same values as `power_chisq_at_points_from_precomputed`,
+    but the cost does not depend on the number of points, so it is the
+    faster choice when there are many of them.
+
+    Parameters
+    ----------
+    corr: FrequencySeries
+        The product of the template and data in the frequency domain.
+    snr: numpy.ndarray
+        The unnormalized array of snr values at only the selected points in `indices`.
+    snr_norm: float
+        The snr normalization factor (true snr = snr * snr_norm)
+    bins: List of integers
+        The edges of the equal power bins
+    indices: Array
+        The indices where we will calculate the chisq. These must be relative
+        to the given `corr` series.
+
+    Returns
+    -------
+    chisq: Array
+        An array containing only the chisq at the selected points.
+    """
+    # Get workspace memory
+    global _q_l, _qtilde_l
+
+    if _q_l is None or len(_q_l) != len(corr):
+        _q_l = zeros(len(corr), dtype=complex_same_precision_as(corr))
+        _qtilde_l = zeros(len(corr), dtype=complex_same_precision_as(corr))
+    q = _q_l
+    qtilde = _qtilde_l
+
+    chisq = zeros(len(indices), dtype=real_same_precision_as(corr))
+    num_bins = len(bins) - 1
+
+    for j in range(num_bins):
+        k_min = int(bins[j])
+        k_max = int(bins[j+1])
+
+        qtilde[k_min:k_max] = corr[k_min:k_max]
+        pycbc.fft.ifft(qtilde, q)
+        qtilde[k_min:k_max].clear()
+
+        chisq_accum_bin(chisq, q.take(indices))
+
+    return (chisq.numpy() * num_bins - (snr.conj() * snr).real) * (snr_norm ** 2.0)
+
 def fastest_power_chisq_at_points(corr, snr, snrv, snr_norm, bins, indices):
     """Calculate the chisq values for only selected points.
 
@@ -299,11 +389,110 @@ def power_chisq(template, data, num_bins, psd,
     return power_chisq_from_precomputed(corr, total_snr, tnorm, bins, return_bins=return_bins)
 
 
+class PowerChisqCostModel(object):
+    """Choose between the point-wise and the FFT-per-bin power chisq.
+
+    The time shifted sum of `shift_sum` costs about `point_cost` seconds for
+    each point and each frequency sample within the chisq bins. The inverse
+    FFT of each bin costs about `fft_cost * N * log2(N)` seconds for a
+    correlation of length N, however many points are needed. The two costs
+    are measured for the current processing scheme by `calibrate`.
+
+    Parameters
+    ----------
+    point_cost: {None, float}, optional
+        The cost of the time shifted sum per point and frequency sample.
+    fft_cost: {None, float}, optional
+        The cost of the FFT method per bin, divided by N * log2(N).
+    """
+    def __init__(self, point_cost=None, fft_cost=None):
+        self.point_cost = point_cost
+        self.fft_cost = fft_cost
+
+    @property
+    def calibrated(self):
+        return self.point_cost is not None and self.fft_cost is not None
+
+    def calibrate(self, length, num_points=64, num_bins=4, repeat=3):
+        """ Measure the cost of both methods with a short benchmark.
+
+        Parameters
+        ----------
+        length: int
+            The length of the complex correlation to benchmark.
+        num_points: {64, int}, optional
+            The number of points to calculate with the time shifted sum.
+        num_bins: {4, int}, optional
+            The number of chisq bins to use.
+        repeat: {3, int}, optional
+            The number of times each method is timed. The fastest is used.
+        """
+        corr = Array(numpy.random.normal(size=length) +
+                     1.0j * numpy.random.normal(size=length),
+                     dtype=numpy.complex64)
+        bins = numpy.linspace(0, length // 2, num_bins + 1).astype(int)
+        indices = numpy.random.randint(0, length, size=num_points)
+        snr = numpy.zeros(num_points, dtype=numpy.complex64)
+
+        def best_time(func):
+            times = []
+            for _ in range(repeat):
+                start = time.time()
+                func(corr, snr, 1.0, bins, indices)
+                times.append(time.time() - start)
+            return min(times)
+
+        # The first call of each also sets up the workspace memory and
+        # FFT plans, which later calls do not pay for
+        power_chisq_at_points_from_fft(corr, snr, 1.0, bins, indices)
+        self.point_cost = best_time(power_chisq_at_points_from_precomputed) \
+            / (num_points * (bins[-1] - bins[0]))
+        self.fft_cost = best_time(power_chisq_at_points_from_fft) \
+            / (num_bins * length * numpy.log2(length))
+        logging.info('Power chisq costs: %.3g s per point and sample, '
+                     '%.3g s per bin FFT of length %s', self.point_cost,
+                     self.fft_cost * length * numpy.log2(length), length)
+
+    def use_fft(self, num_points, bins, length):
+        """ Return whether the FFT method is expected to be faster than the
+        time shifted sum for the given points and bins.
+
+        Parameters
+        ----------
+        num_points: int
+            The number of points where the chisq is needed.
+        bins: List of integers
+            The edges of the chisq bins.
+        length: int
+            The length of the complex correlation.
+        """
+        point = self.point_cost * num_points * (int(bins[-1]) - int(bins[0]))
+        fft = self.fft_cost * (len(bins) - 1) * length * numpy.log2(length)
+        return fft < point
+
 class SingleDetPowerChisq(object):
     """Class that handles precomputation and memory management for efficiently
     running the power chisq in a single detector inspiral analysis.
+
+    Parameters
+    ----------
+    num_bins: {0, int or str}, optional
+        The number of chisq bins, or a function of the template parameters
+        giving it. The chisq is not calculated if this is zero.
+    snr_threshold: {None, float}, optional
+        Only calculate the chisq of points with at least this snr.
+    method: {'points', 'fft', 'auto'}, optional
+        How the chisq is calculated. 'points' uses the time shifted sum at
+        each point, 'fft' uses an inverse FFT of each bin, and 'auto' chooses
+        the faster of the two for each template using a `cost_model`.
+    cost_model: {None, PowerChisqCostModel}, optional
+        The cost model used by the 'auto' method. If not given, one is
+        calibrated the first time the chisq is calculated.
     """
-    def __init__(self, num_bins=0, snr_threshold=None):
+    methods = ['points', 'fft', 'auto']
+
+    def __init__(self, num_bins=0, snr_threshold=None, method='points',
+                 cost_model=None):
         if not (num_bins == "0" or num_bins == 0):
             self.do = True
             self.column_name = "chisq"
@@ -313,6 +502,34 @@ class SingleDetPowerChisq(object):
             self.do = False
         self.snr_threshold = snr_threshold
 
+        if method not in self.methods:
+            raise ValueError('Unknown power chisq method %s, choose from %s'
+                             % (method, ', '.join(self.methods)))
+        self.method = method
+        if method == 'auto' and cost_model is None:
+            cost_model = PowerChisqCostModel()
+        self.cost_model = cost_model
+
+    def use_fft(self, num_points, bins, length):
+        """ Return whether the chisq of the given number of points should be
+        calculated with an inverse FFT of each bin.
+        """
+        if self.method != 'auto':
+            return self.method == 'fft'
+        if not self.cost_model.calibrated:
+            self.cost_model.calibrate(length)
+        return self.cost_model.use_fft(num_points, bins, length)
+
+    def metadata(self):
+        """ Return a dictionary describing how the chisq is calculated, to be
+        stored with the triggers.
+        """
+        meta = {'chisq_method': self.method}
+        if self.cost_model is not None and self.cost_model.calibrated:
+            meta['chisq_point_cost'] = self.cost_model.point_cost
+            meta['chisq_fft_cost'] = self.cost_model.fft_cost
+        return meta
+
     @staticmethod
     def parse_option(row, arg):
         safe_dict = {}
@@ -376,7 +593,11 @@ class SingleDetPowerChisq(object):
             if num_above > 0:
                 bins = self.cached_chisq_bins(template, psd)
                 dof = (len(bins) - 1) * 2 - 2
-                chisq = power_chisq_at_points_from_precomputed(corr,
+                if self.use_fft(num_above, bins, len(corr)):
+                    chisq = power_chisq_at_points_from_fft(corr,
+                                     above_snrv, snr_norm, bins, above_indices)
+                else:
+                    chisq = power_chisq_at_points_from_precomputed(corr,
                                      above_snrv, snr_norm, bins, above_indices)
 
             if self.snr_threshold:
@@ -389,6 +610,77 @@ class SingleDetPowerChisq(object):
         else:
             return None, None
 
+    def values_batch(self, corrs, snrvs, snr_norms, psd, indices, templates):
+        """ Calculate the chisq at the given points of several templates.
+
+        This gives the same values as calling `values` for each template, but
+        the chisq of all templates are calculated together.
+
+        Returns
+        -------
+        chisqs: list of Arrays
+            Chisq values of each template, one for each of its sample indices
+
+        chisq_dofs: list of Arrays
+            Number of statistical degrees of freedom for the chisq test
+            of each template
+        """
+        if not self.do:
+            return None, None
+
+        rchisqs, dofs = [], []
+        sel, above_list = [], []
+        for num, (snrv, snr_norm, idx) in \
+                enumerate(zip(snrvs, snr_norms, indices)):
+            if self.snr_threshold:
+                above = abs(snrv * snr_norm) > self.snr_threshold
+            else:
+                above = numpy.ones(len(idx), dtype=bool)
+            rchisqs.append(numpy.zeros(len(idx), dtype=numpy.float32))
+            dofs.append(numpy.repeat(-100, len(idx)))
+            if above.any():
+                sel.append(num)
+                above_list.append(above)
+
+        if self.snr_threshold:
+            logging.info('%s above chisq activation threshold',
+                         sum(a.sum() for a in above_list))
+
+        bins = [self.cached_chisq_bins(templates[num], psd) for num in sel]
+        above_snrvs = [snrvs[num][above] for num, above in zip(sel, above_list)]
+        above_indices = [numpy.array(indices[num])[above]
+                         for num, above in zip(sel, above_list)]
+
+        # Templates with many points use the FFT method on their own, the
+        # rest share one batched time shifted sum
+        use_fft = [self.use_fft(above.sum(), b, len(corrs[num]))
+                   for num, above, b in zip(sel, above_list, bins)]
+        chisqs = [None] * len(sel)
+        shift = [i for i, fft in enumerate(use_fft) if not fft]
+        for i, fft in enumerate(use_fft):
+            if fft:
+                chisqs[i] = power_chisq_at_points_from_fft(corrs[sel[i]],
+                                   above_snrvs[i], snr_norms[sel[i]], bins[i],
+                                   above_indices[i])
+        if shift:
+            shift_chisqs = power_chisq_at_points_from_precomputed_batch(
+                [corrs[sel[i]] for i in shift],
+                [above_snrvs[i] for i in shift],
+                [snr_norms[sel[i]] for i in shift],
+                [bins[i] for i in shift],
+                [above_indices[i] for i in shift])
+            for i, chisq in zip(shift, shift_chisqs):
+                chisqs[i] = chisq
+
+        for num, above, b, chisq in zip(sel, above_list, bins, chisqs):
+            dof = (len(b) - 1) * 2 - 2
+            if self.snr_threshold:
+                rchisqs[num][above] = chisq
+            else:
+                rchisqs[num] = chisq
+            dofs[num] = numpy.repeat(dof, len(indices[num]))
+        return rchisqs, dofs
+
 class SingleDetSkyMaxPowerChisq(SingleDetPowerChisq):
     """Class that handles precomputation and memory management for efficiently
     running the power chisq in a single detector inspiral analysis when
@@ -4,6 +4,7 @@ cimport numpy
 from libc.stdlib cimport malloc, free
 from libc.math cimport cos, sin # This imports c's sin and cos function from the math library
 from cython import wraparound, boundscheck, cdivision
+from cython.parallel import prange
 from pycbc.types import real_same_precision_as
 
 ctypedef fused REALTYPE:
@@ -129,6 +130,94 @@ def point_chisq_code(numpy.ndarray[REALTYPE, ndim=1] chisq,
     free(outr_tmp)
     free(outi_tmp)
 
+@boundscheck(False)
+@wraparound(False)
+@cdivision(True)
+def batch_point_chisq_code(numpy.ndarray[REALTYPE, ndim=1] chisq,
+                           numpy.ndarray[long, ndim=1] corrs,
+                           numpy.ndarray[long, ndim=1] slens,
+                           numpy.ndarray[REALTYPE, ndim=1] shifts,
+                           numpy.ndarray[numpy.uint32_t, ndim=1] bins,
+                           numpy.ndarray[long, ndim=1] bin_starts,
+                           numpy.ndarray[long, ndim=1] bin_ends,
+                           numpy.ndarray[long, ndim=1] point_starts):
+    """ The shift sum of point_chisq_code for many tasks at once. Task t
+    sums the vector at address corrs[t], of length slens[t], over the bins
+    with edges bins[bin_starts[t]:bin_ends[t]] at the points
+    shifts[point_starts[t]:point_starts[t+1]]. The tasks are run in
+    parallel.
+    """
+    cdef long ntasks = len(corrs)
+    cdef long t, n, p0, r, i, j, bstart, bend, slen
+    cdef REALTYPE *v1
+    cdef REALTYPE *outr
+    cdef REALTYPE *outi
+    cdef REALTYPE *pr
+    cdef REALTYPE *pi
+    cdef REALTYPE *vsr
+    cdef REALTYPE *vsi
+    cdef REALTYPE vr, vi, t1, t2, k1, k2, k3, vs, va
+
+    for t in prange(ntasks, nogil=True, schedule='dynamic'):
+        # the complex vector is read as interleaved real and imaginary parts
+        v1 = <REALTYPE *> corrs[t]
+        slen = slens[t]
+        p0 = point_starts[t]
+        n = point_starts[t + 1] - p0
+
+        outr = <REALTYPE *> malloc(n * sizeof(REALTYPE))
+        outi = <REALTYPE *> malloc(n * sizeof(REALTYPE))
+        pr = <REALTYPE *> malloc(n * sizeof(REALTYPE))
+        pi = <REALTYPE *> malloc(n * sizeof(REALTYPE))
+        vsr = <REALTYPE *> malloc(n * sizeof(REALTYPE))
+        vsi = <REALTYPE *> malloc(n * sizeof(REALTYPE))
+
+        for r in range(bin_starts[t], bin_ends[t] - 1):
+            bstart = bins[r]
+            bend = bins[r + 1]
+
+            # start the cumulative rotations at the offset point
+            for i in range(n):
+                pr[i] = cos(2 * 3.141592653 * shifts[p0 + i] * (bstart) / slen)
+                pi[i] = sin(2 * 3.141592653 * shifts[p0 + i] * (bstart) / slen)
+                vsr[i] = cos(2 * 3.141592653 * shifts[p0 + i] / slen)
+                vsi[i] = sin(2 * 3.141592653 * shifts[p0 + i] / slen)
+                outr[i] = 0
+                outi[i] = 0
+
+            for j in range(bstart, bend):
+                vr = v1[2 * j]
+                vi = v1[2 * j + 1]
+                vs = vr + vi
+                va = vi - vr
+
+                for i in range(n):
+                    t1 = pr[i]
+                    t2 = pi[i]
+
+                    # Complex multiply pr[i] * v
+                    k1 = vr * (t1 + t2)
+                    k2 = t1 * va
+                    k3 = t2 * vs
+
+                    outr[i] = outr[i] + k1 - k3
+                    outi[i] = outi[i] + k1 + k2
+
+                    # phase shift for the next time point
+                    pr[i] = t1 * vsr[i] - t2 * vsi[i]
+                    pi[i] = t1 * vsi[i] + t2 * vsr[i]
+
+            for i in range(n):
+                chisq[p0 + i] = chisq[p0 + i] + \
+                    outr[i] * outr[i] + outi[i] * outi[i]
+
+        free(outr)
+        free(outi)
+        free(pr)
+        free(pi)
+        free(vsr)
+        free(vsi)
+
 def chisq_accum_bin_numpy(chisq, q):
     chisq += q.squared_norm()
 
@@ -155,3 +244,41 @@ def shift_sum(v1, shifts, bins):
 
     return  chisq
 
+# The points of each vector are split in blocks of at most this size, which
+# are the units of work shared between threads
+_BATCH_BLOCK_SIZE = 32
+
+def shift_sum_batch(corrs, indices, bins):
+    real_type = real_same_precision_as(corrs[0])
+    # the vectors are passed by address, so keep references to them
+    vectors = []
+    shifts = []
+    all_bins = []
+    tasks = []
+    bin_start = 0
+    for corr, points, edges in zip(corrs, indices, bins):
+        v1 = numpy.array(corr.data, copy=False)
+        vectors.append(v1)
+        shifts.append(numpy.array(points, dtype=real_type))
+        all_bins.append(numpy.array(edges, dtype=numpy.uint32))
+        for start in range(0, len(points), _BATCH_BLOCK_SIZE):
+            tasks.append((v1.ctypes.data, len(v1), bin_start,
+                          bin_start + len(edges),
+                          min(_BATCH_BLOCK_SIZE, len(points) - start)))
+        bin_start += len(edges)
+
+    counts = [len(s) for s in shifts]
+    chisq = numpy.zeros(sum(counts), dtype=real_type)
+    if tasks:
+        ptrs, slens, bin_starts, bin_ends, sizes = zip(*tasks)
+        point_starts = numpy.zeros(len(tasks) + 1, dtype=numpy.int_)
+        point_starts[1:] = numpy.cumsum(sizes)
+        batch_point_chisq_code(chisq,
+                               numpy.array(ptrs, dtype=numpy.int_),
+                               numpy.array(slens, dtype=numpy.int_),
+                               numpy.concatenate(shifts),
+                               numpy.concatenate(all_bins),
+                               numpy.array(bin_starts, dtype=numpy.int_),
+                               numpy.array(bin_ends, dtype=numpy.int_),
+                               point_starts)
+    return numpy.split(chisq, numpy.cumsum(counts)[:-1])
@@ -347,3 +347,7 @@ def shift_sum(corr, points, bins):
 
 
 
+
+def shift_sum_batch(corrs, indices, bins):
+    return [shift_sum(corr, points, edges)
+            for corr, points, edges in zip(corrs, indices, bins)]
@@ -27,7 +27,10 @@ This module provides classes that describe banks of waveforms
 """
 import types
 import logging
+import os
 import os.path
+import json
+import hashlib
 import h5py
 from copy import copy
 import numpy as np
@@ -607,6 +610,165 @@ class LiveFilterBank(TemplateBank):
         return htilde
 
 
+class TemplateCache(object):
+    """ An on-disk cache of generated frequency-domain templates
+
+    Each template is stored in its own ``.npy`` file, which is memory mapped
+    when read, together with a small ``.json`` file of its metadata. Files
+    are written under a temporary name and renamed into place, so several
+    jobs on a node can share one cache directory: the first job to generate
+    a template stores it, and later jobs read it back instead of generating
+    it again. When a maximum size is given, the least recently used
+    templates are removed once the cache grows beyond it.
+
+    Parameters
+    ----------
+    path: str
+        The directory holding the cache. It is created if it does not exist.
+    max_size: {None, int}
+        The maximum size of the cache in bytes. If None, the cache is not
+        limited in size.
+    """
+    def __init__(self, path, max_size=None):
+        self.path = path
+        self.max_size = max_size
+        self._size = None
+        try:
+            os.makedirs(path)
+        except OSError:
+            if not os.path.isdir(path):
+                raise
+
+    @staticmethod
+    def key(*args):
+        """ Return the cache key of a template from the values which
+        determine it, e.g. the template hash, approximant, frequency
+        resolution, frequency range and length.
+        """
+        return hashlib.sha1(repr(args).encode('utf-8')).hexdigest()
+
+    def _filenames(self, key):
+        fname = os.path.join(self.path, key)
+        return fname + '.npy', fname + '.json'
+
+    def read(self, key, out):
+        """ Read a template from the cache
+
+        Parameters
+        ----------
+        key: str
+            The cache key of the template
+        out: Array
+            The memory to write the template into. Elements beyond the
+            stored template are not changed, so this should already be zeroed.
+
+        Returns
+        -------
+        htilde: {None, FrequencySeries}
+            The template, using the memory of out, or None if it is not in
+            the cache.
+        """
+        npyname, jsonname = self._filenames(key)
+        try:
+            data = np.load(npyname, mmap_mode='r')
+            with open(jsonname, 'r') as f:
+                meta = json.load(f)
+            # mark as recently used
+            os.utime(npyname, None)
+        except (IOError, OSError, ValueError):
+            return None
+        if len(data) > len(out) or meta['length'] != len(out):
+            return None
+        out.numpy()[:len(data)] = data
+        htilde = FrequencySeries(out, delta_f=meta['delta_f'],
+                                 epoch=meta['epoch'], copy=False)
+        htilde.chirp_length = meta['chirp_length']
+        htilde.length_in_time = meta['length_in_time']
+        return htilde
+
+    def write(self, key, htilde):
+        """ Write a template to the cache
+
+        Failures to write are logged and otherwise ignored, as the template
+        can always be generated again.
+
+        Parameters
+        ----------
+        key: str
+            The cache key of the template
+        htilde: FrequencySeries
+            The template
+        """
+        data = htilde.numpy()
+        # trailing zeros are not stored
+        nonzero = np.flatnonzero(data)
+        data = data[:nonzero[-1] + 1] if len(nonzero) else data[:0]
+        meta = {'length': len(htilde), 'delta_f': float(htilde.delta_f)}
+        for attr in ['epoch', 'chirp_length', 'length_in_time']:
+            val = getattr(htilde, attr, None)
+            meta[attr] = None if val is None else float(val)
+        npyname, jsonname = self._filenames(key)
+        suffix = '.%s.tmp' % os.getpid()
+        try:
+            with open(jsonname + suffix, 'w') as f:
+                json.dump(meta, f)
+            with open(npyname + suffix, 'wb') as f:
+                np.save(f, data)
+            # the metadata is moved into place first, as the data file
+            # marks a complete entry
+            os.rename(jsonname + suffix, jsonname)
+            os.rename(npyname + suffix, npyname)
+        except (IOError, OSError, TypeError) as err:
+            logging.warning('Could not write template to cache: %s', err)
+            for fname in [jsonname + suffix, npyname + suffix]:
+                if os.path.exists(fname):
+                    os.remove(fname)
+            return
+        self._evict(data.nbytes)
+
+    def _entries(self):
+        """ Return the (last use, size, key) of every template stored """
+        entries = []
+        for fname in os.listdir(self.path):
+            if not fname.endswith('.npy'):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.path, fname))
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, fname[:-4]))
+        return entries
+
+    def _evict(self, added):
+        """ Remove the least recently used templates if the cache is larger
+        than its maximum size
+        """
+        if self.max_size is None:
+            return
+        if self._size is None:
+            self._size = sum(e[1] for e in self._entries())
+        else:
+            self._size += added
+        if self._size <= self.max_size:
+            return
+
+        # Remove templates until the cache is somewhat below the maximum
+        # size, so that this is not done again on every write. Other jobs
+        # may have added or removed templates, so the size is measured.
+        entries = sorted(self._entries())
+        self._size = sum(e[1] for e in entries)
+        target = 0.9 * self.max_size
+        for _, size, key in entries:
+            if self._size <= target:
+                break
+            for fname in self._filenames(key):
+                try:
+                    os.remove(fname)
+                except OSError:
+                    pass
+            self._size -= size
+
+
 class FilterBank(TemplateBank):
     def __init__(self, filename, filter_length, delta_f, dtype,
                  out=None, max_template_length=None,
@@ -614,9 +776,11 @@ class FilterBank(TemplateBank):
                  enable_compressed_waveforms=True,
                  low_frequency_cutoff=None,
                  waveform_decompression_method=None,
+                 template_cache=None,
                  **kwds):
         self.out = out
         self.dtype = dtype
+        self.template_cache = template_cache
         self.f_lower = low_frequency_cutoff
         self.filename = filename
         self.delta_f = delta_f
@@ -713,7 +877,10 @@ class FilterBank(TemplateBank):
             tempout = zeros(self.filter_length, dtype=self.dtype)
         else:
             tempout = self.out
+        return self._generate_template(index, tempout)
 
+    def _generate_template(self, index, tempout):
+        """ Generate the template with the given index into tempout """
         approximant = self.approximant(index)
         f_end = self.end_frequency(index)
         if f_end is None or f_end >= (self.filter_length * self.delta_f):
@@ -741,11 +908,22 @@ class FilterBank(TemplateBank):
             htilde = self.get_decompressed_waveform(tempout, index, f_lower=f_low,
                                                     approximant=approximant, df=None)
         else :
-            htilde = pycbc.waveform.get_waveform_filter(
-                tempout[0:self.filter_length], self.table[index],
-                approximant=approximant, f_lower=f_low, f_final=f_end,
-                delta_f=self.delta_f, delta_t=self.delta_t, distance=distance,
-                **self.extra_args)
+            htilde = None
+            if self.template_cache is not None:
+                key = self.template_cache.key(
+                    int(self.table.template_hash[index]), approximant,
+                    float(self.delta_f), float(f_low), float(f_end),
+                    self.filter_length, sorted(self.extra_args.items()))
+                htilde = self.template_cache.read(
+                    key, tempout[0:self.filter_length])
+            if htilde is None:
+                htilde = pycbc.waveform.get_waveform_filter(
+                    tempout[0:self.filter_length], self.table[index],
+                    approximant=approximant, f_lower=f_low, f_final=f_end,
+                    delta_f=self.delta_f, delta_t=self.delta_t,
+                    distance=distance, **self.extra_args)
+                if self.template_cache is not None:
+                    self.template_cache.write(key, htilde)
 
         # If available, record the total duration (which may
         # include ringdown) and the duration up to merger since they will be
@@ -773,6 +951,112 @@ class FilterBank(TemplateBank):
         htilde._sigmasq = {}
         return htilde
 
+    def _move_to_out(self, htilde):
+        """ Copy a template generated in other memory into self.out,
+        keeping its metadata
+        """
+        self.out.clear()
+        self.out[0:len(htilde)] = htilde
+        moved = FrequencySeries(self.out[0:len(htilde)],
+                                delta_f=htilde.delta_f, epoch=htilde._epoch,
+                                copy=False)
+        for attr in ['f_lower', 'min_f_lower', 'end_idx', 'params',
+                     'chirp_length', 'length_in_time', 'approximant',
+                     'end_frequency']:
+            setattr(moved, attr, getattr(htilde, attr))
+        moved.sigmasq = types.MethodType(sigma_cached, moved)
+        moved._sigmasq = {}
+        return moved
+
+    def prefetch(self, t_nums, depth=2):
+        """ Iterate over templates, generating the next ones in a thread
+
+        While the caller filters the current template, the next ``depth``
+        templates are generated in a thread, each into memory of its own.
+        When a template is reached it is copied into ``out`` (if set), so it
+        can be used exactly as one returned by ``__getitem__``. The output
+        memory is read each time a template is yielded, so ``out`` may be
+        changed between templates.
+
+        Parameters
+        ----------
+        t_nums: iterable of ints
+            The templates to generate, in order
+        depth: int, optional
+            The maximum number of templates to generate ahead of the
+            caller. If 0, the templates are generated without a thread.
+
+        Yields
+        ------
+        t_num: int
+            The template index
+        htilde: FrequencySeries
+            The template, with the same metadata as from ``__getitem__``
+        """
+        if depth < 1:
+            for t_num in t_nums:
+                yield t_num, self[t_num]
+            return
+
+        import threading
+        from six.moves import queue
+
+        ready = queue.Queue(maxsize=depth)
+        stop = threading.Event()
+        # Memory to generate into, recycled once a template has been copied
+        # to the output memory
+        free = None
+        if self.out is not None:
+            free = queue.Queue()
+            for _ in range(depth + 1):
+                free.put(zeros(len(self.out), dtype=self.out.dtype))
+
+        def generate():
+            try:
+                for t_num in t_nums:
+                    if stop.is_set():
+                        return
+                    if free is None:
+                        tempout = zeros(self.filter_length, dtype=self.dtype)
+                    else:
+                        tempout = free.get()
+                        if tempout is None:
+                            return
+                    ready.put((t_num, tempout,
+                               self._generate_template(t_num, tempout)))
+            except Exception as err: # pylint:disable=broad-except
+                ready.put(err)
+                return
+            ready.put(None)
+
+        generator = threading.Thread(target=generate)
+        generator.daemon = True
+        generator.start()
+        try:
+            while True:
+                item = ready.get()
+                if item is None:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                t_num, tempout, htilde = item
+                if free is not None:
+                    htilde = self._move_to_out(htilde)
+                    free.put(tempout)
+                yield t_num, htilde
+        finally:
+            stop.set()
+            if free is not None:
+                # Unblock the generator if it is waiting for memory
+                free.put(None)
+            # Unblock the generator if it is waiting on a full queue
+            while generator.is_alive():
+                try:
+                    ready.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            generator.join()
+
 def find_variable_start_frequency(approximant, parameters, f_start, max_length,
                                   delta_f = 1):
     """ Find a frequency value above the starting frequency that results in a
@@ -25,6 +25,7 @@
 This modules provides classes for generating waveforms.
 """
 
+import numpy
 from . import waveform
 from . import ringdown
 from pycbc import filter
@@ -389,6 +390,139 @@ class TDomainFreqTauRingdownGenerator(BaseGenerator):
         super(TDomainFreqTauRingdownGenerator, self).__init__(ringdown.get_td_from_freqtau,
             variable_args=variable_args, **frozen_params)
 
+class DetectorProjection(object):
+    """Projects radiation-frame polarizations onto a detector.
+
+    This does the same calculation as ``Detector.antenna_pattern`` and
+    ``Detector.time_delay_from_earth_center``, but for many sky locations
+    and polarizations at once. The detector response tensor and location are
+    stored on initialization, and the Greenwich mean sidereal time of the
+    last coalescence time(s) is cached, so repeated calls at the same ``tc``
+    only need to evaluate the sky-location dependent terms.
+
+    Parameters
+    ----------
+    detector : Detector
+        The detector to project onto.
+    """
+    def __init__(self, detector):
+        self.detector = detector
+        self.response = numpy.array(detector.response)
+        self.location = numpy.array(detector.location)
+        self._gmst_tc = None
+        self._gmst = None
+        self._sample_frequencies = None
+        self._sample_frequencies_df = None
+
+    def gmst(self, tc):
+        """Returns the Greenwich mean sidereal time at the given time(s)."""
+        if self._gmst_tc is None or numpy.shape(tc) != numpy.shape(
+                self._gmst_tc) or numpy.any(tc != self._gmst_tc):
+            self._gmst = self.detector.gmst_estimate(tc)
+            self._gmst_tc = numpy.copy(tc)
+        return self._gmst
+
+    def antenna_pattern(self, ra, dec, polarization, tc):
+        """Returns the plus and cross antenna patterns.
+
+        Parameters
+        ----------
+        ra : float or numpy.ndarray
+            The right ascension of the source(s).
+        dec : float or numpy.ndarray
+            The declination of the source(s).
+        polarization : float or numpy.ndarray
+            The polarization angle of the source(s).
+        tc : float or numpy.ndarray
+            The geocentric GPS time of coalescence of the source(s).
+
+        Returns
+        -------
+        fplus : numpy.ndarray
+            The plus polarization factor for each source.
+        fcross : numpy.ndarray
+            The cross polarization factor for each source.
+        """
+        gha = self.gmst(tc) - ra
+        cosgha = numpy.cos(gha)
+        singha = numpy.sin(gha)
+        cosdec = numpy.cos(dec)
+        sindec = numpy.sin(dec)
+        cospsi = numpy.cos(polarization)
+        sinpsi = numpy.sin(polarization)
+        x = numpy.array([-cospsi * singha - sinpsi * cosgha * sindec,
+                         -cospsi * cosgha + sinpsi * singha * sindec,
+                         sinpsi * cosdec * numpy.ones_like(gha)])
+        y = numpy.array([sinpsi * singha - cospsi * cosgha * sindec,
+                         sinpsi * cosgha + cospsi * singha * sindec,
+                         cospsi * cosdec * numpy.ones_like(gha)])
+        dx = numpy.tensordot(self.response, x, axes=1)
+        dy = numpy.tensordot(self.response, y, axes=1)
+        fplus = (x * dx - y * dy).sum(axis=0)
+        fcross = (x * dy + y * dx).sum(axis=0)
+        return fplus, fcross
+
+    def time_delay_from_earth_center(self, ra, dec, tc):
+        """Returns the time delay from the earth center to the detector for
+        the given sky location(s).
+        """
+        ra_angle = self.gmst(tc) - ra
+        cosd = numpy.cos(dec)
+        ehat = numpy.array([cosd * numpy.cos(ra_angle),
+                            -cosd * numpy.sin(ra_angle),
+                            numpy.sin(dec) * numpy.ones_like(ra_angle)])
+        return -numpy.tensordot(self.location, ehat, axes=1) / _lal.C_SI
+
+    def sample_frequencies(self, htilde):
+        """Returns the frequencies of the given frequency series, reusing the
+        array from the last call if the length and resolution are the same.
+        """
+        if self._sample_frequencies is None or \
+                len(self._sample_frequencies) != len(htilde) or \
+                self._sample_frequencies_df != htilde.delta_f:
+            self._sample_frequencies = htilde.sample_frequencies.numpy()
+            self._sample_frequencies_df = htilde.delta_f
+        return self._sample_frequencies
+
+    def project(self, hp, hc, ra, dec, polarization, tc, tshift=0.):
+        """Projects the given polarizations onto the detector for one or more
+        sources, and shifts them to the arrival time at the detector.
+
+        Parameters
+        ----------
+        hp : FrequencySeries
+            The plus polarization.
+        hc : FrequencySeries
+            The cross polarization.
+        ra : float or numpy.ndarray
+            The right ascension of the source(s).
+        dec : float or numpy.ndarray
+            The declination of the source(s).
+        polarization : float or numpy.ndarray
+            The polarization angle of the source(s).
+        tc : float or numpy.ndarray
+            The geocentric GPS time of coalescence of the source(s).
+        tshift : float, optional
+            Additional time shift to apply.
+
+        Returns
+        -------
+        numpy.ndarray
+            Array of shape (number of sources, len(hp)) with the waveform in
+            the detector. The time shift is relative to the epoch of ``hp``.
+        """
+        ra, dec, polarization, tc = numpy.broadcast_arrays(
+            *[numpy.atleast_1d(numpy.asarray(x, dtype=float))
+              for x in (ra, dec, polarization, tc)])
+        fp, fc = self.antenna_pattern(ra, dec, polarization, tc)
+        dt = tc + self.time_delay_from_earth_center(ra, dec, tc) + tshift \
+            - float(hp.epoch)
+        freqs = self.sample_frequencies(hp)
+        h = fp[:, None] * hp.numpy() + fc[:, None] * hc.numpy()
+        h *= numpy.exp(-2j * numpy.pi * numpy.outer(dt, freqs))
+        return h
+
+
 class FDomainDetFrameGenerator(object):
     """Generates frequency-domain waveform in a specific frame.
 
@@ -442,6 +576,9 @@ class FDomainDetFrameGenerator(object):
     detector_names : list
         The list of detector names. If no detectors were provided, then this
         will be ['RF'] for "radiation frame".
+    projections : dict
+        The ``DetectorProjection`` used to apply the response function of
+        each detector. Empty if no detectors were provided.
     epoch : lal.LIGOTimeGPS
         The GPS start time of the frequency series returned by the generate function.
         A time shift is applied to the waveform equal to tc-epoch. Update by using
@@ -500,6 +637,8 @@ class FDomainDetFrameGenerator(object):
         # location variables are specified
         if detectors is not None:
             self.detectors = {det: Detector(det) for det in detectors}
+            self.projections = {det: DetectorProjection(d)
+                                for det, d in self.detectors.items()}
             missing_args = [arg for arg in self.location_args if not
                 (arg in self.current_params or arg in self.variable_args)]
             if any(missing_args):
@@ -509,8 +648,13 @@ class FDomainDetFrameGenerator(object):
                     "variable args.")
         else:
             self.detectors = {'RF': None}
+            self.projections = {}
         self.detector_names = sorted(self.detectors.keys())
         self.gates = gates
+        # the last radiation-frame waveform, which is reused if only location
+        # parameters change between calls
+        self._rframe_params = {}
+        self._rframe_waveform = None
 
     def set_epoch(self, epoch):
         """Sets the epoch; epoch should be a float or a LIGOTimeGPS."""
@@ -525,37 +669,78 @@ class FDomainDetFrameGenerator(object):
     def epoch(self):
         return _lal.LIGOTimeGPS(self._epoch)
 
-    def generate(self, **kwargs):
-        """Generates a waveform, applies a time shift and the detector response
-        function from the given kwargs.
+    def _rframe_cached(self, rfparams):
+        """Whether the stored radiation-frame waveform was generated with
+        the given parameters.
+        """
+        if self._rframe_waveform is None:
+            return False
+        try:
+            return all(param in self._rframe_params and
+                       bool(self._rframe_params[param] == val)
+                       for param, val in rfparams.items())
+        except (TypeError, ValueError):
+            # parameters that cannot be compared as scalars are always
+            # regenerated
+            return False
+
+    def generate_rframe(self, **kwargs):
+        """Generates the radiation-frame polarizations from the given kwargs.
+
+        Location parameters are ignored. If none of the other parameters
+        have changed since the last call, the last polarizations are returned
+        without regenerating them, so these must not be modified in place.
+
+        Returns
+        -------
+        hp : FrequencySeries
+            The plus polarization, with epoch set to the generator's epoch.
+        hc : FrequencySeries
+            The cross polarization, with epoch set to the generator's epoch.
+        tshift : float
+            Additional time shift to apply to the polarizations to place the
+            peak amplitude at ``tc``.
         """
         self.current_params.update(kwargs)
         rfparams = {param: self.current_params[param]
             for param in kwargs if param not in self.location_args}
-        hp, hc = self.rframe_generator.generate(**rfparams)
-        if isinstance(hp, TimeSeries):
-            df = self.current_params['delta_f']
-            hp = hp.to_frequencyseries(delta_f=df)
-            hc = hc.to_frequencyseries(delta_f=df)
-            # time-domain waveforms will not be shifted so that the peak amp
-            # happens at the end of the time series (as they are for f-domain),
-            # so we add an additional shift to account for it
-            tshift = 1./df - abs(hp._epoch)
+        if self._rframe_cached(rfparams):
+            hp, hc, tshift = self._rframe_waveform
         else:
-            tshift = 0.
+            self._rframe_waveform = None
+            self._rframe_params.update(rfparams)
+            hp, hc = self.rframe_generator.generate(**rfparams)
+            if isinstance(hp, TimeSeries):
+                df = self.current_params['delta_f']
+                hp = hp.to_frequencyseries(delta_f=df)
+                hc = hc.to_frequencyseries(delta_f=df)
+                # time-domain waveforms will not be shifted so that the peak
+                # amp happens at the end of the time series (as they are for
+                # f-domain), so we add an additional shift to account for it
+                tshift = 1./df - abs(hp._epoch)
+            else:
+                tshift = 0.
+            self._rframe_waveform = (hp, hc, tshift)
         hp._epoch = hc._epoch = self._epoch
+        return hp, hc, tshift
+
+    def generate(self, **kwargs):
+        """Generates a waveform, applies a time shift and the detector response
+        function from the given kwargs.
+        """
+        hp, hc, tshift = self.generate_rframe(**kwargs)
         h = {}
         if self.detector_names != ['RF']:
-            for detname, det in self.detectors.items():
+            for detname, proj in self.projections.items():
                 # apply detector response function
-                fp, fc = det.antenna_pattern(self.current_params['ra'],
+                fp, fc = proj.antenna_pattern(self.current_params['ra'],
                             self.current_params['dec'],
                             self.current_params['polarization'],
                             self.current_params['tc'])
                 thish = fp*hp + fc*hc
                 # apply the time shift
                 tc = self.current_params['tc'] + \
-                    det.time_delay_from_earth_center(self.current_params['ra'],
+                    proj.time_delay_from_earth_center(self.current_params['ra'],
                          self.current_params['dec'], self.current_params['tc'])
                 h[detname] = apply_fd_time_shift(thish, tc+tshift, copy=False)
                 if self.recalib:
@@ -564,10 +749,12 @@ class FDomainDetFrameGenerator(object):
                         self.recalib[detname].map_to_adjust(h[detname],
                             **self.current_params)
         else:
-            # no detector response, just use the + polarization
+            # no detector response, just use the + polarization; this is
+            # copied so that the stored polarization is not modified
             if 'tc' in self.current_params:
-                hp = apply_fd_time_shift(hp, self.current_params['tc']+tshift,
-                                         copy=False)
+                hp = apply_fd_time_shift(hp, self.current_params['tc']+tshift)
+            else:
+                hp = 1. * hp
             h['RF'] = hp
         if self.gates is not None:
             # resize all to nearest power of 2
@@ -576,6 +763,56 @@ class FDomainDetFrameGenerator(object):
             h = strain.apply_gates_to_fd(h, self.gates)
         return h
 
+    def generate_projected(self, **kwargs):
+        """Generates the waveform in each detector for many values of the
+        location parameters at once.
+
+        The radiation-frame polarizations are generated once (or reused from
+        the last call, if the other parameters have not changed), then
+        projected onto every detector for all of the given sky locations,
+        polarizations and coalescence times in one vectorized operation.
+
+        Parameters
+        ----------
+        \**kwargs :
+            Values of the parameters to generate. Any of the location
+            parameters may be arrays, which are broadcast against each other;
+            all other parameters must be scalars.
+
+        Returns
+        -------
+        dict
+            Dictionary of detector names -> complex arrays of shape
+            (number of locations, number of frequencies), with the same
+            epoch and frequency resolution as the series returned by
+            ``generate``.
+        """
+        given = [param for param in ('ra', 'dec', 'polarization', 'tc')
+                 if param in kwargs or param in self.current_params]
+        locs = numpy.broadcast_arrays(*[numpy.atleast_1d(numpy.asarray(
+            kwargs.pop(param) if param in kwargs
+            else self.current_params.get(param, 0.), dtype=float))
+            for param in ('ra', 'dec', 'polarization', 'tc')])
+        locs = dict(zip(('ra', 'dec', 'polarization', 'tc'), locs))
+        if self.recalib or self.gates is not None:
+            # calibration and gating act on each waveform separately
+            wfs = []
+            for ii in range(len(locs['tc'])):
+                kwargs.update({param: locs[param][ii] for param in given})
+                wfs.append(self.generate(**kwargs))
+            return {det: numpy.array([h[det].numpy() for h in wfs])
+                    for det in self.detector_names}
+        hp, hc, tshift = self.generate_rframe(**kwargs)
+        if self.detector_names == ['RF']:
+            # no detector response, just shift the + polarization
+            dt = locs['tc'] + tshift - self._epoch if 'tc' in given \
+                else numpy.zeros(len(locs['tc']))
+            freqs = hp.sample_frequencies.numpy()
+            return {'RF': hp.numpy() * numpy.exp(
+                -2j * numpy.pi * numpy.outer(dt, freqs))}
+        return {det: proj.project(hp, hc, tshift=tshift, **locs)
+                for det, proj in self.projections.items()}
+
 
 def select_waveform_generator(approximant):
     """Returns the single-IFO generator for the approximant.
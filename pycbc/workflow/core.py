@@ -1207,6 +1207,77 @@ class File(pegasus_workflow.File):
         return "%s-%s-%s-%s.%s" % (ifo, description.upper(), start,
                                    duration, extension)
 
+class _SegmentIntervalTree(object):
+    '''
+    A centered interval tree of segments, used by FileList to find the
+    segments that overlap a time range without looking at every segment.
+
+    Each node holds the segments containing its center time, sorted both by
+    start and by end, and the segments entirely before or after the center
+    are split between its two children. A query only descends into a child
+    if the time range extends past the center on that side.
+    '''
+    def __init__(self, starts, ends, positions):
+        '''
+        Parameters
+        -----------
+        starts : list of floats
+            The start times of the segments.
+        ends : list of floats
+            The end times of the segments.
+        positions : list of ints
+            The value to return for each segment, in FileList the position
+            of the File the segment belongs to.
+        '''
+        self.starts = numpy.array(starts, dtype=float)
+        self.ends = numpy.array(ends, dtype=float)
+        self.positions = numpy.array(positions, dtype=int)
+        self.root = self._build(numpy.arange(len(self.starts)))
+
+    def _build(self, idx):
+        if not len(idx):
+            return None
+        starts = self.starts[idx]
+        ends = self.ends[idx]
+        # The median of the end points leaves at most half of the segments
+        # on either side, so the depth of the tree is logarithmic
+        center = numpy.median(numpy.concatenate([starts, ends]))
+        here = idx[(starts <= center) & (ends >= center)]
+        by_start = here[self.starts[here].argsort(kind='mergesort')]
+        by_end = here[(-self.ends[here]).argsort(kind='mergesort')]
+        return (center,
+                self.starts[by_start], self.positions[by_start],
+                -self.ends[by_end], self.positions[by_end],
+                self._build(idx[ends < center]),
+                self._build(idx[starts > center]))
+
+    def overlapping(self, start, end):
+        '''
+        Return the positions of the segments overlapping [start, end]. A
+        position is given once for each of its segments that overlaps.
+        '''
+        found = [numpy.array([], dtype=int)]
+        nodes = [self.root]
+        while nodes:
+            node = nodes.pop()
+            if node is None:
+                continue
+            center, starts, by_start, neg_ends, by_end, left, right = node
+            if end < center:
+                # Every segment here ends after the range starts
+                num = numpy.searchsorted(starts, end, side='right')
+                found.append(by_start[:num])
+                nodes.append(left)
+            elif start > center:
+                # Every segment here starts before the range ends
+                num = numpy.searchsorted(neg_ends, -start, side='right')
+                found.append(by_end[:num])
+                nodes.append(right)
+            else:
+                found.append(by_start)
+                nodes += [left, right]
+        return numpy.concatenate(found)
+
 class FileList(list):
     '''
     This class holds a list of File objects. It inherits from the
@@ -1215,6 +1286,84 @@ class FileList(list):
     '''
     entry_class = File
 
+    # Files overlapping a time or time range are found using an interval tree
+    # of the segments of the files valid for each ifo. The tree is built when
+    # first needed and dropped when the list changes.
+    _time_index_tolerance = 1e-3
+
+    def _invalidate_time_index(self):
+        self._time_indexes = {}
+        self._time_index_length = len(self)
+
+    def append(self, item):
+        super(FileList, self).append(item)
+        self._invalidate_time_index()
+
+    def extend(self, items):
+        super(FileList, self).extend(items)
+        self._invalidate_time_index()
+
+    def insert(self, index, item):
+        super(FileList, self).insert(index, item)
+        self._invalidate_time_index()
+
+    def __iadd__(self, items):
+        self.extend(items)
+        return self
+
+    def __setitem__(self, index, item):
+        super(FileList, self).__setitem__(index, item)
+        self._invalidate_time_index()
+
+    def sort(self, *args, **kwargs):
+        super(FileList, self).sort(*args, **kwargs)
+        self._invalidate_time_index()
+
+    def reverse(self):
+        super(FileList, self).reverse()
+        self._invalidate_time_index()
+
+    def _get_time_index(self, ifo):
+        '''
+        Return the index of the segments of all Files valid for the given
+        ifo, building it if needed. Removing entries changes the length of
+        the list, which also invalidates the index.
+
+        Returns
+        --------
+        index : _SegmentIntervalTree
+            An interval tree of the segments, giving the position in this
+            list of the File each segment belongs to.
+        '''
+        if getattr(self, '_time_index_length', None) != len(self):
+            self._invalidate_time_index()
+        if ifo not in self._time_indexes:
+            starts = []
+            ends = []
+            positions = []
+            for idx, entry in enumerate(self):
+                if ifo not in entry.ifo_list:
+                    continue
+                for seg in entry.segment_list:
+                    starts.append(float(seg[0]))
+                    ends.append(float(seg[1]))
+                    positions.append(idx)
+            self._time_indexes[ifo] = _SegmentIntervalTree(starts, ends,
+                                                           positions)
+        return self._time_indexes[ifo]
+
+    def _find_candidates(self, ifo, start, end):
+        '''
+        Return the Files valid for the given ifo whose segments may overlap
+        [start, end], in list order. The candidates are found from the time
+        index using floating point times with a small tolerance, so callers
+        must still check the exact segments.
+        '''
+        index = self._get_time_index(ifo)
+        tol = self._time_index_tolerance
+        positions = index.overlapping(float(start) - tol, float(end) + tol)
+        return [self[i] for i in numpy.unique(positions)]
+
     def categorize_by_attr(self, attribute):
         '''
         Function to categorize a FileList by a File object
@@ -1304,7 +1453,8 @@ class FileList(list):
            The Files that corresponds to the time.
          '''
         # Get list of Files that overlap time, for given ifo
-        outFiles = [i for i in self if ifo in i.ifo_list and time in i.segment_list]
+        outFiles = [i for i in self._find_candidates(ifo, time, time)
+                    if time in i.segment_list]
         if len(outFiles) == 0:
             # No OutFile at this time
             return None
@@ -1380,16 +1530,10 @@ class FileList(list):
         '''
         currsegment_list = segments.segmentlist([segments.segment(start, end)])
 
-        # First filter Files corresponding to ifo
-        outFiles = [i for i in self if ifo in i.ifo_list]
-
-        if len(outFiles) == 0:
-            # No OutFiles correspond to that ifo
-            return None
-        # Filter OutFiles to those overlapping the given window
+        # Filter Files corresponding to ifo to those overlapping the window
         currSeg = segments.segment([start,end])
-        outFiles = [i for i in outFiles \
-                                  if i.segment_list.intersects_segment(currSeg)]
+        outFiles = [i for i in self._find_candidates(ifo, start, end)
+                    if i.segment_list.intersects_segment(currSeg)]
 
         if len(outFiles) == 0:
             # No OutFile overlap that time period
@@ -1409,36 +1553,13 @@ class FileList(list):
     def find_all_output_in_range(self, ifo, currSeg, useSplitLists=False):
         """
         Return all files that overlap the specified segment.
-        """
-        if not useSplitLists:
-            # Slower, but simpler method
-            outFiles = [i for i in self if ifo in i.ifo_list]
-            outFiles = [i for i in outFiles \
-                                      if i.segment_list.intersects_segment(currSeg)]
-        else:
-            # Faster, but more complicated
-            # Basically only check if a subset of files intersects_segment by
-            # using a presorted list. Sorting only happens once.
-            if not self._check_split_list_validity():
-                # FIXME: DO NOT hard code this.
-                self._temporal_split_list(100)
-            startIdx = int( (currSeg[0] - self._splitListsStart) / \
-                                                          self._splitListsStep )
-            # Add some small rounding here
-            endIdx = (currSeg[1] - self._splitListsStart) / self._splitListsStep
-            endIdx = int(endIdx - 0.000001)
-
-            outFiles = []
-            for idx in range(startIdx, endIdx + 1):
-                if idx < 0 or idx >= self._splitListsNum:
-                    continue
-                outFilesTemp = [i for i in self._splitLists[idx] \
-                                                            if ifo in i.ifo_list]
-                outFiles.extend([i for i in outFilesTemp \
-                                      if i.segment_list.intersects_segment(currSeg)])
-                # Remove duplicates
-                outFiles = list(set(outFiles))
 
+        The useSplitLists argument is no longer needed, as all queries use
+        the time index of the list, and is ignored.
+        """
+        outFiles = [i for i in self._find_candidates(ifo, currSeg[0],
+                                                     currSeg[1])
+                    if i.segment_list.intersects_segment(currSeg)]
         return self.__class__(outFiles)
 
     def find_output_with_tag(self, tag):
@@ -1488,71 +1609,6 @@ class FileList(list):
                 pass
         return lal_cache
 
-    def _temporal_split_list(self,numSubLists):
-        """
-        This internal function is used to speed the code up in cases where a
-        number of operations are being made to determine if files overlap a
-        specific time. Normally such operations are done on *all* entries with
-        *every* call. However, if we predetermine which files are at which
-        times, we can avoid testing *every* file every time.
-
-        We therefore create numSubLists distinct and equal length time windows
-        equally spaced from the first time entry in the list until the last.
-        A list is made for each window and files are added to lists which they
-        overlap.
-
-        If the list changes it should be captured and these split lists become
-        invalid. Currently the testing for this is pretty basic
-        """
-        # Assume segment lists are coalesced!
-        startTime = float( min([i.segment_list[0][0] for i in self]))
-        endTime = float( max([i.segment_list[-1][-1] for i in self]))
-        step = (endTime - startTime) / float(numSubLists)
-
-        # Set up storage
-        self._splitLists = []
-        for idx in range(numSubLists):
-            self._splitLists.append(FileList([]))
-
-        # Sort the files
-
-        for currFile in self:
-            segExtent = currFile.segment_list.extent()
-            startIdx = (segExtent[0] - startTime) / step
-            endIdx = (segExtent[1] - startTime) / step
-            # Add some small rounding here
-            startIdx = int(startIdx - 0.001)
-            endIdx = int(endIdx + 0.001)
-
-            if startIdx < 0:
-                startIdx = 0
-            if endIdx >= numSubLists:
-                endIdx = numSubLists - 1
-
-            for idx in range(startIdx, endIdx + 1):
-                self._splitLists[idx].append(currFile)
-
-        # Set information needed to detect changes and to be used elsewhere
-        self._splitListsLength = len(self)
-        self._splitListsNum = numSubLists
-        self._splitListsStart = startTime
-        self._splitListsEnd = endTime
-        self._splitListsStep = step
-        self._splitListsSet = True
-
-    def _check_split_list_validity(self):
-        """
-        See _temporal_split_list above. This function checks if the current
-        split lists are still valid.
-        """
-        # FIXME: Currently very primitive, but needs to be fast
-        if not (hasattr(self,"_splitListsSet") and (self._splitListsSet)):
-            return False
-        elif len(self) != self._splitListsLength:
-            return False
-        else:
-            return True
-
     @classmethod
     def load(cls, filename):
         """
@@ -242,6 +242,12 @@ e = Extension("pycbc.events.eventmgr_cython",
               extra_link_args=cython_link_args,
               compiler_directives={'embedsignature': True})
 ext.append(e)
+e = Extension("pycbc.events.coinc_cython",
+              ["pycbc/events/coinc_cython.pyx"],
+              extra_compile_args=cython_compile_args,
+              extra_link_args=cython_link_args,
+              compiler_directives={'embedsignature': True})
+ext.append(e)
 e = Extension("pycbc.events.simd_threshold_cython",
               ["pycbc/events/simd_threshold_cython.pyx"],
               language='c++',
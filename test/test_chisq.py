@@ -37,6 +37,9 @@ _scheme, _context = parse_args_all_schemes("correlate")
 from pycbc.vetoes.chisq_cpu import chisq_accum_bin_numpy
 from pycbc.vetoes import chisq_accum_bin, power_chisq_bins, power_chisq
 from pycbc.vetoes import power_chisq_at_points_from_precomputed
+from pycbc.vetoes import power_chisq_at_points_from_precomputed_batch
+from pycbc.vetoes import power_chisq_at_points_from_fft, PowerChisqCostModel
+from pycbc.vetoes import SingleDetPowerChisq
 from pycbc.filter import resample_to_delta_t, highpass
 from pycbc.catalog import Merger
 from pycbc.psd import interpolate, inverse_spectrum_truncation
@@ -125,6 +128,116 @@ class TestChisq(unittest.TestCase):
             max_diff = max(abs(chisq_full[ifo] - chisq_quick[ifo]))
             self.assertTrue(max_diff < 1E-5)
 
+    def test_chisq_batch(self):
+        # Every ifo has its own bins and a different number of points,
+        # including more points than are handled by one thread
+        corrs, snrs, norms, bins, indices = [], [], [], [], []
+        for nbins, npoints, ifo in zip([26, 16, 8], [90, 1, 70], self.ifos):
+            bins.append(power_chisq_bins(self.hp, nbins, self.psd[ifo],
+                                         low_frequency_cutoff=20.0))
+            idx = numpy.arange(27402, 27402 + npoints)
+            indices.append(idx)
+            snrs.append(self.snr_unnorm[ifo][idx[0]:idx[-1] + 1].data)
+            corrs.append(self.corr[ifo])
+            norms.append(self.norm[ifo])
+
+        with self.context:
+            chisqs = power_chisq_at_points_from_precomputed_batch(
+                corrs, snrs, norms, bins, indices)
+            for args, chisq in zip(zip(corrs, snrs, norms, bins, indices),
+                                   chisqs):
+                ref = power_chisq_at_points_from_precomputed(*args)
+                self.assertEqual(len(chisq), len(ref))
+                self.assertTrue(max(abs(chisq - ref)) < 1E-5 * max(ref))
+
+    def test_chisq_fft(self):
+        ifo = self.ifos[0]
+        bins = power_chisq_bins(self.hp, 26, self.psd[ifo],
+                                low_frequency_cutoff=20.0)
+        idx = numpy.arange(27402, 27442)
+        snr = self.snr_unnorm[ifo][idx[0]:idx[-1] + 1].data
+        with self.context:
+            chisq = power_chisq_at_points_from_fft(self.corr[ifo], snr,
+                                                   self.norm[ifo], bins, idx)
+            ref = power_chisq_at_points_from_precomputed(self.corr[ifo], snr,
+                                                   self.norm[ifo], bins, idx)
+            self.assertEqual(len(chisq), len(ref))
+            self.assertTrue(max(abs(chisq - ref)) < 1E-4 * max(ref))
+
+    def test_values_batch(self):
+        # Templates with their own bins and a different number of points
+        ifo = self.ifos[0]
+        corrs, snrs, norms, indices, templates = [], [], [], [], []
+        for mass, npoints in zip([31.36, 20., 12., 40.], [90, 1, 70, 5]):
+            hp, _ = get_fd_waveform(approximant="IMRPhenomD",
+                                    mass1=mass, mass2=mass,
+                                    f_lower=20.0, delta_f=self.data[ifo].delta_f)
+            hp.resize(len(self.psd[ifo]))
+            hp.f_lower = 20.0
+            hp.end_idx = len(hp)
+            hp.approximant = "IMRPhenomD"
+            hp.params = {'mass1': mass, 'mass2': mass}
+            snr, corr, norm = matched_filter_core(hp, self.data[ifo],
+                                                  psd=self.psd[ifo],
+                                                  low_frequency_cutoff=20)
+            idx = numpy.arange(27402, 27402 + npoints)
+            indices.append(idx)
+            snrs.append(snr[idx[0]:idx[-1] + 1].data)
+            corrs.append(corr)
+            norms.append(norm)
+            templates.append(hp)
+        snr_values = numpy.concatenate([abs(s * n)
+                                        for s, n in zip(snrs, norms)])
+
+        # the FFT costs are chosen so that only some templates use it
+        cost_model = PowerChisqCostModel(point_cost=1E-9, fft_cost=1E-10)
+        with self.context:
+            for threshold in [None, numpy.median(snr_values), 1E6]:
+                for method in ['points', 'fft', 'auto']:
+                    chisq = SingleDetPowerChisq(num_bins=16,
+                                                snr_threshold=threshold,
+                                                method=method,
+                                                cost_model=cost_model)
+                    chisqs, dofs = chisq.values_batch(corrs, snrs, norms,
+                                                      self.psd[ifo], indices,
+                                                      templates)
+                    self.assertEqual(len(chisqs), len(templates))
+                    self.assertEqual(len(dofs), len(templates))
+                    for args, found, dof in zip(zip(corrs, snrs, norms,
+                                                    indices, templates),
+                                                chisqs, dofs):
+                        corr, snr, norm, idx, hp = args
+                        ref, ref_dof = chisq.values(corr, snr, norm,
+                                                    self.psd[ifo], idx, hp)
+                        self.assertEqual(list(dof), list(ref_dof))
+                        self.assertEqual(len(found), len(ref))
+                        if max(ref) == 0:
+                            self.assertEqual(max(abs(found)), 0)
+                        else:
+                            self.assertTrue(max(abs(found - ref))
+                                            < 1E-5 * max(ref))
+                    if threshold == 1E6:
+                        self.assertTrue(all(list(d) == [-100] * len(d)
+                                            for d in dofs))
+
+        chisq = SingleDetPowerChisq(num_bins=0)
+        self.assertEqual(chisq.values_batch(corrs, snrs, norms, self.psd[ifo],
+                                            indices, templates), (None, None))
+
+    def test_cost_model(self):
+        model = PowerChisqCostModel(point_cost=1E-9, fft_cost=1E-9)
+        bins = [100, 200, 1100]
+        # 2 FFTs of length 1024 cost as much as 20 points of 1000 samples
+        self.assertFalse(model.use_fft(10, bins, 1024))
+        self.assertTrue(model.use_fft(30, bins, 1024))
+
+        model = PowerChisqCostModel()
+        self.assertFalse(model.calibrated)
+        with self.context:
+            model.calibrate(4096, num_points=8, repeat=1)
+        self.assertTrue(model.calibrated)
+        self.assertTrue(model.point_cost > 0 and model.fft_cost > 0)
+
 
 suite = unittest.TestSuite()
 suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestChisq))
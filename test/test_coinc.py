@@ -0,0 +1,128 @@
+"""
+These are the unittests for the pycbc.events.coinc module
+"""
+import unittest
+import numpy
+from utils import simple_exit
+from pycbc.events.coinc import time_coincidence, time_coincidence_by_template
+from pycbc.events.coinc import MultiRingBuffer
+
+def brute_force_coincidence(t1, t2, window, slide_step):
+    pairs = set()
+    for i, a in enumerate(t1):
+        for j, b in enumerate(t2):
+            if slide_step:
+                diff = (a % slide_step) - (b % slide_step)
+                for shift in [-slide_step, 0, slide_step]:
+                    if -window < diff + shift <= window:
+                        slide = int(numpy.rint(a / slide_step - b / slide_step))
+                        pairs.add((i, j, slide))
+            elif -window < a - b <= window:
+                pairs.add((i, j, 0))
+    return pairs
+
+class TestTimeCoincidence(unittest.TestCase):
+    def setUp(self, *args):
+        numpy.random.seed(1024)
+        self.t1 = numpy.random.uniform(0, 1000, size=300)
+        self.t2 = numpy.random.uniform(0, 1000, size=250)
+        self.tid1 = numpy.random.randint(0, 5, size=300)
+        self.tid2 = numpy.random.randint(0, 5, size=250)
+
+    def test_time_coincidence(self):
+        for slide_step in [0, 0.3]:
+            i1, i2, slide = time_coincidence(self.t1, self.t2, 0.01,
+                                             slide_step=slide_step)
+            found = set(zip(i1, i2, slide))
+            self.assertEqual(len(found), len(i1))
+            expected = brute_force_coincidence(self.t1, self.t2, 0.01,
+                                               slide_step)
+            self.assertEqual(found, expected)
+
+    def test_time_coincidence_by_template(self):
+        for slide_step in [0, 0.3]:
+            i1, i2, slide = time_coincidence_by_template(
+                self.t1, self.tid1, self.t2, self.tid2, 0.01,
+                slide_step=slide_step)
+            found = set(zip(i1, i2, slide))
+
+            expected = set()
+            for tid in range(5):
+                l1 = numpy.where(self.tid1 == tid)[0]
+                l2 = numpy.where(self.tid2 == tid)[0]
+                j1, j2, s = time_coincidence(self.t1[l1], self.t2[l2], 0.01,
+                                             slide_step=slide_step)
+                expected.update(zip(l1[j1], l2[j2], s))
+            self.assertEqual(found, expected)
+
+class TestMultiRingBuffer(unittest.TestCase):
+    def check_against_lists(self, capacity, discard):
+        numpy.random.seed(3)
+        num_rings, max_time = 7, 5
+        dtype = [('end_time', float), ('stat', numpy.float32)]
+        buf = MultiRingBuffer(num_rings, max_time, dtype, capacity=capacity)
+        self.assertEqual(buf.buffer.shape, (num_rings, capacity))
+        # reference: per ring lists of (value, time added)
+        ref = [[] for _ in range(num_rings)]
+
+        for step in range(60):
+            num = numpy.random.randint(0, 12)
+            indices = numpy.random.randint(0, num_rings, size=num)
+            values = numpy.zeros(num, dtype=dtype)
+            values['end_time'] = numpy.random.uniform(0, 100, size=num)
+            values['stat'] = numpy.arange(num)
+            for i, v in zip(indices, values):
+                ref[i].append((v, buf.time))
+            buf.add(indices, values)
+
+            if discard and step % 7 == 3:
+                buf.discard_last(indices)
+                for i in indices:
+                    ref[i].pop()
+
+            for i in range(num_rings):
+                ref[i] = [r for r in ref[i] if r[1] >= buf.time - max_time]
+                # only the newest elements fit in a full ring
+                ref[i] = ref[i][-capacity:]
+                data = buf.data(i)
+                self.assertEqual(len(data), len(ref[i]))
+                numpy.testing.assert_array_equal(
+                    data['end_time'], [r[0]['end_time'] for r in ref[i]])
+                numpy.testing.assert_array_equal(buf.expire_vector(i),
+                                                 [r[1] for r in ref[i]])
+        self.assertEqual(buf.num_elements(), sum(len(r) for r in ref))
+        # the memory used is fixed
+        self.assertEqual(buf.buffer.shape, (num_rings, capacity))
+        return buf
+
+    def test_against_lists(self):
+        # large enough that no unexpired element is overwritten
+        buf = self.check_against_lists(72, True)
+        self.assertEqual(buf.num_overwritten, 0)
+
+    def test_overwrite(self):
+        buf = self.check_against_lists(4, False)
+        self.assertTrue(buf.num_overwritten > 0)
+
+    def test_default_capacity(self):
+        # with at most one element per ring and time, nothing is overwritten
+        buf = MultiRingBuffer(3, 4, [('stat', float)])
+        for step in range(20):
+            values = numpy.zeros(2, dtype=[('stat', float)])
+            values['stat'] = step
+            buf.add([step % 3, (step + 1) % 3], values)
+        self.assertEqual(buf.num_overwritten, 0)
+        self.assertEqual(buf.buffer.shape, (3, 5))
+        self.assertEqual(list(buf.data(0)['stat']), [17, 18])
+
+        # a long lookback does not make every ring as long
+        buf = MultiRingBuffer(3, 5000, [('stat', float)])
+        self.assertEqual(buf.buffer.shape, (3, MultiRingBuffer.default_capacity))
+
+suite = unittest.TestSuite()
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestTimeCoincidence))
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestMultiRingBuffer))
+
+if __name__ == '__main__':
+    results = unittest.TextTestRunner(verbosity=2).run(suite)
+    simple_exit(results)
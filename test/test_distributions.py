@@ -250,6 +250,23 @@ class TestDistributions(unittest.TestCase):
                           "greater than the threshold for azimuthal angle"
                           "of {}".format(dist.name, kl_val, threshold))
 
+    def test_joint_rvs_constraints(self):
+        """ Check that rejection sampling a joint distribution returns the
+        requested number of samples, all obeying the constraints.
+        """
+        from pycbc.distributions.constraints import MtotalLT
+        uniform = distributions.Uniform(mass1=(2., 50.), mass2=(2., 50.))
+        constraint = MtotalLT("mtotal_lt", mtotal=30.)
+        joint = distributions.JointDistribution(["mass1", "mass2"], uniform,
+                                                constraints=[constraint],
+                                                n_test_samples=1000)
+        for size, block in [(1, 2**22), (10000, 2**22), (5000, 500)]:
+            samples = joint.rvs(size, max_block_size=block)
+            self.assertEqual(len(samples), size)
+            mtotal = samples["mass1"] + samples["mass2"]
+            self.assertTrue((mtotal < 30.).all())
+            self.assertTrue((samples["mass1"] >= 2.).all())
+
 suite = unittest.TestSuite()
 suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestDistributions))
 
@@ -0,0 +1,212 @@
+"""
+These are the unittests for the pycbc.events.eventmgr module
+"""
+import unittest
+import argparse
+import os
+import numpy
+from utils import simple_exit
+from pycbc.events import EventBuffer, EventManager
+from pycbc.events import loudest_in_bins, chisq_threshold_mask
+
+dtype = [('template_id', int), ('snr', numpy.complex64),
+         ('chisq', numpy.float32)]
+
+def random_events(num):
+    events = numpy.zeros(num, dtype=dtype)
+    events['template_id'] = numpy.random.randint(0, 100, size=num)
+    events['snr'] = numpy.random.normal(size=num) * 1j
+    events['chisq'] = numpy.random.uniform(size=num)
+    return events
+
+class TestEventBuffer(unittest.TestCase):
+    def setUp(self, *args):
+        numpy.random.seed(1024)
+        self.parts = [random_events(n) for n in [0, 3, 100, 1, 5000, 17]]
+        self.expected = numpy.concatenate(self.parts)
+
+    def test_append(self):
+        buf = EventBuffer(dtype, size=2)
+        for part in self.parts:
+            buf.append(part)
+        self.assertEqual(len(buf), len(self.expected))
+        self.assertTrue((buf.data() == self.expected).all())
+
+        buf.clear()
+        self.assertEqual(len(buf), 0)
+        self.assertEqual(len(buf.data()), 0)
+
+    def test_spill(self):
+        buf = EventBuffer(dtype, memory_limit=1000 * numpy.dtype(dtype).itemsize)
+        for part in self.parts:
+            buf.append(part)
+        self.assertTrue(buf.spill_file is not None)
+        self.assertEqual(len(buf), len(self.expected))
+        self.assertTrue((buf.data() == self.expected).all())
+        buf.clear()
+        self.assertTrue(buf.spill_file is None)
+
+    def test_chunks(self):
+        buf = EventBuffer(dtype, memory_limit=1000 * numpy.dtype(dtype).itemsize)
+        for part in self.parts:
+            buf.append(part)
+        chunks = list(buf.chunks(700))
+        self.assertTrue(all(len(c) <= 700 for c in chunks))
+        self.assertTrue((numpy.concatenate(chunks) == self.expected).all())
+        self.assertEqual(len(list(buf.chunks())), 1)
+        buf.clear()
+
+class TestTriggerCuts(unittest.TestCase):
+    def setUp(self, *args):
+        numpy.random.seed(1024)
+        self.stat = numpy.random.uniform(size=5000)
+        self.tbin = numpy.random.randint(0, 50, size=5000)
+        self.cbin = numpy.random.randint(0, 7, size=5000)
+
+    def test_loudest_in_bins(self):
+        for num_keep in [1, 3, 1000]:
+            keep = loudest_in_bins(self.stat, num_keep, self.tbin, self.cbin)
+            expected = []
+            for b in numpy.unique(self.tbin):
+                for b2 in numpy.unique(self.cbin):
+                    bloc = numpy.where((self.tbin == b) & (self.cbin == b2))[0]
+                    bloudest = self.stat[bloc].argsort()[-num_keep:]
+                    expected.append(bloc[bloudest])
+            expected = numpy.concatenate(expected)
+            self.assertTrue((keep == expected).all())
+
+        self.assertEqual(len(loudest_in_bins([], 1, [])), 0)
+
+    def test_chisq_threshold_mask(self):
+        chisq = numpy.array([1.0, 10.0, 25.0, 5.0])
+        dof = numpy.array([10, 10, 10, 0])
+        snr = numpy.array([10j, 10, 10, 0])
+        keep = chisq_threshold_mask(chisq, dof, snr, 2.0)
+        self.assertEqual(list(keep), [True, True, False, False])
+        keep = chisq_threshold_mask(chisq, dof, snr, 2.0, delta=0.1)
+        self.assertEqual(list(keep), [True, True, True, False])
+
+class TestAddEvents(unittest.TestCase):
+    def test_add_events(self):
+        # the triggers of each part of the bank are numbered from zero
+        numpy.random.seed(1024)
+        nums = [3, 0, 2]
+        params = [[{'tmplt': (n, i)} for i in range(num)]
+                  for n, num in enumerate(nums)]
+        parts = []
+        for num in nums:
+            events = random_events(4 * num)
+            events['template_id'] = numpy.repeat(numpy.arange(num), 4)
+            parts.append(events)
+
+        mgr = EventManager(argparse.Namespace(), ['snr', 'chisq'],
+                           [numpy.complex64, numpy.float32])
+        for events, tparams in zip(parts, params):
+            mgr.add_events(events, tparams)
+
+        self.assertEqual(mgr.template_params, params[0] + params[2])
+        self.assertEqual(mgr.template_index, 4)
+        merged = mgr.accumulate.data()
+        self.assertEqual(list(merged['template_id']),
+                         list(parts[0]['template_id']) +
+                         list(parts[2]['template_id'] + 3))
+        for col in ['snr', 'chisq']:
+            numpy.testing.assert_array_equal(
+                merged[col], numpy.concatenate([p[col] for p in parts]))
+        # the events that were given are not changed
+        self.assertEqual(list(parts[2]['template_id']), [0] * 4 + [1] * 4)
+        # each trigger still refers to the template it was found with
+        found_with = [params[n][tid] for n, events in enumerate(parts)
+                      for tid in events['template_id']]
+        self.assertEqual([mgr.template_params[tid]
+                          for tid in merged['template_id']], found_with)
+
+    def test_add_template_events(self):
+        numpy.random.seed(1024)
+        mgr = EventManager(argparse.Namespace(), ['snr', 'chisq'],
+                           [numpy.complex64, numpy.float32])
+        expected = []
+        for num_parts in [1, 0, 300]:
+            mgr.new_template()
+            parts = [random_events(n) for n in
+                     numpy.random.randint(0, 20, size=num_parts)]
+            for part in parts:
+                mgr.add_template_events(['snr', 'chisq'],
+                                        [part['snr'], part['chisq']])
+            mgr.cluster_template_events('chisq', 'snr', 0)
+            mgr.finalize_template_events()
+            self.assertEqual(len(mgr.template_events), 0)
+            if parts:
+                events = numpy.concatenate(parts)
+                events['template_id'] = mgr.template_index
+                expected.append(events)
+        found = mgr.accumulate.data()
+        self.assertTrue((found == numpy.concatenate(expected)).all())
+
+class TestConsolidate(unittest.TestCase):
+    def setUp(self, *args):
+        numpy.random.seed(1024)
+        num = 5000
+        columns = ['snr', 'chisq', 'chisq_dof', 'time_index']
+        self.events = numpy.zeros(num, dtype=[('template_id', int),
+                                              ('snr', numpy.complex64),
+                                              ('chisq', numpy.float32),
+                                              ('chisq_dof', int),
+                                              ('time_index', int)])
+        self.events['template_id'] = numpy.random.randint(0, 10, size=num)
+        self.events['snr'] = numpy.random.uniform(4, 20, size=num) * 1j
+        self.events['chisq'] = numpy.random.uniform(1, 60, size=num)
+        self.events['chisq_dof'] = 20
+        self.events['time_index'] = numpy.random.randint(0, 40960, size=num)
+        self.columns = columns
+        self.types = [numpy.complex64, numpy.float32, int, int]
+        # hold a few hundred triggers in memory at a time
+        self.limit = 300 * self.events.dtype.itemsize / 2. ** 20
+
+    def consolidate(self, memory_limit):
+        opt = argparse.Namespace(trigger_memory_limit=memory_limit,
+                                 chisq_threshold=3., chisq_bins=11,
+                                 chisq_delta=0., newsnr_threshold=None,
+                                 keep_loudest_interval=2.,
+                                 keep_loudest_num=5,
+                                 keep_loudest_stat='newsnr',
+                                 keep_loudest_log_chirp_window=None,
+                                 injection_window=None, sample_rate=1024,
+                                 gps_start_time=0)
+        mgr = EventManager(opt, self.columns, self.types)
+        params = [{'tmplt': i} for i in range(10)]
+        for start in range(0, len(self.events), 1000):
+            mgr.add_events(self.events[start:start + 1000], [])
+        mgr.template_params = params
+        mgr.consolidate_events(opt)
+        mgr.finalize_events()
+        return mgr
+
+    def test_chunked_consolidation(self):
+        mgr = self.consolidate(None)
+        chunked_mgr = self.consolidate(self.limit)
+        expected = numpy.sort(mgr.events, order=['time_index', 'snr'])
+        found = numpy.sort(chunked_mgr.events, order=['time_index', 'snr'])
+        self.assertTrue(len(expected) > 0)
+        self.assertTrue(len(expected) < len(self.events))
+        self.assertTrue((expected == found).all())
+
+    def test_spill_file_removed(self):
+        opt = argparse.Namespace(trigger_memory_limit=self.limit)
+        mgr = EventManager(opt, self.columns, self.types)
+        mgr.add_events(self.events, [])
+        spill_file = mgr.accumulate.spill_file.filename
+        self.assertTrue(os.path.exists(spill_file))
+        mgr.finalize_events()
+        self.assertFalse(os.path.exists(spill_file))
+        self.assertEqual(len(mgr.events), len(self.events))
+
+suite = unittest.TestSuite()
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestEventBuffer))
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestTriggerCuts))
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestAddEvents))
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestConsolidate))
+
+if __name__ == '__main__':
+    results = unittest.TextTestRunner(verbosity=2).run(suite)
+    simple_exit(results)
@@ -0,0 +1,112 @@
+"""
+Unit tests for generating the templates of a FilterBank ahead of the caller
+"""
+import unittest
+import os
+import tempfile
+import threading
+import h5py
+import numpy
+from pycbc.types import zeros
+from pycbc.psd import aLIGOZeroDetHighPower
+from pycbc.waveform import FilterBank
+from utils import simple_exit
+
+
+class TestPrefetch(unittest.TestCase):
+    def setUp(self):
+        numpy.random.seed(1024)
+        num = 8
+        fd, self.filename = tempfile.mkstemp(suffix='.hdf')
+        os.close(fd)
+        with h5py.File(self.filename, 'w') as f:
+            f['mass1'] = numpy.random.uniform(5, 20, size=num)
+            f['mass2'] = numpy.random.uniform(1.4, 5, size=num)
+            f['spin1z'] = numpy.random.uniform(-0.5, 0.5, size=num)
+            f['spin2z'] = numpy.zeros(num)
+            f.attrs['parameters'] = ['mass1', 'mass2', 'spin1z', 'spin2z']
+        self.flen = 2049
+        self.delta_f = 1. / 8
+        self.psd = aLIGOZeroDetHighPower(self.flen, self.delta_f, 20.)
+        self.reference = self.bank()
+        self.t_nums = [3, 0, 5, 5, 7, 1]
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def bank(self, out=None):
+        return FilterBank(self.filename, self.flen, self.delta_f,
+                          numpy.complex64, out=out, approximant='TaylorF2',
+                          low_frequency_cutoff=30.)
+
+    def check_template(self, found, t_num):
+        expected = self.reference[t_num]
+        numpy.testing.assert_array_equal(found.numpy(), expected.numpy())
+        self.assertEqual(found.end_idx, expected.end_idx)
+        self.assertEqual(found.f_lower, expected.f_lower)
+        self.assertEqual(found.approximant, expected.approximant)
+        self.assertEqual(found.params.template_hash,
+                         expected.params.template_hash)
+        for param in ['mass1', 'mass2', 'spin1z']:
+            self.assertEqual(found.params[param], expected.params[param])
+        self.assertAlmostEqual(found.sigmasq(self.psd) /
+                               expected.sigmasq(self.psd), 1., 6)
+
+    def test_prefetch(self):
+        for out in [None, zeros(self.flen, dtype=numpy.complex64)]:
+            bank = self.bank(out=out)
+            for depth in [0, 1, 3]:
+                found = []
+                for t_num, htilde in bank.prefetch(self.t_nums, depth=depth):
+                    self.check_template(htilde, t_num)
+                    # templates are copied to the output memory, if set
+                    if out is not None:
+                        self.assertTrue(numpy.shares_memory(htilde.numpy(),
+                                                            out.numpy()))
+                    found.append(t_num)
+                self.assertEqual(found, self.t_nums)
+
+    def test_close(self):
+        threads = threading.active_count()
+        for out in [None, zeros(self.flen, dtype=numpy.complex64)]:
+            bank = self.bank(out=out)
+            templates = bank.prefetch(list(range(len(bank))), depth=2)
+            for _ in range(2):
+                t_num, htilde = next(templates)
+                self.check_template(htilde, t_num)
+            templates.close()
+            # the generating thread has finished
+            self.assertEqual(threading.active_count(), threads)
+
+            found = [t_num for t_num, _ in bank.prefetch(self.t_nums)]
+            self.assertEqual(found, self.t_nums)
+
+    def test_error(self):
+        def t_nums():
+            yield 2
+            yield 4
+            raise RuntimeError('no more templates')
+
+        threads = threading.active_count()
+        bank = self.bank()
+        for depth in [0, 2]:
+            found = []
+            with self.assertRaises(RuntimeError):
+                for t_num, htilde in bank.prefetch(t_nums(), depth=depth):
+                    self.check_template(htilde, t_num)
+                    found.append(t_num)
+            self.assertEqual(found, [2, 4])
+            self.assertEqual(threading.active_count(), threads)
+
+        # errors when generating a template are raised too
+        with self.assertRaises(IndexError):
+            list(bank.prefetch([0, len(bank) + 10], depth=2))
+        self.assertEqual(threading.active_count(), threads)
+
+
+suite = unittest.TestSuite()
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestPrefetch))
+
+if __name__ == '__main__':
+    results = unittest.TextTestRunner(verbosity=2).run(suite)
+    simple_exit(results)
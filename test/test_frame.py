@@ -130,14 +130,40 @@ class FrameTestBase(unittest.TestCase):
                           'channel1', start_time=self.epoch+1,
                           end_time=self.epoch)
 
+class TestSlidingBuffer(unittest.TestCase):
+    def test_matches_roll(self):
+        size, delta_t = 64, 1.0 / 16
+        for slack in [None, 5, 64]:
+            buf = pycbc.frame.SlidingBuffer(size, delta_t, 100, slack=slack)
+            ref = numpy.zeros(size)
+            epoch = 100.
+            count = 0
+            for num in [3, 16, 5, 64, 70, 1, 30, 30, 30]:
+                new = numpy.arange(count, count + min(num, size)) + 1.
+                count += len(new)
+                window = buf.advance(num)
+                window[size - len(new):] = new
+
+                ref = numpy.roll(ref, -num)
+                ref[max(size - num, 0):] = 0
+                ref[size - len(new):] = new
+                epoch += num * delta_t
+
+                numpy.testing.assert_array_equal(window.numpy(), ref)
+                numpy.testing.assert_array_equal(buf.window.numpy(), ref)
+                self.assertAlmostEqual(float(window.start_time), epoch)
+
 # We take a factory approach so we can test all possible dtypes we support
 TestClasses = []
+
 types = [numpy.float32, numpy.float64, numpy.complex64, numpy.complex128]
 
 for ty in types:
     klass = type('{0}_Test'.format(ty.__name__),(FrameTestBase,),{'dtype': ty})
     TestClasses.append(klass)
 
+TestClasses.append(TestSlidingBuffer)
+
 if __name__ == '__main__':
     suite = unittest.TestSuite()
     for klass in TestClasses:
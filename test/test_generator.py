@@ -0,0 +1,158 @@
+"""
+Unit tests for projecting waveforms onto detectors with the
+pycbc.waveform.generator.FDomainDetFrameGenerator
+"""
+import unittest
+import numpy
+from pycbc.detector import Detector
+from pycbc.waveform.generator import (FDomainDetFrameGenerator,
+                                      FDomainCBCGenerator,
+                                      DetectorProjection)
+from utils import simple_exit
+
+
+def make_generator(detectors=None, variable_args=None):
+    if variable_args is None:
+        variable_args = ['mass1', 'mass2', 'tc', 'ra', 'dec', 'polarization']
+    return FDomainDetFrameGenerator(
+        FDomainCBCGenerator, 0., detectors=detectors,
+        variable_args=variable_args, delta_f=1./4, f_lower=30.,
+        approximant='TaylorF2', spin1z=0., spin2z=0., distance=500.)
+
+
+class TestDetectorProjection(unittest.TestCase):
+    def setUp(self):
+        numpy.random.seed(1024)
+        num = 5
+        self.masses = {'mass1': 30., 'mass2': 25.}
+        self.locs = {'ra': numpy.random.uniform(0, 2 * numpy.pi, size=num),
+                     'dec': numpy.random.uniform(-1.5, 1.5, size=num),
+                     'polarization': numpy.random.uniform(0, 2 * numpy.pi,
+                                                          size=num),
+                     'tc': numpy.random.uniform(3.0, 3.2, size=num)}
+
+    def assert_waveforms_close(self, found, expected):
+        expected = numpy.asarray(expected)
+        numpy.testing.assert_allclose(found, expected, rtol=1e-6,
+                                      atol=1e-6 * abs(expected).max())
+
+    def looped(self, generator, **locs):
+        num = len(list(locs.values())[0])
+        wfs = []
+        for ii in range(num):
+            params = {param: val[ii] for param, val in locs.items()}
+            params.update(self.masses)
+            wfs.append(generator.generate(**params))
+        return {det: numpy.array([h[det].numpy() for h in wfs])
+                for det in generator.detector_names}
+
+    def test_antenna_pattern(self):
+        for ifo in ['H1', 'L1', 'V1']:
+            det = Detector(ifo)
+            proj = DetectorProjection(det)
+            fp, fc = proj.antenna_pattern(self.locs['ra'], self.locs['dec'],
+                                          self.locs['polarization'],
+                                          self.locs['tc'])
+            dt = proj.time_delay_from_earth_center(self.locs['ra'],
+                                                   self.locs['dec'],
+                                                   self.locs['tc'])
+            for ii in range(len(fp)):
+                efp, efc = det.antenna_pattern(self.locs['ra'][ii],
+                                               self.locs['dec'][ii],
+                                               self.locs['polarization'][ii],
+                                               self.locs['tc'][ii])
+                self.assertAlmostEqual(fp[ii], efp, 10)
+                self.assertAlmostEqual(fc[ii], efc, 10)
+                self.assertAlmostEqual(dt[ii], det.time_delay_from_earth_center(
+                    self.locs['ra'][ii], self.locs['dec'][ii],
+                    self.locs['tc'][ii]), 10)
+
+    def test_generate_projected(self):
+        generator = make_generator(detectors=['H1', 'L1', 'V1'])
+        params = self.masses.copy()
+        params.update(self.locs)
+        found = generator.generate_projected(**params)
+        expected = self.looped(make_generator(detectors=['H1', 'L1', 'V1']),
+                               **self.locs)
+        self.assertEqual(sorted(found.keys()), ['H1', 'L1', 'V1'])
+        for det in found:
+            self.assertEqual(found[det].shape, expected[det].shape)
+            self.assert_waveforms_close(found[det], expected[det])
+
+        # scalar location parameters are broadcast against the arrays
+        found = generator.generate_projected(ra=1.37, dec=-1.26,
+                                             polarization=2.76,
+                                             tc=self.locs['tc'])
+        num = len(self.locs['tc'])
+        expected = self.looped(generator, ra=[1.37] * num,
+                               dec=[-1.26] * num,
+                               polarization=[2.76] * num,
+                               tc=self.locs['tc'])
+        for det in found:
+            self.assert_waveforms_close(found[det], expected[det])
+
+    def test_generate_projected_rframe(self):
+        generator = make_generator(variable_args=['mass1', 'mass2', 'tc'])
+        found = generator.generate_projected(tc=self.locs['tc'],
+                                             **self.masses)
+        expected = self.looped(make_generator(
+                                   variable_args=['mass1', 'mass2', 'tc']),
+                               tc=self.locs['tc'])
+        self.assertEqual(list(found.keys()), ['RF'])
+        self.assert_waveforms_close(found['RF'], expected['RF'])
+
+    def test_regenerate(self):
+        generator = make_generator(detectors=['H1', 'L1'])
+        params = {param: val[0] for param, val in self.locs.items()}
+        params.update(self.masses)
+        generator.generate(**params)
+        hp = generator.generate_rframe(**params)[0]
+        # only changing the location reuses the polarizations
+        params['ra'] = self.locs['ra'][1]
+        self.assertTrue(generator.generate_rframe(**params)[0] is hp)
+
+        # changing an intrinsic parameter regenerates them
+        params['mass1'] = 32.
+        found = generator.generate(**params)
+        self.assertFalse(generator.generate_rframe(**params)[0] is hp)
+        expected = make_generator(detectors=['H1', 'L1']).generate(**params)
+        for det in found:
+            self.assert_waveforms_close(found[det].numpy(),
+                                        expected[det].numpy())
+
+        params['mass2'] = 20.
+        locs = {param: params.pop(param) for param in self.locs}
+        found = generator.generate_projected(**params)
+        params.update(locs)
+        expected = make_generator(detectors=['H1', 'L1']).generate(**params)
+        for det in found:
+            self.assert_waveforms_close(found[det][0], expected[det].numpy())
+
+    def test_rframe_copies(self):
+        generator = make_generator(variable_args=['mass1', 'mass2', 'tc'])
+        params = {'tc': 3.1}
+        params.update(self.masses)
+        expected = generator.generate(**params)['RF'].numpy().copy()
+        # changing the returned waveforms does not change the stored
+        # polarizations
+        generator.generate(**params)['RF'].numpy()[:] = 0.
+        generator.generate_projected(**params)['RF'][:] = 0.
+        numpy.testing.assert_array_equal(
+            generator.generate(**params)['RF'].numpy(), expected)
+
+        # nor does it without a coalescence time
+        generator = make_generator(variable_args=['mass1', 'mass2'])
+        expected = generator.generate(**self.masses)['RF'].numpy().copy()
+        generator.generate(**self.masses)['RF'].numpy()[:] = 0.
+        generator.generate_projected(**self.masses)['RF'][:] = 0.
+        numpy.testing.assert_array_equal(
+            generator.generate(**self.masses)['RF'].numpy(), expected)
+
+
+suite = unittest.TestSuite()
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(
+    TestDetectorProjection))
+
+if __name__ == '__main__':
+    results = unittest.TextTestRunner(verbosity=2).run(suite)
+    simple_exit(results)
@@ -0,0 +1,198 @@
+"""
+Unit tests for evaluating the inference models at several points at once
+"""
+import unittest
+import numpy
+from pycbc import psd as pypsd
+from pycbc import distributions
+from pycbc import transforms
+from pycbc.conversions import mchirp_from_mass1_mass2
+from pycbc.inference import models
+from pycbc.inference.models import GaussianNoise, CallModel, RelativeSPA
+from pycbc.pool import BroadcastPool
+from pycbc.waveform.generator import (FDomainDetFrameGenerator,
+                                      FDomainCBCGenerator)
+from utils import simple_exit
+
+
+def _compare_stats(found, expected):
+    numpy.testing.assert_allclose(numpy.array(found, dtype=complex),
+                                  numpy.array(expected, dtype=complex),
+                                  rtol=1e-8)
+
+
+class TestBatchLikelihood(unittest.TestCase):
+    def setUp(self):
+        seglen = 4
+        sample_rate = 2048
+        flen = seglen * sample_rate // 2 + 1
+        fmin = 30.
+        # the waveforms end at the ISCO frequency, so that there is no
+        # waveform for a heavy enough mass1
+        static_params = {'approximant': 'IMRPhenomD', 'f_lower': fmin,
+                         'f_final_func': 'SchwarzISCO', 'mass2': 29.3,
+                         'spin1z': 0., 'spin2z': 0., 'ra': 1.37,
+                         'dec': -1.26, 'polarization': 2.76,
+                         'distance': 1500.}
+        variable_params = ['tc', 'mass1']
+        generator = FDomainDetFrameGenerator(
+            FDomainCBCGenerator, 0., detectors=['H1', 'L1'],
+            variable_args=variable_params, delta_f=1./seglen,
+            **static_params)
+        signal = generator.generate(tc=3.1, mass1=38.6)
+        psd = pypsd.aLIGOZeroDetHighPower(flen, 1./seglen, 20.)
+        prior = distributions.JointDistribution(
+            variable_params,
+            distributions.Uniform(tc=(2.9, 3.3), mass1=(10., 3000.)))
+        self.model = GaussianNoise(variable_params, signal,
+                                   {'H1': fmin, 'L1': fmin},
+                                   psds={'H1': psd, 'L1': psd}, prior=prior,
+                                   static_params=static_params)
+        # the third point has no waveform, the last is outside of the prior
+        self.points = [{'tc': 3.1, 'mass1': 38.6},
+                       {'tc': 3.12, 'mass1': 35.},
+                       {'tc': 3.05, 'mass1': 2000.},
+                       {'tc': 3.5, 'mass1': 38.6}]
+        self.param_values = [[p[name] for name in self.model.sampling_params]
+                             for p in self.points]
+
+    def test_loglr_batch(self):
+        names = ['loglr', 'loglikelihood'] + \
+            ['{}_{}'.format(det, stat) for det in ['H1', 'L1']
+             for stat in ['cplx_loglr', 'optimal_snrsq']]
+        expected = []
+        for pvals in self.points:
+            self.model.update(**pvals)
+            loglr = self.model.loglr
+            expected.append((loglr, self.model._current_stats.getstats(names)))
+
+        loglrs, stats = self.model.loglr_batch(self.points)
+        numpy.testing.assert_allclose(loglrs, [e[0] for e in expected],
+                                      rtol=1e-8)
+        self.assertEqual(loglrs[2], -numpy.inf)
+        for bstats, (_, estats) in zip(stats, expected):
+            _compare_stats(bstats.getstats(names), estats)
+
+    def check_calls(self, found, expected):
+        self.assertEqual(len(found), len(expected))
+        for (val, stats), (eval_, estats) in zip(found, expected):
+            numpy.testing.assert_allclose(val, eval_, rtol=1e-8)
+            _compare_stats(stats, estats)
+
+    def test_call_batch(self):
+        call_model = CallModel(self.model, 'logposterior')
+        expected = [call_model(pvals) for pvals in self.param_values]
+        self.assertEqual(expected[2][0], -numpy.inf)
+        self.assertEqual(expected[3][0], -numpy.inf)
+        self.check_calls(call_model.call_batch(self.param_values), expected)
+
+        # with the logprior, as emcee_pt calls the likelihood
+        expected = []
+        for pvals in self.param_values:
+            logp = call_model(pvals, callstat='logprior',
+                              return_all_stats=False)
+            if logp == -numpy.inf:
+                expected.append((-numpy.inf, logp))
+            else:
+                expected.append((call_model(pvals, callstat='loglikelihood',
+                                            return_all_stats=False), logp))
+        found = call_model.call_batch(self.param_values,
+                                      callstat='loglikelihood',
+                                      return_all_stats=False,
+                                      return_logprior=True)
+        numpy.testing.assert_allclose(numpy.array(found),
+                                      numpy.array(expected), rtol=1e-8)
+
+    def test_batched_model_pool(self):
+        call_model = CallModel(self.model, 'logposterior')
+        expected = call_model.call_batch(self.param_values)
+        pool = models.BatchedModelPool(call_model)
+        self.check_calls(pool.map(None, self.param_values), expected)
+
+        models._global_instance = call_model
+        procs = BroadcastPool(2)
+        try:
+            pool = models.BatchedModelPool(call_model, pool=procs,
+                                           nprocesses=2)
+            self.check_calls(pool.map(None, self.param_values), expected)
+        finally:
+            procs.terminate()
+            procs.join()
+            models._global_instance = None
+
+
+class TestRelativeBatchLikelihood(unittest.TestCase):
+    def setUp(self):
+        seglen = 4
+        sample_rate = 2048
+        flen = seglen * sample_rate // 2 + 1
+        fmin = 30.
+        self.static_params = {'spin1z': 0., 'spin2z': 0., 'ra': 1.37,
+                              'dec': -1.26, 'polarization': 2.76,
+                              'inclination': 0.4, 'distance': 500.}
+        generator = FDomainDetFrameGenerator(
+            FDomainCBCGenerator, 0., detectors=['H1', 'L1'],
+            variable_args=['tc', 'mass1', 'mass2'], delta_f=1./seglen,
+            approximant='TaylorF2', f_lower=fmin, **self.static_params)
+        self.data = generator.generate(tc=3.1, mass1=30., mass2=25.)
+        for ifo in self.data:
+            self.data[ifo].resize(flen)
+        psd = pypsd.aLIGOZeroDetHighPower(flen, 1./seglen, 20.)
+        self.psds = {'H1': psd, 'L1': psd}
+        self.fmin = {'H1': fmin, 'L1': fmin}
+        self.points = [{'tc': 3.1, 'mass1': 30., 'mass2': 25.},
+                       {'tc': 3.102, 'mass1': 31., 'mass2': 24.},
+                       {'tc': 3.097, 'mass1': 28.5, 'mass2': 26.5}]
+
+    def make_model(self, variable_params, waveform_transforms=None):
+        return RelativeSPA(variable_params, self.data, self.fmin,
+                           30., 25., 0., 0., 1.37, -1.26, 3.1,
+                           psds=self.psds, static_params=self.static_params,
+                           waveform_transforms=waveform_transforms)
+
+    def scalar_loglrs(self, model, points):
+        expected = []
+        for pvals in points:
+            model.update(**pvals)
+            expected.append(model.loglr)
+        return expected
+
+    def check_batch(self, model, points, expected):
+        loglrs, stats = model.loglr_batch(points)
+        numpy.testing.assert_allclose(loglrs, expected, rtol=1e-8)
+        numpy.testing.assert_allclose([st.loglr for st in stats], expected,
+                                      rtol=1e-8)
+
+    def test_loglrs(self):
+        model = self.make_model(['tc', 'mass1', 'mass2'])
+        expected = self.scalar_loglrs(model, self.points)
+        params = {k: numpy.array([p[k] for p in self.points])
+                  for k in self.points[0]}
+        params.update(self.static_params)
+        numpy.testing.assert_allclose(model.loglrs(params), expected,
+                                      rtol=1e-8)
+        self.check_batch(model, self.points, expected)
+
+    def test_waveform_transforms(self):
+        model = self.make_model(['tc', 'mass1', 'mass2'])
+        expected = self.scalar_loglrs(model, self.points)
+
+        # the same points, sampled in chirp mass and mass ratio
+        model = self.make_model(['tc', 'mchirp', 'q'],
+                                [transforms.MchirpQToMass1Mass2()])
+        points = [{'tc': p['tc'],
+                   'mchirp': mchirp_from_mass1_mass2(p['mass1'], p['mass2']),
+                   'q': p['mass1'] / p['mass2']} for p in self.points]
+        numpy.testing.assert_allclose(self.scalar_loglrs(model, points),
+                                      expected, rtol=1e-8)
+        self.check_batch(model, points, expected)
+
+
+suite = unittest.TestSuite()
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestBatchLikelihood))
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(
+    TestRelativeBatchLikelihood))
+
+if __name__ == '__main__':
+    results = unittest.TextTestRunner(verbosity=2).run(suite)
+    simple_exit(results)
@@ -0,0 +1,139 @@
+"""
+Unit tests for writing trigger files and reading them template by template
+"""
+import unittest
+import os
+import tempfile
+import h5py
+import numpy
+from pycbc.io.hdf import ReadByTemplate, prefetch_templates
+from pycbc.io.hdf import compression_kwargs, trigger_chunk_length
+from utils import simple_exit
+
+
+class TestReadByTemplate(unittest.TestCase):
+    def setUp(self):
+        # Triggers are stored out of template order, as done by
+        # pycbc_coinc_mergetrigs, and template 2 has no triggers
+        self.order = [3, 0, 1, 2]
+        counts = [4, 2, 0, 5]
+        boundaries = numpy.zeros(len(counts) + 1, dtype=numpy.int64)
+        start = 0
+        for tnum in self.order:
+            boundaries[tnum] = start
+            start += counts[tnum]
+        ends = boundaries[:-1] + counts
+
+        self.tids = numpy.concatenate([numpy.repeat(t, counts[t])
+                                       for t in self.order])
+        self.times = numpy.arange(len(self.tids), dtype=numpy.float64) + 5
+        self.snr = numpy.random.uniform(5, 10, size=len(self.tids))
+
+        fd, self.filename = tempfile.mkstemp(suffix='.hdf')
+        os.close(fd)
+        with h5py.File(self.filename, 'w') as f:
+            f['H1/search/start_time'] = numpy.array([0.])
+            f['H1/search/end_time'] = numpy.array([11.5])
+            f['H1/template_boundaries'] = boundaries[:-1]
+            for col, data in [('end_time', self.times), ('snr', self.snr)]:
+                dset = f.create_dataset('H1/' + col, data=data)
+                refs = f.create_dataset('H1/%s_template' % col, (len(counts),),
+                         dtype=h5py.special_dtype(ref=h5py.RegionReference))
+                refs[:] = [dset.regionref[l:r]
+                           for l, r in zip(boundaries[:-1], ends)]
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def check_template(self, reader, tnum, tid):
+        # only times up to 11.5 are within the analyzed segment
+        expected = numpy.where((self.tids == tnum) & (self.times < 11.5))[0]
+        numpy.testing.assert_array_equal(tid, expected)
+        numpy.testing.assert_array_equal(reader['end_time'],
+                                         self.times[expected])
+        numpy.testing.assert_array_equal(reader['snr'], self.snr[expected])
+
+    def test_set_template(self):
+        reader = ReadByTemplate(self.filename)
+        for tnum in range(4):
+            self.check_template(reader, tnum, reader.set_template(tnum))
+
+    def test_prefetch(self):
+        reader = ReadByTemplate(self.filename)
+        for depth in [0, 1, 3]:
+            tnums = []
+            for tnum, blocks in prefetch_templates([reader], self.order,
+                                                   depth):
+                tnums.append(tnum)
+                tid = reader.set_template(tnum, blocks[0])
+                self.check_template(reader, tnum, tid)
+            self.assertEqual(tnums, self.order)
+        # snr was requested above, so it is now read ahead as well
+        self.assertTrue('snr' in reader.columns)
+
+    def test_prefetch_stops_early(self):
+        reader = ReadByTemplate(self.filename)
+        for tnum, _ in prefetch_templates([reader], self.order * 10, 1):
+            break
+        self.assertEqual(tnum, self.order[0])
+
+
+class TestTriggerStorage(unittest.TestCase):
+    def test_compression_kwargs(self):
+        self.assertEqual(compression_kwargs(None), {})
+        self.assertEqual(compression_kwargs('none'), {})
+        self.assertEqual(compression_kwargs('lzf'),
+                         {'compression': 'lzf', 'shuffle': True})
+        self.assertEqual(compression_kwargs('gzip'),
+                         {'compression': 'gzip', 'compression_opts': 4,
+                          'shuffle': True})
+        for level in range(10):
+            kwargs = compression_kwargs('gzip-%d' % level)
+            self.assertEqual(kwargs['compression'], 'gzip')
+            self.assertEqual(kwargs['compression_opts'], level)
+
+        for codec in ['gzipfoo', 'gzip-', 'gzip-12', 'gzip--1', 'gzip-a',
+                      'gzip- 5', 'lz4', 'GZIP-4', '']:
+            with self.assertRaises(ValueError):
+                compression_kwargs(codec)
+
+    def test_compressed_datasets(self):
+        # h5py accepts the options of every codec it supports itself
+        data = numpy.arange(5000, dtype=numpy.float32)
+        fd, filename = tempfile.mkstemp(suffix='.hdf')
+        os.close(fd)
+        try:
+            with h5py.File(filename, 'w') as f:
+                for codec in ['none', 'lzf', 'gzip', 'gzip-0', 'gzip-9']:
+                    kwargs = compression_kwargs(codec)
+                    if kwargs:
+                        kwargs['chunks'] = (trigger_chunk_length(len(data),
+                                                                 3),)
+                    f.create_dataset(codec, data=data, **kwargs)
+            with h5py.File(filename, 'r') as f:
+                for codec in f:
+                    numpy.testing.assert_array_equal(f[codec][:], data)
+        finally:
+            os.remove(filename)
+
+    def test_trigger_chunk_length(self):
+        self.assertTrue(trigger_chunk_length(0, 10) is None)
+        # the mean number of triggers per template, as a power of two
+        self.assertEqual(trigger_chunk_length(3000 * 1000, 1000), 4096)
+        self.assertEqual(trigger_chunk_length(10 ** 6, 100), 2 ** 14)
+        # bounded by the minimum and maximum chunk length
+        self.assertEqual(trigger_chunk_length(10 ** 5, 10 ** 5), 1024)
+        self.assertEqual(trigger_chunk_length(10 ** 9, 10), 2 ** 16)
+        # but never longer than the dataset
+        self.assertEqual(trigger_chunk_length(100, 1000), 100)
+        self.assertEqual(trigger_chunk_length(5000, 1), 5000)
+        self.assertEqual(trigger_chunk_length(5000, 0), 5000)
+
+
+suite = unittest.TestSuite()
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestReadByTemplate))
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestTriggerStorage))
+
+if __name__ == '__main__':
+    results = unittest.TextTestRunner(verbosity=2).run(suite)
+    simple_exit(results)
@@ -23,7 +23,7 @@ import itertools
 import numpy as np
 from utils import parse_args_cpu_only, simple_exit
 from pycbc.types import TimeSeries, FrequencySeries
-from pycbc.io.live import SingleCoincForGraceDB
+from pycbc.io.live import SingleCoincForGraceDB, LatencyTracker
 from glue.ligolw import ligolw
 from glue.ligolw import lsctables
 from glue.ligolw import table
@@ -168,8 +168,47 @@ class TestIOLive(unittest.TestCase):
         self.do_test(4, 1)
 
 
+class TestLatencyTracker(unittest.TestCase):
+    def test_rolling_summary(self):
+        timer = LatencyTracker(history=3)
+        for i in range(5):
+            with timer.stage('filter'):
+                pass
+            with timer.stage('filter'):
+                pass
+            block = timer.pop_block()
+            self.assertEqual(list(block.keys()), ['filter'])
+            self.assertEqual(len(timer.current), 0)
+            timer.record(1, {'filter': float(i), 'psd': 0.5})
+            timer.record(2, {'filter': 10. * i})
+
+        summary = timer.summary()
+        self.assertEqual(timer.stages, ['filter', 'psd'])
+        self.assertEqual(summary['filter']['count'], 6)
+        self.assertEqual(summary['filter']['max'], 40.)
+        self.assertEqual(summary['filter']['slowest_rank'], 2)
+        self.assertEqual(sum(summary['psd']['histogram']), 3)
+
+    def test_save_block(self):
+        import h5py
+        fd, fname = tempfile.mkstemp(suffix='.hdf')
+        os.close(fd)
+        try:
+            with h5py.File(fname, 'w') as f:
+                LatencyTracker.save_block(f.create_group('timing'),
+                                          {0: {'gather': 1.},
+                                           1: {'filter': 2., 'psd': 3.}})
+            with h5py.File(fname, 'r') as f:
+                self.assertEqual(list(f['timing/rank'][:]), [0, 1])
+                self.assertEqual(f['timing/filter'][1], 2.)
+                self.assertTrue(np.isnan(f['timing/filter'][0]))
+        finally:
+            os.remove(fname)
+
+
 suite = unittest.TestSuite()
 suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestIOLive))
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestLatencyTracker))
 
 if __name__ == '__main__':
     results = unittest.TextTestRunner(verbosity=2).run(suite)
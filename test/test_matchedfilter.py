@@ -142,8 +142,246 @@ class TestMatchedFilter(unittest.TestCase):
             self.assertRaises(ValueError,match,self.filt,self.filt[0:len(self.filt)-1])
 
 
+class TestBatchMatchedFilter(unittest.TestCase):
+    def setUp(self):
+        numpy.random.seed(2)
+        self.tlen = 4096
+        self.flen = self.tlen // 2 + 1
+        self.delta_f = 0.25
+        self.segments = []
+        for _ in range(2):
+            data = numpy.random.normal(size=self.flen) + \
+                1j * numpy.random.normal(size=self.flen)
+            seg = FrequencySeries(data, delta_f=self.delta_f, dtype=complex64)
+            seg.analyze = slice(512, 3584)
+            self.segments.append(seg)
+        # the third template is skipped, so the last batch is partial and
+        # the second batch has an unused row
+        self.templates = []
+        for i in range(5):
+            data = numpy.random.normal(size=self.flen) + \
+                1j * numpy.random.normal(size=self.flen)
+            self.templates.append(None if i == 2 else data)
+        self.norms = [float(i + 1) for i in range(5)]
+        self.windows = [64, 32, 64, 128, 16]
+
+    def check_batch(self, use_cluster, cluster_function):
+        template_mem = zeros(self.tlen, dtype=complex64)
+        single = MatchedFilterControl(None, None, 0., self.tlen, self.delta_f,
+                                      complex64, self.segments, template_mem,
+                                      use_cluster,
+                                      cluster_function=cluster_function)
+        nbatch = 2
+        batch = BatchMatchedFilterControl(None, None, 0., self.tlen,
+                                          self.delta_f, complex64,
+                                          self.segments, nbatch, use_cluster,
+                                          cluster_function=cluster_function)
+        for start in range(0, len(self.templates), nbatch):
+            templates = self.templates[start:start + nbatch]
+            norms = self.norms[start:start + nbatch]
+            windows = self.windows[start:start + nbatch]
+            rows = [row for row, h in enumerate(templates) if h is not None]
+            for row in rows:
+                batch.htildes[row][:self.flen] = templates[row]
+
+            for segnum, seg in enumerate(self.segments):
+                found = {}
+                for row, snr, norm, corr, idx, snrv in \
+                        batch.matched_filter_and_cluster(segnum, norms,
+                                                         windows, rows=rows):
+                    found[row] = (snr.numpy().copy(), norm,
+                                  corr.numpy().copy(), numpy.array(idx),
+                                  numpy.array(snrv))
+                self.assertEqual(sorted(found.keys()), rows)
+
+                for row in rows:
+                    template_mem[:self.flen] = templates[row]
+                    snr, norm, corr, idx, snrv = \
+                        single.matched_filter_and_cluster(segnum, norms[row],
+                                                          windows[row])
+                    bsnr, bnorm, bcorr, bidx, bsnrv = found[row]
+                    self.assertEqual(norm, bnorm)
+                    numpy.testing.assert_array_equal(numpy.array(idx), bidx)
+                    scale = abs(snr.numpy()).max()
+                    numpy.testing.assert_allclose(numpy.array(snrv), bsnrv,
+                                                  atol=1e-5 * scale)
+                    numpy.testing.assert_allclose(snr.numpy()[seg.analyze],
+                                                  bsnr[seg.analyze],
+                                                  atol=1e-5 * scale)
+                    numpy.testing.assert_allclose(
+                        corr.numpy(), bcorr,
+                        atol=1e-5 * abs(corr.numpy()).max())
+
+    def test_symmetric(self):
+        self.check_batch(True, 'symmetric')
+
+    def test_findchirp(self):
+        self.check_batch(True, 'findchirp')
+
+    def test_threshold_only(self):
+        self.check_batch(False, 'symmetric')
+
+class _LiveData(object):
+    """The parts of a StrainBuffer that the live matched filter reads"""
+    def __init__(self, segments):
+        self.segments = segments
+        self.sample_rate = 256
+        self.blocksize = 2
+        self.trim_padding = 64
+        self.start_time = 100.
+
+    def overwhitened_data(self, delta_f):
+        return self.segments[delta_f]
+
+def _template_sigmasq(htilde, psd):
+    return sigmasq(htilde, psd)
+
+class TestLiveBatchMatchedFilter(unittest.TestCase):
+    def setUp(self):
+        import types
+        numpy.random.seed(3)
+        self.chisq_bins = '4'
+        self.sample_rate = 256
+        self.f_lower = 20.
+        params = numpy.zeros(10, dtype=[('mass1', float), ('mass2', float)])
+        params['mass1'] = numpy.random.uniform(1, 10, size=10)
+        params['mass2'] = numpy.random.uniform(1, 10, size=10)
+
+        # templates of two durations, given out of order
+        self.templates = []
+        for tid, duration in enumerate([16, 8] * 5):
+            htilde = self.frequency_series(duration, complex64)
+            htilde.f_lower = self.f_lower
+            htilde.approximant = 'test'
+            htilde.params = params[tid]
+            htilde.id = tid
+            htilde.sigmasq = types.MethodType(_template_sigmasq, htilde)
+            self.templates.append(htilde)
+
+    def frequency_series(self, duration, dtype):
+        flen = duration * self.sample_rate // 2 + 1
+        kmin = int(self.f_lower * duration)
+        data = numpy.zeros(flen, dtype=numpy.complex128)
+        data[kmin:-1] = numpy.random.normal(size=flen - kmin - 1) + \
+            1j * numpy.random.normal(size=flen - kmin - 1)
+        return FrequencySeries(data, delta_f=1.0 / duration, dtype=dtype)
+
+    def data(self):
+        segments = {}
+        for duration in [8, 16]:
+            stilde = self.frequency_series(duration, complex64)
+            stilde.psd = FrequencySeries(
+                numpy.random.uniform(0.5, 2., size=len(stilde)),
+                delta_f=stilde.delta_f, dtype=float32)
+            segments[stilde.delta_f] = stilde
+        return _LiveData(segments)
+
+    def per_template(self, data, snr_threshold):
+        """The triggers of the filter, found one template at a time"""
+        from pycbc import vetoes
+        power_chisq = vetoes.SingleDetPowerChisq(self.chisq_bins, None)
+        triggers = []
+        for htilde in self.templates:
+            stilde = data.overwhitened_data(htilde.delta_f)
+            sgm = sigmasq(htilde, stilde.psd)
+            snr, corr, norm = matched_filter_core(htilde, stilde, h_norm=sgm)
+
+            valid_end = int(len(snr) - data.trim_padding)
+            valid_start = int(valid_end - data.blocksize * data.sample_rate)
+            l = snr[valid_start:valid_end].abs_arg_max() + valid_start
+            snrv = numpy.array([snr[l]])
+            if abs(snrv[0]) * norm < snr_threshold:
+                continue
+
+            c, d = power_chisq.values(corr, snrv, norm, stilde.psd, [l],
+                                      htilde)
+            triggers.append((htilde.id, abs(snrv[0] * norm),
+                             numpy.angle(snrv[0] * norm),
+                             data.start_time + float(l - valid_start) /
+                             data.sample_rate,
+                             sgm, c[0] / d[0], d[0]))
+        names = ['template_id', 'snr', 'coa_phase', 'end_time', 'sigmasq',
+                 'chisq', 'chisq_dof']
+        triggers = numpy.array(triggers, dtype=[(n, float) for n in names])
+        return numpy.sort(triggers, order='snr')[::-1]
+
+    def live_filter(self, snr_threshold, **kwds):
+        from pycbc import vetoes
+        sg_chisq = vetoes.SingleDetSGChisq(None)
+        return LiveBatchMatchedFilter(self.templates, snr_threshold,
+                                      self.chisq_bins, sg_chisq,
+                                      maxelements=2**13, **kwds)
+
+    def check_triggers(self, result, expected):
+        order = result['snr'].argsort()[::-1]
+        self.assertEqual(len(order), len(expected))
+        numpy.testing.assert_array_equal(result['template_id'][order],
+                                         expected['template_id'])
+        tids = expected['template_id'].astype(int)
+        for key in ['mass1', 'mass2']:
+            numpy.testing.assert_array_equal(
+                result[key][order],
+                [self.templates[tid].params[key] for tid in tids])
+        numpy.testing.assert_array_equal(result['end_time'][order],
+                                         expected['end_time'])
+        numpy.testing.assert_array_equal(result['chisq_dof'][order],
+                                         expected['chisq_dof'])
+        for key in ['snr', 'sigmasq', 'chisq']:
+            numpy.testing.assert_allclose(result[key][order], expected[key],
+                                          rtol=1e-4)
+        numpy.testing.assert_allclose(result['coa_phase'][order],
+                                      expected['coa_phase'], atol=1e-4)
+        self.assertTrue((result['sg_chisq'] == 0).all())
+
+    def test_triggers(self):
+        with _context:
+            data = self.data()
+            # the templates are split into groups of 4 and 1 short templates
+            # and 2, 2 and 1 long templates, the groups of two sharing memory
+            threshold = numpy.median(self.per_template(data, 0.)['snr'])
+            expected = self.per_template(data, threshold)
+            mf = self.live_filter(threshold)
+            self.assertEqual([len(g) for g in mf.tgroups], [4, 1, 2, 2, 1])
+            self.check_triggers(mf.process_data(data), expected)
+
+            # the sigmasq of each group are calculated again for a new psd
+            data = self.data()
+            expected = self.per_template(data, threshold)
+            self.check_triggers(mf.process_data(data), expected)
+
+    def test_max_triggers(self):
+        with _context:
+            data = self.data()
+            expected = self.per_template(data, 0.)
+            mf = self.live_filter(0., max_triggers_in_batch=3)
+            self.check_triggers(mf.process_data(data), expected[:3])
+
+    def test_newsnr_threshold(self):
+        from pycbc.events import ranking
+        with _context:
+            data = self.data()
+            expected = self.per_template(data, 0.)
+            newsnr = ranking.newsnr(expected['snr'], expected['chisq'])
+            threshold = numpy.median(newsnr)
+            mf = self.live_filter(0., newsnr_threshold=threshold)
+            self.check_triggers(mf.process_data(data),
+                                expected[newsnr >= threshold])
+
+    def test_abort(self):
+        with _context:
+            data = self.data()
+            loudest = self.per_template(data, 0.)['snr'][0]
+            mf = self.live_filter(0., snr_abort_threshold=loudest * 0.9)
+            self.assertFalse(mf.process_data(data))
+
 suite = unittest.TestSuite()
 suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestMatchedFilter))
+# the batched matched filter is only available on the cpu
+if _scheme == 'cpu':
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(
+        TestBatchMatchedFilter))
+    suite.addTest(unittest.TestLoader().loadTestsFromTestCase(
+        TestLiveBatchMatchedFilter))
 
 if __name__ == '__main__':
     results = unittest.TextTestRunner(verbosity=2).run(suite)
@@ -0,0 +1,90 @@
+"""
+Unit tests for the worker pools in pycbc.pool
+"""
+import unittest
+import numpy
+import pycbc.pool
+from pycbc.pool import BroadcastPool, SinglePool, shared_memory
+from utils import simple_exit
+
+
+def _summarize(args):
+    data, scale = args
+    return float(data['x'].sum() * scale), data['x'].flags.writeable
+
+def _add(value):
+    return value + 1
+
+_kept = None
+def _keep(args):
+    # hold on to the arrays until the next call
+    global _kept
+    _kept = args
+    return [float(a.sum()) for a in args]
+
+
+class TestBroadcastPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = BroadcastPool(3)
+        self.data = {'x': numpy.arange(1000, dtype=numpy.float64)}
+
+    def tearDown(self):
+        self.pool.terminate()
+        self.pool.join()
+
+    def test_broadcast(self):
+        for share in [False, True]:
+            results = self.pool.broadcast(_summarize, (self.data, 2.),
+                                          share_arrays=share)
+            self.assertEqual(len(results), 3)
+            for total, writeable in results:
+                self.assertEqual(total, 2 * self.data['x'].sum())
+                if share and shared_memory is not None:
+                    self.assertFalse(writeable)
+        # repeated broadcasts keep working
+        results = self.pool.broadcast(_add, 1)
+        self.assertEqual(results, [2, 2, 2])
+
+    @unittest.skipIf(shared_memory is None, 'no multiprocessing.shared_memory')
+    def test_release_shared(self):
+        names = []
+        pack_arrays = pycbc.pool._pack_arrays
+        def record(handles):
+            shm = pack_arrays(handles)
+            names.append(shm.name)
+            return shm
+        pycbc.pool._pack_arrays = record
+        try:
+            # arrays of several types and sizes share one segment
+            args = [numpy.arange(n, dtype=dtype) for n, dtype in
+                    [(5, numpy.int8), (0, float), (1000, numpy.float32)]]
+            args.append(numpy.ones((3, 7))[:, ::2])
+            for _ in range(3):
+                results = self.pool.broadcast(_keep, args, share_arrays=True)
+                self.assertEqual(results, [[float(a.sum()) for a in args]] * 3)
+        finally:
+            pycbc.pool._pack_arrays = pack_arrays
+
+        # each segment is gone once its broadcast returns
+        self.assertEqual(len(set(names)), 3)
+        for name in names:
+            with self.assertRaises(FileNotFoundError):
+                shared_memory.SharedMemory(name=name)
+
+    def test_allmap(self):
+        results = self.pool.allmap(_add, [1, 2, 3])
+        self.assertEqual(sorted(results), [2, 3, 4])
+
+    def test_single_pool(self):
+        pool = SinglePool()
+        results = pool.broadcast(_summarize, (self.data, 1.),
+                                 share_arrays=True)
+        self.assertEqual(results[0][0], self.data['x'].sum())
+
+
+suite = unittest.TestSuite()
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestBroadcastPool))
+
+if __name__ == '__main__':
+    results = unittest.TextTestRunner(verbosity=2).run(suite)
+    simple_exit(results)
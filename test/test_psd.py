@@ -106,6 +106,36 @@ class TestPSD(unittest.TestCase):
                         msg='seg_len=%d seg_stride=%d method=%s -> rms=%.3f' % \
                         (seg_len, seg_stride, method, err_rms))
 
+    def test_incremental_welch(self):
+        """Test that the incremental Welch estimator matches welch"""
+        seg_len = 4096
+        seg_stride = seg_len // 2
+        window_len = 9 * seg_stride
+        for method in ('mean', 'median', 'median-mean'):
+            with self.context:
+                estimator = pycbc.psd.IncrementalWelch(
+                        seg_len=seg_len, seg_stride=seg_stride,
+                        avg_method=method)
+                for step in (0, 3 * seg_stride, 5 * seg_stride, 1000):
+                    data = self.noise[step:step + window_len]
+                    psd = estimator(data)
+                    ref = pycbc.psd.welch(data, seg_len=seg_len,
+                                          seg_stride=seg_stride,
+                                          avg_method=method)
+                    self.assertEqual(psd.start_time, ref.start_time)
+                    numpy.testing.assert_allclose(psd.numpy(), ref.numpy(),
+                                                  rtol=1e-10)
+
+                # segments overlapping modified data must be recomputed
+                data = TimeSeries(self.noise[1000:1000 + window_len],
+                                  copy=True)
+                data[-seg_len:] = 0
+                estimator.invalidate(data.end_time - seg_len * data.delta_t)
+                ref = pycbc.psd.welch(data, seg_len=seg_len,
+                                      seg_stride=seg_stride, avg_method=method)
+                numpy.testing.assert_allclose(estimator(data).numpy(),
+                                              ref.numpy(), rtol=1e-10)
+
     def test_truncation(self):
         """Test inverse PSD truncation"""
         for seg_len in (2048, 4096, 8192):
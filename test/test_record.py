@@ -0,0 +1,100 @@
+"""
+Unit tests for evaluating expressions of the fields of a FieldArray
+"""
+import unittest
+import numpy
+from pycbc.io import FieldArray
+from utils import simple_exit
+
+
+class TestFieldArrayExpressions(unittest.TestCase):
+    def setUp(self):
+        numpy.random.seed(0)
+        self.mass1 = numpy.random.uniform(1, 10, size=1000)
+        self.mass2 = numpy.random.uniform(1, 10, size=1000)
+        self.calls = 0
+
+        def mtotal(arr):
+            self.calls += 1
+            return arr['mass1'] + arr['mass2']
+
+        arr = FieldArray.from_kwargs(mass1=self.mass1, mass2=self.mass2)
+        self.arr = arr.add_virtualfields('mtotal', mtotal)
+        self.arr.scale = 2.
+
+    def test_expression(self):
+        expected = self.mass1 * self.mass2 / (self.mass1 + self.mass2)**2
+        expr = 'mass1*mass2/mtotal**2'
+        numpy.testing.assert_allclose(self.arr[expr], expected)
+        # the compiled expression is reused by other arrays
+        other = self.arr[:10]
+        other.scale = 2.
+        numpy.testing.assert_allclose(other[expr], expected[:10])
+        self.assertAlmostEqual(self.arr['scale*mass1'][5],
+                               2 * self.mass1[5])
+
+    def test_memoize(self):
+        self.arr.cache_evaluations()
+        mtotal = self.arr['mtotal']
+        self.assertEqual(self.calls, 1)
+        numpy.testing.assert_array_equal(self.arr['mtotal'], mtotal)
+        numpy.testing.assert_allclose(self.arr['mtotal / mass1'],
+                                      mtotal / self.mass1)
+        self.assertEqual(self.calls, 1)
+        # memoized values cannot be changed by the caller
+        with self.assertRaises(ValueError):
+            mtotal[0] = 0.
+
+        # setting a field forgets the memoized values
+        self.arr['mass1'] = self.mass1 + 1
+        numpy.testing.assert_allclose(self.arr['mtotal'],
+                                      self.mass1 + self.mass2 + 1)
+        self.assertEqual(self.calls, 2)
+
+        self.arr.cache_evaluations(False)
+        self.arr['mtotal']
+        self.arr['mtotal']
+        self.assertEqual(self.calls, 4)
+
+    def test_chunked(self):
+        expr = 'log(mtotal) * scale + mass2'
+        numpy.testing.assert_allclose(self.arr.evaluate(expr, chunksize=64),
+                                      self.arr[expr])
+        numpy.testing.assert_array_equal(
+            self.arr.evaluate('mass1', chunksize=64), self.mass1)
+        with self.assertRaises(ValueError):
+            self.arr.evaluate('add.reduce(mass1)', chunksize=64)
+
+    def test_chunked_whole_array(self):
+        # a virtual field that uses an attribute which views of the array
+        # do not have is computed once on the whole array
+        self.whole_calls = 0
+
+        def scaled(arr):
+            value = arr.scale * arr['mass1']
+            self.whole_calls += 1
+            return value
+
+        arr = self.arr.add_virtualfields('scaled', scaled)
+        arr.scale = 2.
+        expected = 2. * self.mass1 + self.mass2
+        numpy.testing.assert_allclose(
+            arr.evaluate('scaled + mass2', chunksize=64), expected)
+        self.assertEqual(self.whole_calls, 1)
+
+        arr.cache_evaluations()
+        numpy.testing.assert_allclose(
+            arr.evaluate('scaled + mass2', chunksize=64), expected)
+        numpy.testing.assert_allclose(
+            arr.evaluate('scaled * mass2', chunksize=64),
+            2. * self.mass1 * self.mass2)
+        self.assertEqual(self.whole_calls, 2)
+
+
+suite = unittest.TestSuite()
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(
+    TestFieldArrayExpressions))
+
+if __name__ == '__main__':
+    results = unittest.TextTestRunner(verbosity=2).run(suite)
+    simple_exit(results)
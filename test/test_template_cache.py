@@ -0,0 +1,79 @@
+"""
+Unit tests for the on-disk cache of generated templates
+"""
+import unittest
+import os
+import shutil
+import tempfile
+import numpy
+from pycbc.types import FrequencySeries, zeros, complex64
+from pycbc.waveform.bank import TemplateCache
+from utils import simple_exit
+
+
+class TestTemplateCache(unittest.TestCase):
+    def setUp(self):
+        self.path = tempfile.mkdtemp()
+        self.length = 1025
+
+    def tearDown(self):
+        shutil.rmtree(self.path)
+
+    def template(self, seed):
+        numpy.random.seed(seed)
+        data = numpy.zeros(self.length, dtype=numpy.complex64)
+        data[10:700] = numpy.random.normal(size=690) + \
+            1j * numpy.random.normal(size=690)
+        htilde = FrequencySeries(data, delta_f=0.25, epoch=3)
+        htilde.chirp_length = 1.5
+        htilde.length_in_time = 2.5
+        return htilde
+
+    def test_round_trip(self):
+        cache = TemplateCache(self.path)
+        key = cache.key(1234, 'SPAtmplt', 0.25, 20., 1024., self.length)
+        self.assertNotEqual(key, cache.key(1234, 'SPAtmplt', 0.25, 25.,
+                                           1024., self.length))
+        out = zeros(self.length, dtype=complex64)
+        self.assertTrue(cache.read(key, out) is None)
+
+        htilde = self.template(0)
+        cache.write(key, htilde)
+        out = zeros(self.length, dtype=complex64)
+        cached = cache.read(key, out)
+        numpy.testing.assert_array_equal(cached.numpy(), htilde.numpy())
+        self.assertEqual(cached.delta_f, htilde.delta_f)
+        self.assertEqual(float(cached.epoch), 3.)
+        self.assertEqual(cached.chirp_length, 1.5)
+        self.assertEqual(cached.length_in_time, 2.5)
+        # the template is read into the given memory
+        self.assertEqual(out[100], htilde[100])
+
+        # a cache of a different length does not match
+        self.assertTrue(cache.read(key, zeros(10, dtype=complex64)) is None)
+
+    def test_eviction(self):
+        cache = TemplateCache(self.path)
+        cache.write('first', self.template(0))
+        size = os.path.getsize(os.path.join(self.path, 'first.npy'))
+
+        cache = TemplateCache(self.path, max_size=int(2.5 * size))
+        cache.write('second', self.template(1))
+        # make the first template the most recently used
+        os.utime(os.path.join(self.path, 'second.npy'), (0, 0))
+        out = zeros(self.length, dtype=complex64)
+        self.assertTrue(cache.read('first', out) is not None)
+
+        cache.write('third', self.template(2))
+        stored = sorted(f for f in os.listdir(self.path) if f.endswith('.npy'))
+        self.assertEqual(stored, ['first.npy', 'third.npy'])
+        self.assertFalse(os.path.exists(os.path.join(self.path,
+                                                     'second.json')))
+
+
+suite = unittest.TestSuite()
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestTemplateCache))
+
+if __name__ == '__main__':
+    results = unittest.TextTestRunner(verbosity=2).run(suite)
+    simple_exit(results)
@@ -519,6 +519,89 @@ class TmpltbankTestClass(unittest.TestCase):
         errMsg = "Obtained distance does not agree with expected value."
         self.assertTrue( diff < 1E-5, msg=errMsg)
 
+    def test_partitioned_bank_batch(self):
+        bank = pycbc.tmpltbank.PartitionedTmpltbank(self.massRangeParams,
+                              self.metricParams, self.f_upper, 0.03**0.5)
+        numpy.random.seed(9251)
+        masses = pycbc.tmpltbank.get_random_mass(500, self.massRangeParams)
+        xis = numpy.array(pycbc.tmpltbank.get_cov_params(*masses,
+                   metricParams=self.metricParams, fUpper=self.f_upper))
+        for idx in range(xis.shape[1]):
+            bank.add_point_by_chi_coords(xis[:,idx], masses[0][idx],
+                              masses[1][idx], masses[2][idx], masses[3][idx])
+
+        masses = pycbc.tmpltbank.get_random_mass(200, self.massRangeParams)
+        xis = numpy.array(pycbc.tmpltbank.get_cov_params(*masses,
+                   metricParams=self.metricParams, fUpper=self.f_upper))
+        dists, idxes = bank.calc_point_distances(xis, batch_size=64)
+        accept = bank.test_point_distances(xis, 0.03)
+        for idx in range(xis.shape[1]):
+            dist, closest = bank.calc_point_distance(xis[:,idx])
+            self.assertAlmostEqual(dists[idx], dist)
+            if closest is None:
+                self.assertEqual(list(idxes[idx]), [-1, -1, -1])
+            else:
+                self.assertEqual(tuple(idxes[idx]), closest)
+            self.assertEqual(accept[idx],
+                             bank.test_point_distance(xis[:,idx], 0.03))
+
+    def test_partitioned_bank_vary_fupper(self):
+        metricParams = pycbc.tmpltbank.metricParameters(self.pnOrder,
+                         self.f_low, self.f_upper, self.deltaF, self.f0)
+        metricParams.psd = self.psd
+        metricParams = pycbc.tmpltbank.determine_eigen_directions(
+                         metricParams, vary_fmax=True, vary_density=100)
+        fs = numpy.array(list(metricParams.evals.keys()), dtype=float)
+        fs.sort()
+        low_freq, high_freq = pycbc.tmpltbank.find_max_and_min_frequencies(
+                                'SchwarzISCO', self.massRangeParams, fs)
+        fs = fs[(fs >= low_freq) & (fs <= high_freq)]
+        vals = pycbc.tmpltbank.estimate_mass_range(10000,
+                 self.massRangeParams, metricParams, low_freq, covary=False)
+        metricParams.evecsCV = {low_freq: numpy.linalg.eig(numpy.cov(vals))[1]}
+
+        bank = pycbc.tmpltbank.PartitionedTmpltbank(self.massRangeParams,
+                              metricParams, low_freq, 0.03**0.5)
+        bank.get_freq_map_and_normalizations(fs, 'SchwarzISCO')
+
+        def vary_params(num):
+            masses = pycbc.tmpltbank.get_random_mass(num,
+                                                     self.massRangeParams)
+            mass_dict = {'m1': masses[0], 'm2': masses[1],
+                         's1z': masses[2], 's2z': masses[3]}
+            fuppers = pycbc.tmpltbank.return_nearest_cutoff('SchwarzISCO',
+                                                            mass_dict, fs)
+            lambdas = pycbc.tmpltbank.get_chirp_params(*masses,
+                        f0=metricParams.f0, order=metricParams.pnOrder)
+            mus = numpy.array([pycbc.tmpltbank.get_mu_params(lambdas,
+                               metricParams, freq) for freq in fs])
+            xis = numpy.array(pycbc.tmpltbank.get_cov_params(*masses,
+                       metricParams=metricParams, fUpper=low_freq))
+            return masses, xis, fuppers, mus
+
+        numpy.random.seed(9252)
+        masses, xis, fuppers, mus = vary_params(500)
+        for idx in range(xis.shape[1]):
+            bank.add_point_by_chi_coords(xis[:,idx], masses[0][idx],
+                              masses[1][idx], masses[2][idx], masses[3][idx],
+                              point_fupper=fuppers[idx], mus=mus[:,:,idx])
+
+        _, xis, fuppers, mus = vary_params(200)
+        dists, idxes = bank.calc_point_distances_vary(xis, fuppers, mus,
+                                                      batch_size=64)
+        accept = bank.test_point_distances_vary(xis, fuppers, mus, 0.03,
+                                                batch_size=64)
+        for idx in range(xis.shape[1]):
+            dist, closest = bank.calc_point_distance_vary(xis[:,idx],
+                                               fuppers[idx], mus[:,:,idx])
+            self.assertAlmostEqual(dists[idx], dist)
+            if closest is None:
+                self.assertEqual(list(idxes[idx]), [-1, -1, -1])
+            else:
+                self.assertEqual(tuple(idxes[idx]), closest)
+            self.assertEqual(accept[idx], bank.test_point_distance_vary(
+                             xis[:,idx], fuppers[idx], mus[:,:,idx], 0.03))
+
     def test_conv_to_sngl(self):
         # Just run the function, no checking output
         masses1 = [(2,2,0.4,0.3),(4.01,0.249,0.41,0.29)]
@@ -0,0 +1,114 @@
+"""
+These are the unittests for finding Files by time in a
+pycbc.workflow.core.FileList
+"""
+import unittest
+import numpy
+from ligo import segments
+from utils import simple_exit
+from pycbc.workflow.core import File, FileList
+
+def make_file(ifos, segs, num):
+    seglist = segments.segmentlist([segments.segment(s, e) for s, e in segs])
+    seglist.coalesce()
+    url = 'file://localhost/tmp/TEST-%d.txt' % num
+    return File(ifos, 'TEST', seglist, file_url=url)
+
+def covers(ifo, time, entry):
+    return ifo in entry.ifo_list and time in entry.segment_list
+
+def overlaps(ifo, seg, entry):
+    return ifo in entry.ifo_list and entry.segment_list.intersects_segment(seg)
+
+class TestFileListTimes(unittest.TestCase):
+    def setUp(self):
+        numpy.random.seed(1024)
+        self.flist = FileList()
+        for num in range(300):
+            ifos = ['H1', 'L1', ['H1', 'L1']][num % 3]
+            segs = []
+            for _ in range(numpy.random.randint(1, 3)):
+                start = numpy.random.uniform(0, 10000)
+                segs.append((start, start + numpy.random.uniform(1, 200)))
+            self.flist.append(make_file(ifos, segs, num))
+        # a single long file used to hide overlaps from a scan of the
+        # segments starting shortly before the time of interest
+        self.flist.append(make_file('H1', [(-5000, 20000)], 300))
+        self.times = numpy.random.uniform(-6000, 21000, size=200)
+
+    def check_at_time(self, flist, time, ifo='H1'):
+        expected = [f for f in flist if covers(ifo, time, f)]
+        found = flist.find_output_at_time(ifo, time)
+        if not expected:
+            self.assertTrue(found is None)
+        else:
+            self.assertEqual(found, expected)
+
+    def test_find_output_at_time(self):
+        for ifo in ['H1', 'L1', 'V1']:
+            for time in self.times:
+                self.check_at_time(self.flist, time, ifo=ifo)
+        # the start of each segment is covered
+        entry = self.flist[7]
+        for seg in entry.segment_list:
+            self.assertTrue(entry in self.flist.find_output_at_time(
+                entry.ifo_list[0], seg[0]))
+
+    def test_find_outputs_in_range(self):
+        for start in self.times:
+            for duration in [0, 10, 500]:
+                seg = segments.segment(start, start + duration)
+                overlapping = [f for f in self.flist
+                               if overlaps('L1', seg, f)]
+                self.assertEqual(list(self.flist.find_all_output_in_range(
+                                 'L1', seg)), overlapping)
+
+                seglist = segments.segmentlist([seg])
+                windows = [abs(f.segment_list & seglist) for f in overlapping]
+                found = self.flist.find_outputs_in_range('L1', seg)
+                single = self.flist.find_output_in_range('L1', seg[0], seg[1])
+                if not overlapping:
+                    self.assertEqual(found, [])
+                    self.assertTrue(single is None)
+                    continue
+                best = overlapping[numpy.array(windows, dtype=int).argmax()]
+                self.assertEqual(found, [f for f in overlapping
+                                 if f.segment_list == best.segment_list])
+                if len(overlapping) == 1:
+                    self.assertTrue(single is overlapping[0])
+
+    def test_index_invalidation(self):
+        time = 25000.
+        self.check_at_time(self.flist, time)
+        self.assertTrue(self.flist.find_output_at_time('H1', time) is None)
+
+        self.flist.append(make_file('H1', [(24990, 25010)], 301))
+        self.check_at_time(self.flist, time)
+
+        self.flist.insert(0, make_file('H1', [(24000, 26000)], 302))
+        self.check_at_time(self.flist, time)
+        self.assertEqual(len(self.flist.find_output_at_time('H1', time)), 2)
+
+        self.flist.sort(key=lambda f: f.segment_list[0][0])
+        self.check_at_time(self.flist, time)
+
+        self.flist[3] = make_file('H1', [(24999, 25001)], 303)
+        self.check_at_time(self.flist, time)
+
+        self.flist += [make_file('H1', [(0, 30000)], 304)]
+        self.check_at_time(self.flist, time)
+
+        self.flist.reverse()
+        self.check_at_time(self.flist, time)
+
+        self.flist.pop(0)
+        self.check_at_time(self.flist, time)
+        for time in self.times:
+            self.check_at_time(self.flist, time)
+
+suite = unittest.TestSuite()
+suite.addTest(unittest.TestLoader().loadTestsFromTestCase(TestFileListTimes))
+
+if __name__ == '__main__':
+    results = unittest.TextTestRunner(verbosity=2).run(suite)
+    simple_exit(results)